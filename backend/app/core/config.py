@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from typing import Optional, List
-from functools import lru_cache
+from functools import lru_cache, cached_property
 import json
 
 
@@ -14,6 +14,10 @@ class Settings(BaseSettings):
     
     # API
     api_prefix: str = "/api/v1"
+    mcp_server_url: str = "http://localhost:8000/api/v1"  # Public base URL advertised to MCP clients
+    enabled_routers: List[str] = [
+        "health", "auth", "market_data", "option_chain", "websocket", "mcp", "strategies", "orders"
+    ]
     
     # CORS
     cors_origins: List[str] = ["http://localhost:3000"]
@@ -38,6 +42,10 @@ class Settings(BaseSettings):
     ws_reconnect_delay: int = 5  # seconds
     ws_max_subscriptions: int = 200  # Fyers limit
     
+    # Market Data Caching
+    quote_cache_ttl: float = 1.0  # seconds a successful quotes result is reused; 0 disables
+    order_cache_ttl: float = 1.0  # seconds orderbook/tradebook/positions/holdings are reused; 0 disables
+    
     # Trading Configuration
     max_trades_per_day: int = 2
     min_risk_reward_ratio: float = 1.0
@@ -57,27 +65,50 @@ class Settings(BaseSettings):
         """Get formatted client ID for Fyers API."""
         return self.fyers_app_id
     
-    def get_access_token_formatted(self) -> Optional[str]:
-        """Get access token in Fyers format: app_id:access_token."""
+    @cached_property
+    def fyers_access_token_formatted(self) -> Optional[str]:
+        """Access token in Fyers format (app_id:access_token), built once."""
         if self.fyers_access_token:
             return f"{self.fyers_app_id}:{self.fyers_access_token}"
         return None
+    
+    def __setattr__(self, name: str, value) -> None:
+        super().__setattr__(name, value)
+        # Token is updated in place after OAuth; drop the derived value
+        if name in ("fyers_app_id", "fyers_access_token"):
+            self.__dict__.pop("fyers_access_token_formatted", None)
+    
+    def get_access_token_formatted(self) -> Optional[str]:
+        """Get access token in Fyers format: app_id:access_token."""
+        return self.fyers_access_token_formatted
+
+
+class SettingsRef:
+    """
+    Holder for the live Settings snapshot.
+    
+    Readers take `settings_ref.current`; reload_settings() builds a new
+    instance and swaps the reference, so no reader sees a half-built one.
+    """
+    __slots__ = ("current",)
+    
+    def __init__(self):
+        self.current: Optional[Settings] = None
 
 
-# Global settings instance
-_settings: Optional[Settings] = None
+settings_ref = SettingsRef()
 
 
 def get_settings() -> Settings:
-    """Get settings instance (cached)."""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    """Get the current settings snapshot (created on first use)."""
+    current = settings_ref.current
+    if current is None:
+        current = settings_ref.current = Settings()
+    return current
 
 
 def reload_settings() -> Settings:
-    """Force reload settings from environment."""
-    global _settings
-    _settings = Settings()
-    return _settings
+    """Force reload settings from environment and publish the new snapshot."""
+    new_settings = Settings()
+    settings_ref.current = new_settings
+    return new_settings
@@ -0,0 +1,71 @@
+"""
+Shared HTTP Clients
+
+One pooled httpx.AsyncClient per process, opened and closed by the
+application lifespan and reused by services for keep-alive connections.
+Blocking service methods share a pooled httpx.Client the same way.
+"""
+
+import threading
+from typing import Dict, Optional
+
+import httpx
+
+
+_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+_sync_lock = threading.Lock()
+
+
+def fyers_headers(authorization: Optional[str] = None) -> Dict[str, str]:
+    """
+    Request headers for direct Fyers API v3 calls, as the fyers_apiv3 SDK sends them.
+    
+    Args:
+        authorization: "app_id:access_token", or None for unauthenticated calls
+    """
+    headers = {"Content-Type": "application/json", "version": "3"}
+    if authorization:
+        headers["Authorization"] = authorization
+    return headers
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled async client used for upstream API calls."""
+    return httpx.AsyncClient(
+        timeout=5.0,
+        limits=httpx.Limits(max_keepalive_connections=50, max_connections=200)
+    )
+
+
+def set_http_client(client: Optional[httpx.AsyncClient]) -> None:
+    """Publish (or clear) the shared client."""
+    global _client
+    _client = client
+
+
+def get_http_client() -> Optional[httpx.AsyncClient]:
+    """Get the shared client, or None outside the app lifespan."""
+    return _client
+
+
+def get_sync_http_client() -> httpx.Client:
+    """Get the pooled sync client (created on first use, closed at shutdown)."""
+    global _sync_client
+    if _sync_client is None:
+        with _sync_lock:
+            if _sync_client is None:
+                _sync_client = httpx.Client(
+                    timeout=httpx.Timeout(10.0, connect=3.0),
+                    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+                )
+    return _sync_client
+
+
+def close_sync_http_client() -> None:
+    """Close the pooled sync client; the next get_sync_http_client() opens a new one."""
+    global _sync_client
+    with _sync_lock:
+        client, _sync_client = _sync_client, None
+    if client is not None:
+        client.close()
@@ -1,21 +1,49 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+import importlib
+
+try:
+    from brotli_asgi import BrotliMiddleware
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
 
 from app.core.config import get_settings
-from app.routes import health, market_data, option_chain, websocket, auth, mcp
+from app.core.http import close_sync_http_client, create_http_client, set_http_client
 
 
 settings = get_settings()
 
+# Router modules as (module name, prefix under api_prefix, tag).
+# Imported inside create_app() only when listed in settings.enabled_routers,
+# so a worker serving a subset of routes skips the heavy service imports.
+ROUTERS = (
+    ("health", "", "Health"),
+    ("auth", "/auth", "Authentication"),
+    ("market_data", "", "Market Data"),
+    ("option_chain", "", "Option Chain"),
+    ("websocket", "", "WebSocket"),
+    ("mcp", "", "Agentic AI (MCP)"),
+    ("strategies", "/strategies", "Strategies"),
+    ("orders", "/orders", "Orders"),
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     print(f"🚀 Starting {settings.app_name} v{settings.app_version}")
+    app.state.http = create_http_client()
+    set_http_client(app.state.http)
     yield
     # Shutdown
+    set_http_client(None)
+    await app.state.http.aclose()
+    close_sync_http_client()
     print(f"👋 Shutting down {settings.app_name}")
 
 
@@ -26,6 +54,7 @@ def create_app() -> FastAPI:
         description="Real-Time Option Intelligence & Market Structure Engine",
         version=settings.app_version,
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
     
     # Configure CORS
@@ -37,17 +66,20 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
-    # Include routers
-    app.include_router(health.router, prefix=settings.api_prefix, tags=["Health"])
-    app.include_router(auth.router, prefix=f"{settings.api_prefix}/auth", tags=["Authentication"])
-    app.include_router(market_data.router, prefix=settings.api_prefix, tags=["Market Data"])
-    app.include_router(option_chain.router, prefix=settings.api_prefix, tags=["Option Chain"])
-    app.include_router(websocket.router, prefix=settings.api_prefix, tags=["WebSocket"])
-    app.include_router(mcp.router, prefix=settings.api_prefix, tags=["Agentic AI (MCP)"])
+    # Compress JSON bodies (chains/scanner/heatmap/sentiment); brotli falls back to gzip.
+    # Responses that already set Content-Encoding (e.g. /options/chain) pass through.
+    if HAS_BROTLI:
+        app.add_middleware(BrotliMiddleware, minimum_size=512)
+    else:
+        app.add_middleware(GZipMiddleware, minimum_size=512)
     
-    # Strategies
-    from app.routes import strategies
-    app.include_router(strategies.router, prefix=settings.api_prefix, tags=["Strategies"])
+    # Include routers (lazy import per enabled router)
+    enabled = set(settings.enabled_routers)
+    for name, prefix, tag in ROUTERS:
+        if name not in enabled:
+            continue
+        module = importlib.import_module(f"app.routes.{name}")
+        app.include_router(module.router, prefix=f"{settings.api_prefix}{prefix}", tags=[tag])
     
     return app
 
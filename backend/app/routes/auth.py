@@ -1,15 +1,20 @@
-from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from typing import Optional
+from pydantic import BaseModel, Field
 
-from app.services.fyers_auth import get_auth_service
+from app.services.fyers_auth import FyersAuthService, get_auth_service
 
-router = APIRouter()
-auth_service = get_auth_service()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+class AuthCodeRequest(BaseModel):
+    """Request model for manual auth code submission"""
+    auth_code: str = Field(..., min_length=1)
 
 
 @router.get("/login")
-async def login():
+async def login(auth_service: FyersAuthService = Depends(get_auth_service)):
     """
     Get Fyers login URL.
     Redirects user to Fyers OAuth page.
@@ -19,7 +24,11 @@ async def login():
 
 
 @router.get("/callback")
-async def callback(code: str = Query(...), state: Optional[str] = None):
+async def callback(
+    code: str = Query(...),
+    state: Optional[str] = None,
+    auth_service: FyersAuthService = Depends(get_auth_service)
+):
     """
     OAuth callback handler.
     Exchanges auth code for access token.
@@ -38,7 +47,7 @@ async def callback(code: str = Query(...), state: Optional[str] = None):
 
 
 @router.get("/status")
-async def get_status():
+async def get_status(auth_service: FyersAuthService = Depends(get_auth_service)):
     """
     Check current authentication status.
     """
@@ -46,7 +55,7 @@ async def get_status():
 
 
 @router.post("/refresh")
-async def refresh_token():
+async def refresh_token(auth_service: FyersAuthService = Depends(get_auth_service)):
     """
     Refresh/validate the current token.
     """
@@ -55,18 +64,19 @@ async def refresh_token():
 
 
 @router.post("/reload-settings")
-async def reload_settings_endpoint():
+async def reload_settings_endpoint(auth_service: FyersAuthService = Depends(get_auth_service)):
     """
     Force reload settings from .env file.
     """
     from app.core.config import reload_settings
-    new_settings = reload_settings()
-    auth_service.settings = new_settings
+    # Services read settings_ref.current, so the swap reaches all of them
+    reload_settings()
+    auth_service.invalidate_auth_cache()
     return {"status": "success", "message": "Settings reloaded from .env"}
 
 
 @router.post("/auto-login")
-async def auto_login():
+async def auto_login(auth_service: FyersAuthService = Depends(get_auth_service)):
     """
     Attempt automated login using TOTP (if configured).
     """
@@ -78,7 +88,10 @@ async def auto_login():
 
 
 @router.post("/token")
-async def submit_auth_code(request: Request):
+async def submit_auth_code(
+    payload: AuthCodeRequest,
+    auth_service: FyersAuthService = Depends(get_auth_service)
+):
     """
     Submit auth code manually to generate access token.
     
@@ -89,21 +102,15 @@ async def submit_auth_code(request: Request):
     Copy the auth_code value and submit it.
     """
     try:
-        body = await request.json()
-        auth_code = body.get("auth_code")
-        
-        if not auth_code:
-            raise HTTPException(status_code=400, detail="auth_code is required")
-        
-        success, message, token = auth_service.handle_callback(auth_code)
-        
-        if success:
-            return {
-                "status": "success",
-                "message": message,
-                "info": "Access token saved to .env file"
-            }
-        else:
-            raise HTTPException(status_code=400, detail=message)
+        success, message, token = auth_service.handle_callback(payload.auth_code)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    if not success:
+        raise HTTPException(status_code=400, detail=message)
+    
+    return {
+        "status": "success",
+        "message": message,
+        "info": "Access token saved to .env file"
+    }
@@ -1,16 +1,36 @@
-from fastapi import APIRouter, HTTPException, Query, Body
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Query, Body, Depends
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, AsyncIterator, Dict, Literal, Optional, List
+from datetime import datetime
+import asyncio
+import bisect
+import heapq
+from operator import itemgetter
+import numpy as np
+import orjson
 from pydantic import BaseModel
 
-from app.services.fyers_market import get_market_service
-from app.services.fno_intelligence import get_intelligence_engine
-from app.services.fno_stocks import get_fno_stocks, TOP_FNO_STOCKS
-from app.services.high_volume_scanner import get_scanner_service
+from app.services.fyers_market import FyersMarketService, get_market_service
+from app.services.fno_intelligence import FNOIntelligenceEngine, get_intelligence_engine
+from app.services.fno_stocks import get_fno_stocks
+from app.services.high_volume_scanner import HighVolumeScannerService, get_scanner_service
 
-router = APIRouter()
-market_service = get_market_service()
-intelligence_engine = get_intelligence_engine()
-scanner_service = get_scanner_service()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Fyers allows ~10 API requests per second; scans keep at most this many
+# option chain fetches in flight so a wide scan doesn't trip the rate limit
+SCAN_CONCURRENCY = 10
+
+# Values accepted by the Fyers history API / the volume scanner
+Resolution = Literal["1", "5", "15", "30", "60", "D", "W", "M"]
+ScanTimeframe = Literal["15", "60"]
+
+# Per-option fields copied into greeks heatmap rows (in output order)
+_HEATMAP_FIELDS = ("delta", "gamma", "theta", "vega", "iv", "oi", "ltp")
+_HEATMAP_DEFAULTS = dict.fromkeys(_HEATMAP_FIELDS, 0)
+_heatmap_values = itemgetter(*_HEATMAP_FIELDS)
+_CALL_KEYS = tuple(f"call_{f}" for f in _HEATMAP_FIELDS)
+_PUT_KEYS = tuple(f"put_{f}" for f in _HEATMAP_FIELDS)
 
 
 class BulkAnalysisRequest(BaseModel):
@@ -19,9 +39,12 @@ class BulkAnalysisRequest(BaseModel):
 
 
 @router.get("/market/spot/{symbol}")
-async def get_spot_price(symbol: str):
+async def get_spot_price(
+    symbol: str,
+    market_service: FyersMarketService = Depends(get_market_service)
+):
     """Get current spot price for a symbol."""
-    result = market_service.get_spot_price(symbol)
+    result = await market_service.aget_spot_price(symbol)
     if result.get("success"):
         return result
     else:
@@ -29,7 +52,11 @@ async def get_spot_price(symbol: str):
 
 
 @router.get("/market/state")
-async def get_market_state(symbol: str = Query("NSE:NIFTY50-INDEX", description="Symbol to analyze")):
+async def get_market_state(
+    symbol: str = Query("NSE:NIFTY50-INDEX", description="Symbol to analyze"),
+    market_service: FyersMarketService = Depends(get_market_service),
+    intelligence_engine: FNOIntelligenceEngine = Depends(get_intelligence_engine)
+):
     """
     Get market state analysis using the F&O Intelligence Engine.
     
@@ -38,7 +65,7 @@ async def get_market_state(symbol: str = Query("NSE:NIFTY50-INDEX", description=
         confidence level, analysis details, and trading signals.
     """
     # Get fresh option chain data
-    chain_data = market_service.get_option_chain(symbol, strike_count=10)
+    chain_data = await market_service.get_option_chain_cached(symbol, strike_count=10)
     
     if not chain_data.get("success"):
         raise HTTPException(status_code=400, detail=chain_data.get("error", "Failed to fetch option chain"))
@@ -53,7 +80,9 @@ async def get_market_state(symbol: str = Query("NSE:NIFTY50-INDEX", description=
 async def scan_fno_stocks(
     limit: int = Query(20, ge=1, le=50, description="Maximum number of stocks to return"),
     tradable_only: bool = Query(False, description="Only return TREND/ADJUSTMENT stocks"),
-    top_only: bool = Query(True, description="Scan only top 20 high-volume stocks")
+    top_only: bool = Query(True, description="Scan only top 20 high-volume stocks"),
+    market_service: FyersMarketService = Depends(get_market_service),
+    intelligence_engine: FNOIntelligenceEngine = Depends(get_intelligence_engine)
 ):
     """
     Scan F&O stocks and return analysis using real market data.
@@ -64,54 +93,60 @@ async def scan_fno_stocks(
     Returns:
         List of stock analyses sorted by tradability and confidence.
     """
-    from datetime import datetime
+    # Get stock list (sliced once, reused for iteration and total_scanned)
+    selected = get_fno_stocks(top_only)[:limit]
     
-    # Get stock list
-    stocks = TOP_FNO_STOCKS if top_only else get_fno_stocks()[:limit]
+    # Fetch symbols concurrently, at most SCAN_CONCURRENCY upstream calls at a time
+    # Fyers provides LTP and OI even when the market is closed
+    limiter = asyncio.Semaphore(SCAN_CONCURRENCY)
+    
+    async def _fetch(symbol: str) -> Dict[str, Any]:
+        async with limiter:
+            return await market_service.get_option_chain_cached(symbol, 5)
+    
+    chains_raw = await asyncio.gather(
+        *[_fetch(symbol) for symbol in selected],
+        return_exceptions=True
+    )
     
     results = []
     errors = []
+    fetched = []
+    
+    for symbol, chain_data in zip(selected, chains_raw):
+        if isinstance(chain_data, Exception):
+            errors.append({"symbol": symbol, "error": str(chain_data)})
+        elif not chain_data.get("success"):
+            errors.append({"symbol": symbol, "error": chain_data.get("error", "Failed to fetch real market data")})
+        else:
+            fetched.append((symbol, chain_data))
+    
+    # Analyze every fetched chain in one batch, skipping time restrictions for scanning.
+    # Runs in a worker thread so a full-universe scan doesn't stall the event loop.
+    analyses = await asyncio.to_thread(
+        intelligence_engine.analyze_batch, [chain_data for _, chain_data in fetched]
+    )
+    
+    for (symbol, _), analysis in zip(fetched, analyses):
+        if "error" in analysis:
+            errors.append({"symbol": symbol, "error": analysis.get("error")})
+        else:
+            results.append(analysis)
     
-    for symbol in stocks[:limit]:
-        try:
-            # Always fetch real chain data from Fyers
-            # Fyers provides LTP and OI even when the market is closed
-            chain_data = market_service.get_option_chain(symbol, strike_count=5)
-            
-            if chain_data.get("success"):
-                # Analyze using real data, skipping time restrictions for scanning
-                analysis = intelligence_engine.analyze_stock(symbol, chain_data)
-                
-                if "error" not in analysis:
-                    results.append(analysis)
-                else:
-                    errors.append({"symbol": symbol, "error": analysis.get("error")})
-            else:
-                errors.append({
-                    "symbol": symbol, 
-                    "error": chain_data.get("error", "Failed to fetch real market data")
-                })
-                
-        except Exception as e:
-            errors.append({"symbol": symbol, "error": str(e)})
-    
-    # Sort by tradability (tradable first) and then by confidence
-    results.sort(key=lambda x: (
-        0 if x.get("tradable") else 1,
-        -(x.get("confidence") or 0)
-    ))
-    
-    # Filter if tradable_only
     if tradable_only:
         results = [r for r in results if r.get("tradable")]
     
-    # Limit results
-    results = results[:limit]
+    # Top `limit` rows: tradable first, then by confidence (bounded heap, no full sort)
+    results = heapq.nsmallest(
+        limit,
+        results,
+        key=lambda x: (0 if x.get("tradable") else 1, -(x.get("confidence") or 0))
+    )
     
     return {
         "success": True,
         "count": len(results),
-        "total_scanned": len(stocks[:limit]),
+        "total_scanned": len(selected),
         "tradable_count": sum(1 for r in results if r.get("tradable")),
         "stocks": results,
         "errors": errors if errors else None,
@@ -120,9 +155,11 @@ async def scan_fno_stocks(
 
 
 @router.get("/market/indices")
-async def get_indices():
+async def get_indices(
+    market_service: FyersMarketService = Depends(get_market_service)
+):
     """Get major market indices data."""
-    result = market_service.get_indices()
+    result = await market_service.aget_indices()
     if result.get("success"):
         return result
     else:
@@ -133,11 +170,12 @@ async def get_indices():
 @router.get("/market/history/{symbol}")
 async def get_history(
     symbol: str,
-    resolution: str = "D",
-    days: int = 30
+    resolution: Resolution = Query("D", description="Candle resolution: 1/5/15/30/60 minutes or D/W/M"),
+    days: int = 30,
+    market_service: FyersMarketService = Depends(get_market_service)
 ):
     """Get historical OHLCV data."""
-    result = market_service.get_historical_data(symbol, resolution, days=days)
+    result = await market_service.aget_historical_data(symbol, resolution, days=days)
     if result.get("success"):
         return result
     else:
@@ -146,8 +184,9 @@ async def get_history(
 
 @router.get("/market/high-volume-scan")
 async def scan_high_volume_stocks(
-    timeframe: str = Query("15", description="Timeframe in minutes: 15 or 60"),
-    top_count: int = Query(5, ge=1, le=20, description="Number of top stocks to return")
+    timeframe: ScanTimeframe = Query("15", description="Timeframe in minutes: 15 or 60"),
+    top_count: int = Query(5, ge=1, le=20, description="Number of top stocks to return"),
+    scanner_service: HighVolumeScannerService = Depends(get_scanner_service)
 ):
     """
     Scan all F&O stocks for high volume buying activity.
@@ -165,8 +204,6 @@ async def scan_high_volume_stocks(
     Returns:
         Dict with total scanned, high volume count, and top stocks with metrics
     """
-    import asyncio
-    
     try:
         result = await scanner_service.scan_high_volume_stocks(
             timeframe=timeframe,
@@ -178,12 +215,14 @@ async def scan_high_volume_stocks(
 
 
 @router.get("/market/fno-stocks")
-async def get_fno_stocks_list():
+async def get_fno_stocks_list(
+    scanner_service: HighVolumeScannerService = Depends(get_scanner_service)
+):
     """
     Get list of all F&O stocks with cap classification.
     
     Returns:
-        List of all FNO stocks with symbol, name, and cap (LARGE_CAP/MID_CAP)
+        List of all FNO stocks with symbol, name, cap (LARGE_CAP/MID_CAP) and sector
     """
     try:
         stocks = scanner_service.get_all_fno_stocks()
@@ -198,7 +237,8 @@ async def get_fno_stocks_list():
 
 @router.post("/market/bulk-oc-analysis")
 async def bulk_option_chain_analysis(
-    request: BulkAnalysisRequest
+    request: BulkAnalysisRequest,
+    scanner_service: HighVolumeScannerService = Depends(get_scanner_service)
 ):
     """
     Perform deep option chain analysis for multiple stocks.
@@ -215,8 +255,6 @@ async def bulk_option_chain_analysis(
     Returns:
         Ranked list of stocks with composite scores and detailed reasons
     """
-    import asyncio
-    
     if not request.symbols:
         raise HTTPException(status_code=400, detail="No symbols provided")
     
@@ -232,6 +270,68 @@ async def bulk_option_chain_analysis(
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+def _sse_event(payload: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    """Encode one Server-Sent Event frame."""
+    data = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + data + b"\n\n"
+
+
+@router.post("/market/bulk-oc-analysis/stream")
+async def stream_bulk_option_chain_analysis(
+    request: BulkAnalysisRequest,
+    scanner_service: HighVolumeScannerService = Depends(get_scanner_service)
+):
+    """
+    Stream bulk option chain analysis as Server-Sent Events.
+    
+    Each symbol's result (or error) is sent as soon as it completes. A final
+    `done` event carries the symbols ranked by composite score.
+    
+    Args:
+        symbols: List of stock symbols to analyze (max 20)
+        
+    Returns:
+        text/event-stream of per-symbol analysis rows
+    """
+    if not request.symbols:
+        raise HTTPException(status_code=400, detail="No symbols provided")
+    
+    if len(request.symbols) > 20:
+        raise HTTPException(status_code=400, detail="Maximum 20 symbols allowed per request")
+    
+    async def _events() -> AsyncIterator[bytes]:
+        tasks = [
+            asyncio.create_task(scanner_service.analyze_symbol_option_chain(symbol))
+            for symbol in request.symbols
+        ]
+        scores = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                row = await next_done
+                if "error" not in row:
+                    scores.append((row["composite_score"], row["symbol"]))
+                yield _sse_event(row)
+        finally:
+            # Client went away mid-stream: don't leave fetches running
+            for task in tasks:
+                task.cancel()
+        
+        scores.sort(reverse=True)
+        yield _sse_event({
+            "success": True,
+            "total_analyzed": len(tasks),
+            "ranking": [symbol for _, symbol in scores],
+            "timestamp": datetime.now().isoformat()
+        }, event="done")
+    
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/market/nifty-sentiment")
 async def get_nifty_sentiment():
     """
@@ -247,7 +347,12 @@ async def get_nifty_sentiment():
 
 
 @router.get("/market/live-trade-signal/{symbol}")
-async def get_live_trade_signal(symbol: str):
+async def get_live_trade_signal(
+    symbol: str,
+    market_service: FyersMarketService = Depends(get_market_service),
+    intelligence_engine: FNOIntelligenceEngine = Depends(get_intelligence_engine),
+    scanner_service: HighVolumeScannerService = Depends(get_scanner_service)
+):
     """
     Get live trade signal for a specific symbol.
     
@@ -256,7 +361,7 @@ async def get_live_trade_signal(symbol: str):
     """
     try:
         # Fetch fresh option chain
-        chain_data = market_service.get_option_chain(symbol, strike_count=20)
+        chain_data = await market_service.get_option_chain_cached(symbol, strike_count=20)
         
         if not chain_data.get("success"):
             raise HTTPException(status_code=400, detail=chain_data.get("error", "Failed to fetch OC"))
@@ -299,7 +404,8 @@ async def get_live_trade_signal(symbol: str):
 @router.get("/market/greeks-heatmap/{symbol}")
 async def get_greeks_heatmap(
     symbol: str,
-    strike_count: int = Query(15, ge=5, le=30, description="Number of strikes to include")
+    strike_count: int = Query(15, ge=5, le=30, description="Number of strikes to include"),
+    market_service: FyersMarketService = Depends(get_market_service)
 ):
     """
     Get Greeks heatmap data for visualization.
@@ -307,7 +413,7 @@ async def get_greeks_heatmap(
     Returns:
         Strike-wise Delta, Gamma, Theta, Vega for both CE and PE
     """
-    chain_data = market_service.get_option_chain(symbol, strike_count=strike_count)
+    chain_data = await market_service.get_option_chain_cached(symbol, strike_count=strike_count)
     
     if not chain_data.get("success"):
         raise HTTPException(status_code=400, detail=chain_data.get("error", "Failed to fetch OC"))
@@ -316,41 +422,42 @@ async def get_greeks_heatmap(
     atm_strike = chain_data.get("atm_strike") or 0
     chain = chain_data.get("chain", [])
     
+    # Chain is sorted by strike: ITM boundaries are two index cut-offs
+    strikes = [s.get("strike_price", 0) for s in chain]
+    ce_itm_end = bisect.bisect_left(strikes, spot_price)
+    pe_itm_start = bisect.bisect_right(strikes, spot_price)
+    
     heatmap_data = []
-    for strike_data in chain:
-        strike = strike_data.get("strike_price", 0)
-        call = strike_data.get("call", {}) or {}
-        put = strike_data.get("put", {}) or {}
+    for i, strike_data in enumerate(chain):
+        strike = strikes[i]
+        # One merge + one itemgetter per side instead of 7 .get() calls each
+        call_values = _heatmap_values({**_HEATMAP_DEFAULTS, **(strike_data.get("call") or {})})
+        put_values = _heatmap_values({**_HEATMAP_DEFAULTS, **(strike_data.get("put") or {})})
         
-        heatmap_data.append({
+        row = {
             "strike": strike,
             "is_atm": strike == atm_strike,
-            "is_itm_ce": strike < spot_price,
-            "is_itm_pe": strike > spot_price,
-            "call_delta": call.get("delta") or 0,
-            "call_gamma": call.get("gamma") or 0,
-            "call_theta": call.get("theta") or 0,
-            "call_vega": call.get("vega") or 0,
-            "call_iv": call.get("iv") or 0,
-            "call_oi": call.get("oi") or 0,
-            "call_ltp": call.get("ltp") or 0,
-            "put_delta": put.get("delta") or 0,
-            "put_gamma": put.get("gamma") or 0,
-            "put_theta": put.get("theta") or 0,
-            "put_vega": put.get("vega") or 0,
-            "put_iv": put.get("iv") or 0,
-            "put_oi": put.get("oi") or 0,
-            "put_ltp": put.get("ltp") or 0
-        })
-    
-    # Find max gamma strike (key pivot point)
-    max_gamma_strike = max(heatmap_data, key=lambda x: abs(x["call_gamma"]) + abs(x["put_gamma"]), default=None)
+            "is_itm_ce": i < ce_itm_end,
+            "is_itm_pe": i >= pe_itm_start,
+        }
+        row.update(zip(_CALL_KEYS, (v or 0 for v in call_values)))
+        row.update(zip(_PUT_KEYS, (v or 0 for v in put_values)))
+        heatmap_data.append(row)
+    
+    # Find max gamma strike (key pivot point) with one vectorized reduction
+    max_gamma_strike = None
+    if heatmap_data:
+        n = len(heatmap_data)
+        call_gamma = np.fromiter((row["call_gamma"] for row in heatmap_data), dtype=np.float64, count=n)
+        put_gamma = np.fromiter((row["put_gamma"] for row in heatmap_data), dtype=np.float64, count=n)
+        gamma_sum = np.abs(call_gamma) + np.abs(put_gamma)
+        max_gamma_strike = heatmap_data[int(gamma_sum.argmax())]["strike"]
     
     return {
         "symbol": symbol,
         "spot_price": spot_price,
         "atm_strike": atm_strike,
-        "max_gamma_strike": max_gamma_strike.get("strike") if max_gamma_strike else None,
+        "max_gamma_strike": max_gamma_strike,
         "heatmap": heatmap_data,
         "timestamp": chain_data.get("timestamp")
     }
@@ -6,15 +6,131 @@ Supports Claude Desktop, Cursor, and other MCP-compatible AI assistants.
 """
 
 from fastapi import APIRouter, Request, HTTPException, Depends
-from fastapi.responses import StreamingResponse
-from typing import Any, Dict, List, Optional
-import json
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field, conlist, field_validator
+import hashlib
 import asyncio
+import orjson
 
+from app.core.config import get_settings
 from app.services.mcp_service import get_mcp_service
-from app.services.fyers_auth import get_auth_service
+from app.services.fyers_auth import FyersAuthService, get_auth_service
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+class ToolCall(BaseModel):
+    """MCP 'tools/call' request body."""
+    name: str = Field(..., min_length=1)
+    arguments: Dict[str, Any] = Field(default_factory=dict)
+    
+    @field_validator("arguments", mode="before")
+    @classmethod
+    def _null_arguments(cls, value: Any) -> Any:
+        # Some MCP clients send "arguments": null for no-arg tools
+        return {} if value is None else value
+
+
+class BatchCall(BaseModel):
+    """Batch of tool calls (1-10) executed in one request."""
+    calls: conlist(ToolCall, min_length=1, max_length=10)
+
+
+def _encode_static(payload: Dict[str, Any]) -> Tuple[bytes, str]:
+    """Encode a static payload once; returns (JSON body, strong ETag of that body)."""
+    body = orjson.dumps(payload)
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 7232 If-None-Match check (handles lists, weak tags and '*')."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _cached_json(request: Request, body: bytes, etag: str) -> Response:
+    """Serve a pre-encoded JSON body with caching headers, or 304 if the client has it."""
+    headers = {"Cache-Control": "public, max-age=3600", "ETag": etag}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _build_mcp_config(server_url: str) -> Dict[str, Any]:
+    """Build the client configuration snippets for a given server URL."""
+    return {
+        "server_url": server_url,
+        "configurations": {
+            "claude_desktop": {
+                "mcpServers": {
+                    "optiongreek": {
+                        "url": f"{server_url}/mcp",
+                        "type": "http",
+                        "name": "OptionGreek Trading"
+                    }
+                }
+            },
+            "cursor": {
+                "mcp": {
+                    "servers": {
+                        "optiongreek": {
+                            "url": f"{server_url}/mcp",
+                            "enabled": True
+                        }
+                    }
+                }
+            }
+        },
+        "instructions": {
+            "claude_desktop": [
+                "1. Open Claude Desktop settings",
+                "2. Go to MCP Servers section", 
+                "3. Add new server with the configuration above",
+                "4. Restart Claude Desktop"
+            ],
+            "cursor": [
+                "1. Open Cursor settings (Cmd/Ctrl + ,)",
+                "2. Search for 'MCP'",
+                "3. Add the server configuration",
+                "4. Reload Cursor"
+            ]
+        },
+        "test_command": f"curl {server_url}/mcp/status"
+    }
+
+
+@lru_cache(maxsize=1)
+def _mcp_config_payload(server_url: str) -> Tuple[bytes, str]:
+    """Encoded MCP config and its ETag, rebuilt only when the server URL changes."""
+    return _encode_static(_build_mcp_config(server_url))
+
+
+@lru_cache(maxsize=1)
+def _tools_payload() -> Tuple[bytes, str]:
+    """Encoded tools manifest and its ETag (call cache_clear() if tools change)."""
+    return _encode_static({"tools": get_mcp_service().get_tools_manifest()})
+
+
+def _error_result(message: str) -> Dict[str, Any]:
+    """MCP-shaped error entry for a single call in a batch."""
+    return {"isError": True, "content": [{"type": "text", "text": message}]}
+
+
+async def _run_concurrently(mcp, calls: List[ToolCall]) -> List[Any]:
+    """Run tool calls concurrently; results (or exceptions) in call order."""
+    if not calls:
+        return []
+    return await asyncio.gather(
+        *[mcp.call_tool(call.name, call.arguments) for call in calls],
+        return_exceptions=True
+    )
 
 
 def get_mcp():
@@ -22,15 +138,15 @@ def get_mcp():
     return get_mcp_service()
 
 
-def check_auth():
+async def check_auth(auth: FyersAuthService = Depends(get_auth_service)):
     """Dependency to check authentication status."""
-    auth = get_auth_service()
-    status = auth.get_auth_status()
+    # get_auth_status may hit the Fyers profile API on a cache miss
+    status = await asyncio.to_thread(auth.get_auth_status)
     return status.get("authenticated", False)
 
 
 @router.get("/mcp/tools")
-async def list_tools(mcp=Depends(get_mcp)):
+async def list_tools(request: Request):
     """
     List all available tools for AI agents.
     Conforms to MCP 'tools/list' specification.
@@ -38,13 +154,12 @@ async def list_tools(mcp=Depends(get_mcp)):
     Returns:
         List of tools with names, descriptions, and input schemas
     """
-    return {
-        "tools": mcp.get_tools_manifest()
-    }
+    body, etag = _tools_payload()
+    return _cached_json(request, body, etag)
 
 
 @router.post("/mcp/call")
-async def call_tool(request: Request, mcp=Depends(get_mcp)):
+async def call_tool(payload: ToolCall, mcp=Depends(get_mcp)):
     """
     Execute a tool call from an AI agent.
     Conforms to MCP 'tools/call' specification.
@@ -58,33 +173,27 @@ async def call_tool(request: Request, mcp=Depends(get_mcp)):
     Returns:
         Tool execution result with content array
     """
+    if not mcp.has_tool(payload.name):
+        raise HTTPException(status_code=404, detail=f"Tool '{payload.name}' not found")
+    
     try:
-        body = await request.json()
-        tool_name = body.get("name")
-        arguments = body.get("arguments", {})
-        
-        if not tool_name:
-            raise HTTPException(status_code=400, detail="Tool name is required")
-        
-        result = await mcp.call_tool(tool_name, arguments)
-        return result
-        
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
+        return await mcp.call_tool(payload.name, payload.arguments)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/mcp/status")
-async def get_mcp_status(is_authenticated: bool = Depends(check_auth)):
+async def get_mcp_status(
+    is_authenticated: bool = Depends(check_auth),
+    auth: FyersAuthService = Depends(get_auth_service)
+):
     """
     Get MCP server status and authentication state.
     
     Returns:
         Server status, authentication state, and available capabilities
     """
-    auth = get_auth_service()
-    auth_status = auth.get_auth_status()
+    auth_status = await asyncio.to_thread(auth.get_auth_status)
     
     return {
         "server": "OptionGreek MCP Server",
@@ -103,7 +212,7 @@ async def get_mcp_status(is_authenticated: bool = Depends(check_auth)):
 
 
 @router.get("/mcp/config")
-async def get_mcp_config():
+async def get_mcp_config(request: Request):
     """
     Returns configuration snippets for AI clients.
     
@@ -112,52 +221,12 @@ async def get_mcp_config():
     - Cursor IDE
     - Custom MCP clients
     """
-    # Base server URL (update for production)
-    server_url = "http://localhost:8000/api/v1"
-    
-    return {
-        "server_url": server_url,
-        "configurations": {
-            "claude_desktop": {
-                "mcpServers": {
-                    "optiongreek": {
-                        "url": f"{server_url}/mcp",
-                        "type": "http",
-                        "name": "OptionGreek Trading"
-                    }
-                }
-            },
-            "cursor": {
-                "mcp": {
-                    "servers": {
-                        "optiongreek": {
-                            "url": f"{server_url}/mcp",
-                            "enabled": True
-                        }
-                    }
-                }
-            }
-        },
-        "instructions": {
-            "claude_desktop": [
-                "1. Open Claude Desktop settings",
-                "2. Go to MCP Servers section", 
-                "3. Add new server with the configuration above",
-                "4. Restart Claude Desktop"
-            ],
-            "cursor": [
-                "1. Open Cursor settings (Cmd/Ctrl + ,)",
-                "2. Search for 'MCP'",
-                "3. Add the server configuration",
-                "4. Reload Cursor"
-            ]
-        },
-        "test_command": f"curl {server_url}/mcp/status"
-    }
+    body, etag = _mcp_config_payload(get_settings().mcp_server_url)
+    return _cached_json(request, body, etag)
 
 
 @router.post("/mcp/batch")
-async def batch_call(request: Request, mcp=Depends(get_mcp)):
+async def batch_call(payload: BatchCall, mcp=Depends(get_mcp)):
     """
     Execute multiple tool calls in a single request.
     Useful for reducing latency when multiple operations are needed.
@@ -174,31 +243,27 @@ async def batch_call(request: Request, mcp=Depends(get_mcp)):
         Array of results for each tool call
     """
     try:
-        body = await request.json()
-        calls = body.get("calls", [])
-        
-        if not calls:
-            raise HTTPException(status_code=400, detail="No tool calls provided")
-        
-        if len(calls) > 10:
-            raise HTTPException(status_code=400, detail="Maximum 10 calls per batch")
-        
-        results = []
-        for call in calls:
-            tool_name = call.get("name")
-            arguments = call.get("arguments", {})
-            
-            if not tool_name:
-                results.append({"isError": True, "content": [{"type": "text", "text": "Missing tool name"}]})
+        # Runs of read-only calls go concurrently; an order-changing call
+        # waits for everything before it and finishes before anything after
+        # it starts, so side effects keep the request order
+        outcomes: List[Any] = []
+        reads: List[ToolCall] = []
+        for call in payload.calls:
+            if not mcp.is_mutating(call.name):
+                reads.append(call)
                 continue
-            
-            result = await mcp.call_tool(tool_name, arguments)
-            results.append(result)
+            outcomes += await _run_concurrently(mcp, reads)
+            reads = []
+            outcomes += await _run_concurrently(mcp, [call])
+        outcomes += await _run_concurrently(mcp, reads)
+        
+        results = [
+            _error_result(str(outcome)) if isinstance(outcome, Exception) else outcome
+            for outcome in outcomes
+        ]
         
         return {"results": results}
         
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
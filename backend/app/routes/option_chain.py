@@ -1,16 +1,52 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, Literal
+from fastapi import APIRouter, HTTPException, Query, Depends, Request
+from fastapi.responses import ORJSONResponse, Response
+from typing import Any, Dict, Optional, Literal
+import gzip
+import orjson
 
-from app.services.fyers_market import get_market_service
+from app.services.fyers_market import FyersMarketService, get_market_service
 
-router = APIRouter()
-market_service = get_market_service()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Raw chain views want near-live data; coalesce only bursts within this window
+CHAIN_VIEW_TTL = 1.0  # seconds
+
+# (symbol, strike_count) -> (chain result, JSON body, gzipped body)
+_encoded_chains: Dict[tuple, tuple] = {}
+_ENCODED_CHAINS_MAX = 256
+
+
+def _chain_response(request: Request, key: tuple, result: Dict[str, Any]) -> Response:
+    """
+    JSON response for a chain result, encoded and gzipped once per cache entry.
+    
+    Cache hits return the same result object, so repeat requests within the
+    TTL reuse the stored bytes instead of re-encoding/re-compressing.
+    """
+    entry = _encoded_chains.get(key)
+    if entry is None or entry[0] is not result:
+        body = orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)
+        entry = (result, body, gzip.compress(body, compresslevel=6))
+        _encoded_chains.pop(key, None)
+        if len(_encoded_chains) >= _ENCODED_CHAINS_MAX:
+            del _encoded_chains[next(iter(_encoded_chains))]
+        _encoded_chains[key] = entry
+    
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=entry[2],
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+    return Response(content=entry[1], media_type="application/json")
 
 
 @router.get("/options/chain/{symbol}")
 async def get_option_chain(
+    request: Request,
     symbol: str,
-    strike_count: int = Query(10, description="Number of strikes above/below ATM")
+    strike_count: int = Query(10, description="Number of strikes above/below ATM"),
+    market_service: FyersMarketService = Depends(get_market_service)
 ):
     """Get option chain for a symbol.
     
@@ -18,9 +54,9 @@ async def get_option_chain(
         symbol: The underlying symbol (e.g., NSE:NIFTY50-INDEX, NSE:NIFTYBANK-INDEX)
         strike_count: Number of strikes to include above/below ATM
     """
-    result = market_service.get_option_chain(symbol, strike_count)
+    result = await market_service.get_option_chain_cached(symbol, strike_count, ttl=CHAIN_VIEW_TTL)
     if result.get("success"):
-        return result
+        return _chain_response(request, (symbol, strike_count), result)
     else:
         raise HTTPException(status_code=400, detail=result.get("error", "Failed to fetch option chain"))
 
@@ -28,11 +64,12 @@ async def get_option_chain(
 @router.get("/options/analysis/{symbol}")
 async def analyze_option_structure(
     symbol: str,
+    market_service: FyersMarketService = Depends(get_market_service)
 ):
     """Analyze option structure for anomalies."""
     # This will be implemented in the Option Intelligence Engine
     # For now, we return the base chain data that would be used for analysis
-    result = market_service.get_option_chain(symbol, strike_count=5)
+    result = await market_service.get_option_chain_cached(symbol, strike_count=5, ttl=CHAIN_VIEW_TTL)
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error"))
         
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
+from typing import List
+from pydantic import BaseModel, Field
+
+from app.services.fyers_orders import FyersOrderService, get_order_service
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+@router.get("/dashboard")
+async def get_dashboard(
+    order_service: FyersOrderService = Depends(get_order_service)
+):
+    """
+    Get orders, trades, positions and holdings in one call.
+    
+    The four Fyers reads run concurrently; each section carries its own
+    success/error so a partial failure still returns the rest.
+    """
+    return await order_service.get_dashboard_snapshot()
+
+
+class BasketCancelRequest(BaseModel):
+    """Order ids to cancel; sent to Fyers in baskets of at most BASKET_MAX."""
+    order_ids: List[str] = Field(..., min_length=1)
+
+
+@router.post("/cancel")
+async def cancel_orders(
+    request: BasketCancelRequest,
+    order_service: FyersOrderService = Depends(get_order_service)
+):
+    """
+    Cancel several orders at once.
+    
+    Returns per-basket status and the number of cancellations Fyers confirmed.
+    """
+    return await order_service.acancel_basket_orders(request.order_ids)
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from typing import Optional
 from app.services.strategies.vat import get_vat_strategy
 
-router = APIRouter(prefix="/strategies", tags=["Strategies"])
+router = APIRouter(default_response_class=ORJSONResponse)
 
 @router.get("/vat/scan")
 async def scan_value_adjustment(
@@ -0,0 +1,66 @@
+"""
+Unit Tests for the WebSocket Broadcast Pump
+-------------------------------------------
+Tests per-symbol tick coalescing in BroadcastPump:
+- Latest tick per symbol wins within a flush window
+- Control frames (no "symbol") are never merged or dropped
+"""
+
+import pytest
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from app.routes.websocket import BroadcastPump
+
+
+class TestCoalesce:
+    """Test BroadcastPump._coalesce."""
+    
+    def test_latest_tick_per_symbol_wins(self):
+        batch = [
+            {"symbol": "NSE:SBIN-EQ", "ltp": 800.0},
+            {"symbol": "NSE:TCS-EQ", "ltp": 4000.0},
+            {"symbol": "NSE:SBIN-EQ", "ltp": 801.5},
+        ]
+        result = BroadcastPump._coalesce(batch)
+        assert {"symbol": "NSE:SBIN-EQ", "ltp": 801.5} in result
+        assert {"symbol": "NSE:TCS-EQ", "ltp": 4000.0} in result
+        assert len(result) == 2
+    
+    def test_control_frames_pass_through(self):
+        # "s" is the Fyers status field, not a symbol
+        connect = {"type": "cn", "code": 200, "message": "Authentication done", "s": "ok"}
+        subscribe = {"type": "sub", "code": 11011, "message": "Subscribed", "s": "ok"}
+        error = {"type": "error", "code": -99, "message": "Bad symbol", "s": "error"}
+        tick = {"symbol": "NSE:SBIN-EQ", "ltp": 800.0}
+        
+        result = BroadcastPump._coalesce([connect, tick, subscribe, error])
+        assert result == [connect, tick, subscribe, error]
+
+
+class TestFlushWindow:
+    """Test what one flush window actually broadcasts."""
+    
+    @pytest.mark.asyncio
+    async def test_two_control_frames_in_one_window_both_broadcast(self):
+        pump = BroadcastPump("market_update", batch_size=1000, flush_interval=0.03)
+        connect = {"type": "cn", "code": 200, "message": "Authentication done", "s": "ok"}
+        mode = {"type": "ful", "code": 200, "message": "Full Mode ON", "s": "ok"}
+        
+        with patch("app.routes.websocket.app_manager.broadcast", new_callable=AsyncMock) as broadcast:
+            pump.ensure_started()
+            pump.submit(connect)
+            pump.submit({"symbol": "NSE:SBIN-EQ", "ltp": 800.0})
+            pump.submit(mode)
+            pump.submit({"symbol": "NSE:SBIN-EQ", "ltp": 801.0})
+            await asyncio.sleep(0.1)
+            pump._task.cancel()
+        
+        broadcast.assert_awaited_once_with({
+            "type": "market_update",
+            "data": [connect, {"symbol": "NSE:SBIN-EQ", "ltp": 801.0}, mode]
+        })
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,60 +1,234 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 import asyncio
-import json
+import orjson
+from websockets.exceptions import ConnectionClosed
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
 
 from app.services.fyers_websocket import get_websocket_manager
 
 router = APIRouter()
 ws_manager = get_websocket_manager()
 
+# Send failures that mean the client is gone (RuntimeError: send after close)
+_DEAD_CONNECTION_ERRORS = (WebSocketDisconnect, ConnectionClosed, RuntimeError, OSError)
+
+
+def _encode(message: Any) -> str:
+    """Encode a message as JSON text with orjson (numpy values allowed)."""
+    return orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY, default=str).decode()
+
+
+def _encode_msgpack(message: Any) -> bytes:
+    """Encode a message as a MessagePack binary frame."""
+    return msgpack.packb(message, use_bin_type=True, default=str)
+
+
+def _wire_format(websocket: WebSocket) -> str:
+    """Outgoing frame format requested via ?format=msgpack (JSON otherwise)."""
+    if HAS_MSGPACK and websocket.query_params.get("format") == "msgpack":
+        return "msgpack"
+    return "json"
+
 
 class SocketConnectionManager:
     """Manage application WebSocket connections."""
     
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # websocket -> outgoing frame format ("json" or "msgpack")
+        self.active_connections: Dict[WebSocket, str] = {}
     
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections[websocket] = _wire_format(websocket)
     
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.pop(websocket, None)
+    
+    def frame_format(self, websocket: WebSocket) -> str:
+        """Frame format negotiated by a connected client."""
+        return self.active_connections.get(websocket, "json")
     
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except:
-                self.disconnect(connection)
+        """Send one message to every client concurrently (encoded once per format)."""
+        if not self.active_connections:
+            return
+        
+        connections = tuple(self.active_connections.items())
+        text_frame: Optional[str] = None
+        binary_frame: Optional[bytes] = None
+        sends = []
+        for connection, frame_format in connections:
+            if frame_format == "msgpack":
+                if binary_frame is None:
+                    binary_frame = _encode_msgpack(message)
+                sends.append(connection.send_bytes(binary_frame))
+            else:
+                # Text frame: the frontend JSON.parse()s event.data
+                if text_frame is None:
+                    text_frame = _encode(message)
+                sends.append(connection.send_text(text_frame))
+        
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        
+        dead = []
+        for (connection, _), result in zip(connections, results):
+            if isinstance(result, _DEAD_CONNECTION_ERRORS):
+                dead.append(connection)
+            elif isinstance(result, BaseException):
+                print(f"WebSocket send error: {result!r}")
+        
+        for connection in dead:
+            self.disconnect(connection)
 
 
 app_manager = SocketConnectionManager()
 
 
+async def _send(websocket: WebSocket, message: dict):
+    """Send a frame in the client's negotiated format (orjson text by default)."""
+    if app_manager.frame_format(websocket) == "msgpack":
+        await websocket.send_bytes(_encode_msgpack(message))
+    else:
+        await websocket.send_text(_encode(message))
+
+
+async def _receive(websocket: WebSocket) -> dict:
+    """Receive a JSON text frame decoded with orjson (control messages are always JSON)."""
+    return orjson.loads(await websocket.receive_text())
+
+
+class BroadcastPump:
+    """
+    Bounded queue between Fyers SDK callbacks and app_manager.broadcast.
+    
+    Fyers invokes callbacks on its own thread; submit() hands messages to the
+    event loop thread-safely. A single consumer task drains the queue and
+    broadcasts either a batch (data=[...]) or one message at a time. When the
+    queue is full the oldest message is dropped.
+    
+    With flush_interval set, the consumer waits that long after the first
+    message so ticks accumulate, and keeps only the latest tick per symbol.
+    """
+    
+    def __init__(
+        self,
+        message_type: str,
+        maxsize: int = 1000,
+        batch_size: int = 64,
+        batched: bool = True,
+        flush_interval: float = 0.0
+    ):
+        self.message_type = message_type
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.batched = batched
+        self.flush_interval = flush_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+    
+    def ensure_started(self):
+        """Start the consumer task (must be called from the event loop)."""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = self._loop.create_task(self._run())
+    
+    def submit(self, message: Any):
+        """Enqueue a message; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._put, message)
+    
+    def _put(self, message: Any):
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._queue.get_nowait()  # drop oldest
+            self._queue.put_nowait(message)
+    
+    @staticmethod
+    def _coalesce(batch: List[Any]) -> List[Any]:
+        """
+        Keep the latest tick per symbol; anything without a "symbol" (connect,
+        mode, subscribe and error control frames) passes through unchanged.
+        """
+        latest: Dict[Any, Any] = {}
+        for message in batch:
+            key = message.get("symbol") if isinstance(message, dict) else None
+            latest[key if key is not None else id(message)] = message
+        return list(latest.values())
+    
+    async def _run(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            if self.flush_interval:
+                await asyncio.sleep(self.flush_interval)
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            if self.flush_interval:
+                batch = self._coalesce(batch)
+            
+            try:
+                if self.batched:
+                    await app_manager.broadcast({"type": self.message_type, "data": batch})
+                else:
+                    for message in batch:
+                        await app_manager.broadcast({"type": self.message_type, "data": message})
+            except Exception as e:
+                print(f"WebSocket broadcast error: {str(e)}")
+
+
+# Market ticks: latest per symbol, flushed every ~30ms as one array frame.
+# Alerts stay one per frame.
+market_pump = BroadcastPump("market_update", batch_size=1000, flush_interval=0.03)
+alert_pump = BroadcastPump("alert", maxsize=200, batched=False)
+
+# One subscriber per channel for the whole process; fan-out to clients happens
+# once per frame in app_manager.broadcast, so connects never touch ws_manager.
+ws_manager.add_subscriber("market_data", market_pump.submit)
+ws_manager.add_subscriber("orders", alert_pump.submit)
+ws_manager.add_subscriber("trades", alert_pump.submit)
+
+# Connected clients per Fyers stream; the stream is stopped when it drops to 0
+_stream_clients: Dict[str, int] = {"market": 0, "alerts": 0}
+
+
+def _release_stream(channel: str):
+    """Drop one client from a stream and stop the Fyers socket when it was the last."""
+    _stream_clients[channel] = max(0, _stream_clients[channel] - 1)
+    if _stream_clients[channel]:
+        return
+    if channel == "market":
+        ws_manager.stop_data_stream()
+    else:
+        ws_manager.stop_order_stream()
+
+
 @router.websocket("/ws/market")
 async def websocket_market(websocket: WebSocket):
     """
     WebSocket endpoint for real-time market data.
+    
+    Connect with ?format=msgpack to receive MessagePack binary frames
+    instead of JSON text (requires the optional msgpack package).
     """
     await app_manager.connect(websocket)
-    
-    # Callback to forward Fyers data to all connected clients
-    def forward_data(message):
-        asyncio.create_task(app_manager.broadcast({
-            "type": "market_update",
-            "data": message
-        }))
-    
-    # Register this handler if data stream is active
-    if ws_manager.data_connected:
-        ws_manager.add_subscriber("market_data", forward_data)
+    market_pump.ensure_started()
+    _stream_clients["market"] += 1
     
     try:
         while True:
-            data = await websocket.receive_json()
+            data = await _receive(websocket)
             
             # Handle client requests
             action = data.get("action")
@@ -63,11 +237,11 @@ async def websocket_market(websocket: WebSocket):
                 
                 # Start Fyers stream if not already running
                 if not ws_manager.data_connected:
-                    ws_manager.start_data_stream(symbols, on_message=forward_data)
+                    ws_manager.start_data_stream(symbols)
                 else:
                     ws_manager.subscribe_to_symbols(symbols)
                 
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "subscription_status",
                     "status": "success",
                     "symbols": symbols
@@ -76,19 +250,20 @@ async def websocket_market(websocket: WebSocket):
             elif action == "unsubscribe":
                 symbols = data.get("symbols", [])
                 ws_manager.unsubscribe_from_symbols(symbols)
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "subscription_status",
                     "status": "unsubscribed",
                     "symbols": symbols
                 })
             
             elif action == "ping":
-                await websocket.send_json({"type": "pong"})
+                await _send(websocket, {"type": "pong"})
                 
     except WebSocketDisconnect:
+        pass
+    finally:
         app_manager.disconnect(websocket)
-        if ws_manager.data_connected:
-            ws_manager.remove_subscriber("market_data", forward_data)
+        _release_stream("market")
 
 
 @router.websocket("/ws/alerts")
@@ -97,36 +272,25 @@ async def websocket_alerts(websocket: WebSocket):
     WebSocket endpoint for trade alerts.
     """
     await app_manager.connect(websocket)
-    
-    # Callback for order/trade alerts
-    def forward_alert(message):
-        asyncio.create_task(app_manager.broadcast({
-            "type": "alert",
-            "data": message
-        }))
-    
-    if ws_manager.order_connected:
-        ws_manager.add_subscriber("orders", forward_alert)
-        ws_manager.add_subscriber("trades", forward_alert)
+    alert_pump.ensure_started()
+    _stream_clients["alerts"] += 1
     
     try:
         while True:
-            data = await websocket.receive_json()
+            data = await _receive(websocket)
             if data.get("action") == "subscribe":
                 if not ws_manager.order_connected:
-                    ws_manager.start_order_stream(on_order=forward_alert, on_trade=forward_alert)
+                    ws_manager.start_order_stream()
                 
-                await websocket.send_json({
+                await _send(websocket, {
                     "type": "subscription_status",
                     "channel": "alerts",
                     "status": "active"
                 })
     except WebSocketDisconnect:
-        app_manager.disconnect(websocket)
-        if ws_manager.order_connected:
-            ws_manager.remove_subscriber("orders", forward_alert)
-            ws_manager.remove_subscriber("trades", forward_alert)
+        pass
     except Exception as e:
         print(f"WebSocket Error: {str(e)}")
+    finally:
         app_manager.disconnect(websocket)
-
+        _release_stream("alerts")
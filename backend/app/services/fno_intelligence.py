@@ -7,9 +7,20 @@ Core philosophy from fnoanalysis.md:
 - Identify premium traps, filter fake moves, align with institutions
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, ClassVar
+from bisect import bisect_right
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+import threading
+from operator import itemgetter, methodcaller
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
 
 
 class MarketState(str, Enum):
@@ -17,9 +28,15 @@ class MarketState(str, Enum):
     TREND = "TREND"          # Directional move
     RANGE = "RANGE"          # Sideways
     INTENT = "INTENT"        # Institutional accumulation/build-up
+    ADJUSTMENT = "ADJUSTMENT"  # Late-session position adjustment (2:30-3:20)
     NO_TRADE = "NO-TRADE"    # Illiquid / noisy
 
 
+# States that allow a (buy-only) trade. MarketState is a str enum, so the plain
+# state strings in analysis dicts hash/compare equal to these members.
+_TRADABLE_STATES = frozenset({MarketState.TREND, MarketState.INTENT, MarketState.ADJUSTMENT})
+
+
 class OIPattern(str, Enum):
     """OI + Price relationship patterns"""
     LONG_BUILDUP = "LONG_BUILDUP"      # Price ↑, OI ↑ = Bullish
@@ -31,41 +48,236 @@ class OIPattern(str, Enum):
     NEUTRAL = "NEUTRAL"
 
 
+# Session windows as minutes since midnight: a time before _WINDOW_BOUNDS[i]
+# (and at/after the previous bound) falls in _WINDOW_LABELS[i]
+_WINDOW_BOUNDS = (
+    9 * 60 + 15,   # 9:15 open
+    10 * 60 + 30,  # end of opening noise
+    12 * 60 + 30,  # end of structure
+    14 * 60 + 30,  # end of traps
+    15 * 60 + 20,  # end of adjustment
+    15 * 60 + 30,  # close
+)
+_WINDOW_LABELS = ("pre_market", "noise", "structure", "traps", "adjustment", "high_risk", "post_market")
+
+
+# Put-Call Ratio bands: pcr below _PCR_EDGES[i] (and at/above the previous edge)
+# reads as _PCR_LABELS[i]
+_PCR_EDGES = (0.5, 0.7, 0.9, 1.2, 1.5)
+_PCR_LABELS = (
+    "EXTREME_BEARISH",  # Too many calls
+    "BEARISH",
+    "NEUTRAL",
+    "BULLISH",
+    "STRONG_BULLISH",
+    "EXTREME_BULLISH",  # Contrarian - may reverse
+)
+
+
+# ATM premium behavior keyed by (sign(call_chg), sign(put_chg)). None means
+# both premiums rose and the label depends on whether one side dominates.
+_PREMIUM_BEHAVIOR = {
+    (1, -1): "BULLISH_PRESSURE",
+    (-1, 1): "BEARISH_PRESSURE",
+    (-1, -1): "THETA_DECAY",
+    (0, 0): "FLAT",
+    (1, 0): "DISTORTION",
+    (0, 1): "DISTORTION",
+    (-1, 0): "DISTORTION",
+    (0, -1): "DISTORTION",
+    (1, 1): None,
+}
+
+
+# Stand-in for a missing call/put leg (every field reads as 0)
+_NO_LEG: Dict[str, Any] = {}
+
+
+def _leg_values(legs: List[Dict], field: str) -> np.ndarray:
+    """One option-leg field across the chain as a float64 column (missing/None -> 0)."""
+    # methodcaller runs dict.get in C; None becomes NaN in the float cast, then 0
+    column = np.array(list(map(methodcaller("get", field), legs)), dtype=np.float64)
+    column[np.isnan(column)] = 0.0
+    return column
+
+
+@dataclass(slots=True)
+class ChainArrays:
+    """Option chain as parallel float64 columns, one entry per strike."""
+    strikes: np.ndarray
+    call_ltp: np.ndarray
+    call_oi: np.ndarray
+    call_vol: np.ndarray
+    call_delta: np.ndarray
+    call_gamma: np.ndarray
+    call_iv: np.ndarray
+    call_chg: np.ndarray
+    put_ltp: np.ndarray
+    put_oi: np.ndarray
+    put_vol: np.ndarray
+    put_delta: np.ndarray
+    put_gamma: np.ndarray
+    put_iv: np.ndarray
+    put_chg: np.ndarray
+    
+    def index_of(self, strike: float) -> Optional[int]:
+        """Row index of a strike, or None when the chain doesn't have it."""
+        hits = np.flatnonzero(self.strikes == strike)
+        return int(hits[-1]) if hits.size else None
+
+
+def _chain_to_soa(chain: List[Dict]) -> ChainArrays:
+    """
+    Convert the per-strike chain dicts into a ChainArrays.
+    
+    Built once per analysis and shared by the analyzers, so each walks
+    contiguous arrays instead of re-reading the same dicts.
+    """
+    # Each leg dict is looked up once, not once per field
+    calls = [strike_data.get("call") or _NO_LEG for strike_data in chain]
+    puts = [strike_data.get("put") or _NO_LEG for strike_data in chain]
+    
+    return ChainArrays(
+        strikes=np.array(list(map(itemgetter("strike_price"), chain)), dtype=np.float64),
+        call_ltp=_leg_values(calls, "ltp"),
+        call_oi=_leg_values(calls, "oi"),
+        call_vol=_leg_values(calls, "volume"),
+        call_delta=_leg_values(calls, "delta"),
+        call_gamma=_leg_values(calls, "gamma"),
+        call_iv=_leg_values(calls, "iv"),
+        call_chg=_leg_values(calls, "chg"),
+        put_ltp=_leg_values(puts, "ltp"),
+        put_oi=_leg_values(puts, "oi"),
+        put_vol=_leg_values(puts, "volume"),
+        put_delta=_leg_values(puts, "delta"),
+        put_gamma=_leg_values(puts, "gamma"),
+        put_iv=_leg_values(puts, "iv"),
+        put_chg=_leg_values(puts, "chg"),
+    )
+
+
+def _jit(func):
+    """Compile a numeric kernel with numba when installed (plain NumPy otherwise)."""
+    return njit(cache=True)(func) if HAS_NUMBA else func
+
+
+@_jit
+def _core_institutional(
+    strikes: np.ndarray,
+    call_vol: np.ndarray,
+    call_oi: np.ndarray,
+    put_vol: np.ndarray,
+    put_oi: np.ndarray
+):
+    """Volume/OI ratios, whole-number mask and CALL/PUT cluster masks per strike."""
+    # Missing OI counts as 1
+    call_v_oi = call_vol / np.where(call_oi == 0, 1.0, call_oi)
+    put_v_oi = put_vol / np.where(put_oi == 0, 1.0, put_oi)
+    
+    # Multiples of 100 are multiples of 50, so one modulo covers both
+    whole = strikes % 50 == 0
+    call_mask = (call_v_oi > 1.5) | (whole & (call_vol > 50000))
+    put_mask = (put_v_oi > 1.5) | (whole & (put_vol > 50000))
+    return call_v_oi, put_v_oi, whole, call_mask, put_mask
+
+
+@_jit
+def _core_chain_stats(
+    strikes: np.ndarray,
+    call_vol: np.ndarray,
+    call_oi: np.ndarray,
+    put_vol: np.ndarray,
+    put_oi: np.ndarray
+):
+    """
+    Every per-chain statistic in one kernel call: the max call/put OI row
+    indices (first on ties) followed by the _core_institutional outputs.
+    """
+    call_v_oi, put_v_oi, whole, call_mask, put_mask = _core_institutional(
+        strikes, call_vol, call_oi, put_vol, put_oi
+    )
+    return np.argmax(call_oi), np.argmax(put_oi), call_v_oi, put_v_oi, whole, call_mask, put_mask
+
+
+if HAS_NUMBA:
+    # Pay the JIT (or on-disk cache load) cost at import, not on the first scan
+    _warmup = np.zeros(2)
+    _core_chain_stats(_warmup, _warmup, _warmup, _warmup, _warmup)
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    """Full analysis of one option chain; converted to a dict only at the API boundary."""
+    symbol: Optional[str]
+    spot_price: float
+    atm_strike: float
+    market_state: str
+    intent_score: int
+    confidence: int
+    message: str
+    time_window: str
+    pcr: float
+    pcr_signal: str
+    india_vix: float
+    atm_analysis: Dict[str, Any]
+    oi_analysis: Dict[str, Any]
+    institutional_flow: Dict[str, Any]
+    strike_guidance: Dict[str, Any]
+    total_call_oi: float
+    total_put_oi: float
+    tradable: bool
+    timestamp: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict in field order (nested analysis dicts are shared, not copied)."""
+        out = _RESULT_TEMPLATE.copy()
+        for name in _RESULT_FIELDS:
+            out[name] = getattr(self, name)
+        return out
+
+
+# Result keys, plus a pre-sized dict that to_dict() copies instead of growing
+# a fresh one key by key
+_RESULT_FIELDS = AnalysisResult.__slots__
+_RESULT_TEMPLATE = dict.fromkeys(_RESULT_FIELDS)
+
+
+# Memoized scanner summaries, keyed by (symbol, chain fetch timestamp)
+STOCK_CACHE_SIZE = 512
+
+
+def _as_number(value: Any) -> Any:
+    """NumPy scalar -> plain int when integral, else float (keeps JSON output stable)."""
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
 class FNOIntelligenceEngine:
     """
     F&O Stock Analysis Engine
     Analyzes option chain, futures, and premium behavior
     """
     
+    __slots__ = ("_stock_cache", "_stock_cache_lock")
+    
+    # Market time windows as (start_hour, start_minute, end_hour, end_minute)
+    TIME_WINDOWS: ClassVar[Dict[str, Tuple[int, int, int, int]]] = {
+        "noise": (9, 15, 10, 30),  # 9:15 - 10:30
+        "structure": (10, 30, 12, 30),  # 10:30 - 12:30
+        "traps": (12, 30, 14, 30),  # 12:30 - 2:30
+        "adjustment": (14, 30, 15, 20),  # 2:30 - 3:20
+        "high_risk": (15, 20, 15, 30)  # Last 10 min
+    }
+    
     def __init__(self):
-        self.time_windows = {
-            "noise": (9, 15, 10, 30),  # 9:15 - 10:30
-            "structure": (10, 30, 12, 30),  # 10:30 - 12:30
-            "traps": (12, 30, 14, 30),  # 12:30 - 2:30
-            "adjustment": (14, 30, 15, 20),  # 2:30 - 3:20
-            "high_risk": (15, 20, 15, 30)  # Last 10 min
-        }
+        # (symbol, chain timestamp) -> summary; a re-fetched chain gets a new timestamp
+        self._stock_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._stock_cache_lock = threading.Lock()
     
-    def get_current_time_window(self) -> str:
+    def get_current_time_window(self, now: Optional[datetime] = None) -> str:
         """Get current market time window"""
-        now = datetime.now()
-        hour, minute = now.hour, now.minute
-        current_mins = hour * 60 + minute
-        
-        if current_mins < 9 * 60 + 15:
-            return "pre_market"
-        elif current_mins < 10 * 60 + 30:
-            return "noise"
-        elif current_mins < 12 * 60 + 30:
-            return "structure"
-        elif current_mins < 14 * 60 + 30:
-            return "traps"
-        elif current_mins < 15 * 60 + 20:
-            return "adjustment"
-        elif current_mins < 15 * 60 + 30:
-            return "high_risk"
-        else:
-            return "post_market"
+        now = now or datetime.now()
+        return _WINDOW_LABELS[bisect_right(_WINDOW_BOUNDS, now.hour * 60 + now.minute)]
     
     def analyze_option_chain(self, chain_data: Dict[str, Any], bypass_time_check: bool = False) -> Dict[str, Any]:
         """
@@ -81,102 +293,219 @@ class FNOIntelligenceEngine:
             chain_data: Option chain data from Fyers API
             bypass_time_check: If True, skip time window restrictions (for stock scanning)
         """
+        error = self._chain_error(chain_data)
+        if error:
+            return error
+        
+        return self._analyze(chain_data, bypass_time_check).to_dict()
+    
+    def _analyze(self, chain_data: Dict[str, Any], bypass_time_check: bool) -> AnalysisResult:
+        """Analyze a chain that already passed _chain_error."""
+        spot_price = chain_data["spot_price"]
+        
+        # Per-strike columns shared by the analyzers below (converted once)
+        arrays = _chain_to_soa(chain_data["chain"])
+        institutional_flow, oi_analysis = self._analyze_chain_flow(arrays, spot_price)
+        
+        return self._build_analysis(chain_data, arrays, institutional_flow, oi_analysis, bypass_time_check)
+    
+    def analyze_batch(self, chains: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze many F&O stock chains at once (scanner path, no time restrictions).
+        
+        The chains are padded into (n_symbols, n_strikes) matrices so the OI
+        and institutional-flow kernels run once for the whole batch.
+        
+        Args:
+            chains: Chain data per symbol, as fetched from Fyers API
+            
+        Returns:
+            Analysis summaries in input order ({"error": ...} for unusable chains
+            or a symbol whose analysis failed).
+            Summaries are memoized per chain fetch; treat them as read-only.
+        """
+        results: List[Dict[str, Any]] = []
+        valid: List[int] = []
+        arrays: List[ChainArrays] = []
+        for i, chain_data in enumerate(chains):
+            cached = self._cached_summary(chain_data.get("symbol"), chain_data)
+            if cached is not None:
+                results.append(cached)
+                continue
+            
+            error = self._chain_error(chain_data)
+            if not error:
+                try:
+                    arrays.append(_chain_to_soa(chain_data["chain"]))
+                    valid.append(i)
+                except (KeyError, TypeError, ValueError) as e:
+                    error = {"error": f"Malformed chain data: {e}"}
+            results.append(error or {})
+        
+        if not valid:
+            return results
+        
+        widths = [a.strikes.size for a in arrays]
+        shape = (len(arrays), max(widths))
+        
+        # Padding: a 0.5 strike never matches the whole-number mask, 0 OI/volume never wins argmax
+        strikes = np.full(shape, 0.5)
+        call_oi = np.zeros(shape)
+        put_oi = np.zeros(shape)
+        call_vol = np.zeros(shape)
+        put_vol = np.zeros(shape)
+        for row, a in enumerate(arrays):
+            n = widths[row]
+            strikes[row, :n] = a.strikes
+            call_oi[row, :n] = a.call_oi
+            put_oi[row, :n] = a.put_oi
+            call_vol[row, :n] = a.call_vol
+            put_vol[row, :n] = a.put_vol
+        
+        # One clock reading stamps every summary in the batch
+        now = datetime.now()
+        i_ce = np.argmax(call_oi, axis=1)
+        i_pe = np.argmax(put_oi, axis=1)
+        call_v_oi, put_v_oi, whole, call_mask, put_mask = _core_institutional(
+            strikes, call_vol, call_oi, put_vol, put_oi
+        )
+        
+        for row, (i, a) in enumerate(zip(valid, arrays)):
+            n = widths[row]
+            # One symbol's failure is recorded for that symbol, not raised for the batch
+            try:
+                spot_price = chains[i]["spot_price"]
+                institutional_flow = self._institutional_flow_result(
+                    a.strikes, call_v_oi[row, :n], put_v_oi[row, :n],
+                    whole[row, :n], call_mask[row, :n], put_mask[row, :n]
+                )
+                oi_analysis = self._oi_distribution_result(a, int(i_ce[row]), int(i_pe[row]), spot_price)
+                analysis = self._build_analysis(chains[i], a, institutional_flow, oi_analysis, True, now)
+                results[i] = self._summarize(analysis)
+            except Exception as e:
+                results[i] = {"symbol": chains[i].get("symbol"), "error": str(e)}
+                continue
+            self._remember_summary(chains[i].get("symbol"), chains[i], results[i])
+        
+        return results
+    
+    def _stock_key(self, symbol: Optional[str], chain_data: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """Memo key for a chain; None when it has no symbol or fetch timestamp."""
+        timestamp = chain_data.get("timestamp")
+        return (symbol, timestamp) if symbol and timestamp else None
+    
+    def _cached_summary(self, symbol: Optional[str], chain_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Previously computed summary for this exact chain fetch, if any."""
+        key = self._stock_key(symbol, chain_data)
+        return self._stock_cache.get(key) if key else None
+    
+    def _remember_summary(self, symbol: Optional[str], chain_data: Dict[str, Any], summary: Dict[str, Any]):
+        """Memoize a successful summary, evicting the oldest entry when full."""
+        key = self._stock_key(symbol, chain_data)
+        if key is None or "error" in summary:
+            return
+        with self._stock_cache_lock:
+            if key not in self._stock_cache and len(self._stock_cache) >= STOCK_CACHE_SIZE:
+                self._stock_cache.pop(next(iter(self._stock_cache)))
+            self._stock_cache[key] = summary
+    
+    def _chain_error(self, chain_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Error result when a chain can't be analyzed, else None."""
         if not chain_data.get("success") or not chain_data.get("chain"):
             return {"error": "No chain data available"}
         
-        chain = chain_data["chain"]
+        # Validate spot_price to avoid division by zero
         spot_price = chain_data.get("spot_price") or 0
+        if not spot_price or spot_price <= 0:
+            return {"error": "No valid spot price available"}
+        return None
+    
+    def _build_analysis(
+        self,
+        chain_data: Dict[str, Any],
+        arrays: ChainArrays,
+        institutional_flow: Dict[str, Any],
+        oi_analysis: Dict[str, Any],
+        bypass_time_check: bool,
+        now: Optional[datetime] = None
+    ) -> AnalysisResult:
+        """
+        Combine the per-chain analyzers into the full analysis result.
+        
+        `now` stamps the result and picks the time window; analyze_batch
+        passes one clock reading for the whole batch.
+        """
+        if now is None:
+            now = datetime.now()
+        chain = chain_data["chain"]
+        spot_price = chain_data["spot_price"]
         atm_strike = chain_data.get("atm_strike") or 0
         pcr = chain_data.get("pcr") or 0
         india_vix = chain_data.get("india_vix") or 0
         total_call_oi = chain_data.get("total_call_oi") or 0
         total_put_oi = chain_data.get("total_put_oi") or 0
         
-        # Validate spot_price to avoid division by zero
-        if not spot_price or spot_price <= 0:
-            return {"error": "No valid spot price available"}
-        
-        # Find ATM and nearby strikes
-        atm_data = None
-        nearby_strikes = []
-        
-        for strike_data in chain:
-            strike = strike_data["strike_price"]
-            if strike == atm_strike:
-                atm_data = strike_data
-            # Get strikes within 2% of spot
-            if abs(strike - spot_price) / spot_price < 0.02:
-                nearby_strikes.append(strike_data)
-        
-        # ====== INSTITUTIONAL FLOW ANALYSIS (DEEP INTENT) ======
-        institutional_flow = self._analyze_institutional_flow(chain, spot_price)
-        
         # ====== ATM ANALYSIS (MOST IMPORTANT) ======
-        atm_analysis = self._analyze_atm_behavior(atm_data, spot_price)
-        
-        # ====== OI DISTRIBUTION ANALYSIS ======
-        oi_analysis = self._analyze_oi_distribution(chain, spot_price)
+        atm_analysis = self._analyze_atm_behavior(arrays, arrays.index_of(atm_strike), spot_price)
         
         # ====== PCR ANALYSIS ======
         pcr_signal = self._interpret_pcr(pcr)
         
         # ====== MARKET STATE CLASSIFICATION ======
+        time_window = self.get_current_time_window(now)
         market_state = self._classify_market_state(
-            atm_analysis, oi_analysis, institutional_flow, pcr, india_vix, bypass_time_check
+            atm_analysis, oi_analysis, institutional_flow, pcr, india_vix, bypass_time_check, time_window
         )
         
         # ====== STRIKE GUIDANCE (BUY ONLY) ======
         strike_guidance = self._get_strike_guidance(chain, spot_price, market_state, institutional_flow)
         
-        return {
-            "symbol": chain_data.get("symbol"),
-            "spot_price": spot_price,
-            "atm_strike": atm_strike,
-            "market_state": market_state["state"],
-            "intent_score": institutional_flow["intent_score"],
-            "confidence": market_state["confidence"],
-            "message": market_state["message"],
-            "time_window": self.get_current_time_window(),
-            "pcr": pcr,
-            "pcr_signal": pcr_signal,
-            "india_vix": india_vix,
-            "atm_analysis": atm_analysis,
-            "oi_analysis": oi_analysis,
-            "institutional_flow": institutional_flow,
-            "strike_guidance": strike_guidance,
-            "total_call_oi": total_call_oi,
-            "total_put_oi": total_put_oi,
-            "tradable": market_state["state"] in [MarketState.TREND.value, MarketState.INTENT.value],
-            "timestamp": datetime.now().isoformat()
-        }
+        return AnalysisResult(
+            symbol=chain_data.get("symbol"),
+            spot_price=spot_price,
+            atm_strike=atm_strike,
+            market_state=market_state["state"],
+            intent_score=institutional_flow["intent_score"],
+            confidence=market_state["confidence"],
+            message=market_state["message"],
+            time_window=time_window,
+            pcr=pcr,
+            pcr_signal=pcr_signal,
+            india_vix=india_vix,
+            atm_analysis=atm_analysis,
+            oi_analysis=oi_analysis,
+            institutional_flow=institutional_flow,
+            strike_guidance=strike_guidance,
+            total_call_oi=total_call_oi,
+            total_put_oi=total_put_oi,
+            tradable=market_state["state"] in _TRADABLE_STATES,
+            timestamp=now.isoformat()
+        )
     
-    def _analyze_atm_behavior(self, atm_data: Optional[Dict], spot_price: float) -> Dict[str, Any]:
+    def _analyze_atm_behavior(self, arrays: ChainArrays, atm_idx: Optional[int], spot_price: float) -> Dict[str, Any]:
         """
         ATM is where:
         - Institutions hedge
         - Gamma is highest
         - Adjustments happen first
         """
-        if not atm_data:
+        if atm_idx is None:
             return {"status": "NO_DATA"}
         
-        call = atm_data.get("call") or {}
-        put = atm_data.get("put") or {}
-        
-        call_ltp = call.get("ltp", 0) or 0
-        put_ltp = put.get("ltp", 0) or 0
-        call_oi = call.get("oi", 0) or 0
-        put_oi = put.get("oi", 0) or 0
-        call_chg = call.get("chg", 0) or 0
-        put_chg = put.get("chg", 0) or 0
+        call_ltp = _as_number(arrays.call_ltp[atm_idx])
+        put_ltp = _as_number(arrays.put_ltp[atm_idx])
+        call_oi = _as_number(arrays.call_oi[atm_idx])
+        put_oi = _as_number(arrays.put_oi[atm_idx])
+        call_chg = _as_number(arrays.call_chg[atm_idx])
+        put_chg = _as_number(arrays.put_chg[atm_idx])
         
         # Greeks
-        call_delta = call.get("delta", 0) or 0
-        put_delta = put.get("delta", 0) or 0
-        call_gamma = call.get("gamma", 0) or 0
-        put_gamma = put.get("gamma", 0) or 0
-        call_iv = call.get("iv", 0) or 0
-        put_iv = put.get("iv", 0) or 0
+        call_delta = _as_number(arrays.call_delta[atm_idx])
+        put_delta = _as_number(arrays.put_delta[atm_idx])
+        call_gamma = _as_number(arrays.call_gamma[atm_idx])
+        put_gamma = _as_number(arrays.put_gamma[atm_idx])
+        call_iv = _as_number(arrays.call_iv[atm_idx])
+        put_iv = _as_number(arrays.put_iv[atm_idx])
         
         # ATM premium ratio
         atm_premium_ratio = call_ltp / max(put_ltp, 0.01) if put_ltp else 0
@@ -185,18 +514,9 @@ class FNOIntelligenceEngine:
         atm_oi_ratio = call_oi / max(put_oi, 1)
         
         # Premium change behavior
-        premium_behavior = "NEUTRAL"
-        if call_chg > 0 and put_chg < 0:
-            premium_behavior = "BULLISH_PRESSURE"
-        elif call_chg < 0 and put_chg > 0:
-            premium_behavior = "BEARISH_PRESSURE"
-        elif call_chg < 0 and put_chg < 0:
-            premium_behavior = "THETA_DECAY"
-        elif abs(call_chg) > abs(put_chg) * 2 or abs(put_chg) > abs(call_chg) * 2:
-            if call_chg == 0 and put_chg == 0:
-                premium_behavior = "FLAT"
-            else:
-                premium_behavior = "DISTORTION"
+        premium_behavior = _PREMIUM_BEHAVIOR[(call_chg > 0) - (call_chg < 0), (put_chg > 0) - (put_chg < 0)]
+        if premium_behavior is None:
+            premium_behavior = "DISTORTION" if call_chg > put_chg * 2 or put_chg > call_chg * 2 else "NEUTRAL"
         
         # Greeks interpretation
         delta_strength = "WEAK"
@@ -207,7 +527,7 @@ class FNOIntelligenceEngine:
             gamma_zone = "HIGH"  # Volatile moves expected
         
         return {
-            "strike": atm_data["strike_price"],
+            "strike": _as_number(arrays.strikes[atm_idx]),
             "call_ltp": call_ltp,
             "put_ltp": put_ltp,
             "call_oi": call_oi,
@@ -228,32 +548,56 @@ class FNOIntelligenceEngine:
             "gamma_zone": gamma_zone
         }
     
-    def _analyze_oi_distribution(self, chain: List[Dict], spot_price: float) -> Dict[str, Any]:
+    def _analyze_chain_flow(
+        self,
+        arrays: ChainArrays,
+        spot_price: float
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """
+        Institutional flow and OI distribution from a single kernel pass.
+        
+        Institutional flow detects 'Big Money' intent using Volume/OI ratios
+        and clustering. Expert Logic: When Volume > OI, positions are being
+        aggressively initiated/closed.
+        
         OI Distribution analysis:
         - Heavy OI at one strike = magnet
         - Sudden OI drop = position exit
         - OI build + flat price = manipulation
+        
+        Returns:
+            (institutional_flow, oi_analysis)
         """
+        i_ce, i_pe, call_v_oi, put_v_oi, whole, call_mask, put_mask = _core_chain_stats(
+            arrays.strikes, arrays.call_vol, arrays.call_oi, arrays.put_vol, arrays.put_oi
+        )
+        return (
+            self._institutional_flow_result(arrays.strikes, call_v_oi, put_v_oi, whole, call_mask, put_mask),
+            self._oi_distribution_result(arrays, int(i_ce), int(i_pe), spot_price)
+        )
+    
+    def _oi_distribution_result(
+        self,
+        arrays: ChainArrays,
+        i_ce: Optional[int],
+        i_pe: Optional[int],
+        spot_price: float
+    ) -> Dict[str, Any]:
+        """OI distribution dict from the max call/put OI row indices."""
+        strikes = arrays.strikes
         max_call_oi = 0
         max_put_oi = 0
         max_call_strike = 0
         max_put_strike = 0
         
-        for strike_data in chain:
-            call = strike_data.get("call") or {}
-            put = strike_data.get("put") or {}
-            strike = strike_data["strike_price"]
-            
-            call_oi = call.get("oi", 0) or 0
-            put_oi = put.get("oi", 0) or 0
-            
-            if call_oi > max_call_oi:
-                max_call_oi = call_oi
-                max_call_strike = strike
-            if put_oi > max_put_oi:
-                max_put_oi = put_oi
-                max_put_strike = strike
+        # argmax returns the first maximum, matching a strict running max
+        if i_ce is not None and i_pe is not None:
+            if arrays.call_oi[i_ce] > 0:
+                max_call_oi = _as_number(arrays.call_oi[i_ce])
+                max_call_strike = _as_number(strikes[i_ce])
+            if arrays.put_oi[i_pe] > 0:
+                max_put_oi = _as_number(arrays.put_oi[i_pe])
+                max_put_strike = _as_number(strikes[i_pe])
         
         # Resistance = max call OI strike
         # Support = max put OI strike
@@ -275,67 +619,45 @@ class FNOIntelligenceEngine:
     
     def _interpret_pcr(self, pcr: float) -> str:
         """Interpret Put-Call Ratio"""
-        if pcr < 0.5:
-            return "EXTREME_BEARISH"  # Too many calls
-        elif pcr < 0.7:
-            return "BEARISH"
-        elif pcr < 0.9:
-            return "NEUTRAL"
-        elif pcr < 1.2:
-            return "BULLISH"
-        elif pcr < 1.5:
-            return "STRONG_BULLISH"
-        else:
-            return "EXTREME_BULLISH"  # Contrarian - may reverse
+        return _PCR_LABELS[bisect_right(_PCR_EDGES, pcr)]
     
-    def _analyze_institutional_flow(self, chain: List[Dict], spot_price: float) -> Dict[str, Any]:
-        """
-        Detect 'Big Money' intent using Volume/OI ratios and Clustering.
-        Expert Logic: When Volume > OI, positions are being aggressively initiated/closed.
-        """
-        clusters = []
-        total_intent_score = 0
+    def _institutional_flow_result(
+        self,
+        strikes: np.ndarray,
+        call_v_oi: np.ndarray,
+        put_v_oi: np.ndarray,
+        whole: np.ndarray,
+        call_mask: np.ndarray,
+        put_mask: np.ndarray
+    ) -> Dict[str, Any]:
+        """Institutional flow dict from the per-strike cluster masks."""
+        hit = call_mask | put_mask
+        
+        # Clusters in strike order, CALL before PUT, as parallel (row, is_put) arrays.
+        # Only the first 5 hit strikes can contribute to the first 5 clusters.
+        rows = np.repeat(np.flatnonzero(hit)[:5], 2)
+        is_put = np.tile(np.array([False, True]), rows.size // 2)
+        keep = np.where(is_put, put_mask[rows], call_mask[rows])
+        rows, is_put = rows[keep][:5], is_put[keep][:5]
+        strengths = np.where(is_put, put_v_oi[rows], call_v_oi[rows])
+        
+        # Materialize dicts only at the boundary
+        clusters = [
+            {
+                "strike": _as_number(strikes[row]),
+                "type": "PUT_ACCUMULATION" if put else "CALL_ACCUMULATION",
+                "strength": round(strength, 2),
+                "is_institutional": bool(whole[row])
+            }
+            for row, put, strength in zip(rows.tolist(), is_put.tolist(), strengths.tolist())
+        ]
+        
+        total_intent_score = 10 * (int(np.count_nonzero(call_mask)) + int(np.count_nonzero(put_mask)))
         
-        for strike_data in chain:
-            strike = strike_data["strike_price"]
-            call = strike_data.get("call") or {}
-            put = strike_data.get("put") or {}
-            
-            # Analyze Call Intent
-            call_vol = call.get("volume", 0) or 0
-            call_oi = call.get("oi", 0) or 1
-            call_v_oi_ratio = call_vol / call_oi
-            
-            # Analyze Put Intent
-            put_vol = put.get("volume", 0) or 0
-            put_oi = put.get("oi", 0) or 1
-            put_v_oi_ratio = put_vol / put_oi
-            
-            # Institutional Cluster Detection (High volume at whole numbers)
-            is_whole_number = strike % 100 == 0 or strike % 50 == 0
-            
-            if call_v_oi_ratio > 1.5 or (is_whole_number and call_vol > 50000):
-                clusters.append({
-                    "strike": strike,
-                    "type": "CALL_ACCUMULATION",
-                    "strength": round(call_v_oi_ratio, 2),
-                    "is_institutional": is_whole_number
-                })
-                total_intent_score += 10
-                
-            if put_v_oi_ratio > 1.5 or (is_whole_number and put_vol > 50000):
-                clusters.append({
-                    "strike": strike,
-                    "type": "PUT_ACCUMULATION",
-                    "strength": round(put_v_oi_ratio, 2),
-                    "is_institutional": is_whole_number
-                })
-                total_intent_score += 10
-
         return {
             "intent_score": min(total_intent_score, 100),
-            "clusters": clusters[:5],  # Top 5 most relevant clusters
-            "big_money_present": any(c["is_institutional"] for c in clusters)
+            "clusters": clusters,  # Top 5 most relevant clusters
+            "big_money_present": bool(np.any(whole & hit))
         }
 
     
@@ -346,7 +668,8 @@ class FNOIntelligenceEngine:
         institutional_flow: Dict,
         pcr: float,
         vix: float,
-        bypass_time_check: bool = False
+        bypass_time_check: bool = False,
+        time_window: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Classify market into: TREND, RANGE, ADJUSTMENT, NO-TRADE
@@ -354,8 +677,9 @@ class FNOIntelligenceEngine:
         
         Args:
             bypass_time_check: If True, skip time window restrictions
+            time_window: Current time window, if the caller already has it
         """
-        time_window = self.get_current_time_window()
+        time_window = time_window or self.get_current_time_window()
         
         # Time-based restrictions (skip if bypass_time_check is True)
         if not bypass_time_check:
@@ -518,15 +842,17 @@ class FNOIntelligenceEngine:
             chain_data: Option chain data from Fyers API
             bypass_time_check: If True, skip time window restrictions (for stock scanning)
         """
-        analysis = self.analyze_option_chain(chain_data, bypass_time_check=bypass_time_check)
-        
-        if "error" in analysis:
-            return analysis
+        error = self._chain_error(chain_data)
+        if error:
+            return error
         
+        return self._summarize(self._analyze(chain_data, bypass_time_check))
+    
+    def _summarize(self, analysis: AnalysisResult) -> Dict[str, Any]:
+        """UI summary (key signals + alerts) of a full analysis result."""
         # Get key signals
-        oi_analysis = analysis.get("oi_analysis", {})
-        guidance = analysis.get("strike_guidance", {})
-        institutional = analysis.get("institutional_flow", {})
+        oi_analysis = analysis.oi_analysis
+        institutional = analysis.institutional_flow
         
         # Build alerts based on analysis
         alerts = []
@@ -539,7 +865,7 @@ class FNOIntelligenceEngine:
             })
         
         # PCR alert
-        pcr = analysis.get("pcr", 0)
+        pcr = analysis.pcr
         if pcr > 1.3:
             alerts.append({
                 "type": "INFO",
@@ -552,7 +878,7 @@ class FNOIntelligenceEngine:
             })
         
         # VIX alert
-        vix = analysis.get("india_vix", 0)
+        vix = analysis.india_vix
         if vix > 20:
             alerts.append({
                 "type": "WARNING",
@@ -560,23 +886,23 @@ class FNOIntelligenceEngine:
             })
         
         return {
-            "symbol": analysis.get("symbol"),
-            "spot_price": analysis.get("spot_price"),
-            "atm_strike": analysis.get("atm_strike"),
-            "state": analysis.get("market_state"),
-            "intent_score": analysis.get("intent_score"),
-            "confidence": analysis.get("confidence"),
-            "message": analysis.get("message"),
-            "time_window": analysis.get("time_window"),
-            "tradable": analysis.get("tradable"),
-            "pcr": analysis.get("pcr"),
-            "vix": analysis.get("india_vix"),
+            "symbol": analysis.symbol,
+            "spot_price": analysis.spot_price,
+            "atm_strike": analysis.atm_strike,
+            "state": analysis.market_state,
+            "intent_score": analysis.intent_score,
+            "confidence": analysis.confidence,
+            "message": analysis.message,
+            "time_window": analysis.time_window,
+            "tradable": analysis.tradable,
+            "pcr": pcr,
+            "vix": vix,
             "support": oi_analysis.get("support"),
             "resistance": oi_analysis.get("resistance"),
-            "strike_guidance": guidance,
+            "strike_guidance": analysis.strike_guidance,
             "institutional_flow": institutional,
             "alerts": alerts,
-            "timestamp": analysis.get("timestamp")
+            "timestamp": analysis.timestamp
         }
     
     def analyze_stock(self, symbol: str, chain_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -588,20 +914,29 @@ class FNOIntelligenceEngine:
             chain_data: Real chain data fetched from Fyers API
             
         Returns:
-            Analysis summary for the stock
+            Analysis summary for the stock (memoized per chain fetch; treat as read-only)
         """
-        return self.get_analysis_summary(chain_data, bypass_time_check=True)
+        cached = self._cached_summary(symbol, chain_data)
+        if cached is not None:
+            return cached
+        
+        summary = self.get_analysis_summary(chain_data, bypass_time_check=True)
+        self._remember_summary(symbol, chain_data, summary)
+        return summary
 
 
 # Singleton instance
 _intelligence_engine: Optional[FNOIntelligenceEngine] = None
+_engine_lock = threading.Lock()
 
 
 def get_intelligence_engine() -> FNOIntelligenceEngine:
-    """Get the intelligence engine instance."""
+    """Get the intelligence engine instance (created once, even under concurrent first use)."""
     global _intelligence_engine
     if _intelligence_engine is None:
-        _intelligence_engine = FNOIntelligenceEngine()
+        with _engine_lock:
+            if _intelligence_engine is None:
+                _intelligence_engine = FNOIntelligenceEngine()
     return _intelligence_engine
 
 
@@ -5,24 +5,139 @@ Handles OAuth 2.0 authentication flow with Fyers API v3.
 Supports both manual and automated (TOTP) login flows.
 """
 
+import base64
 import hashlib
-import pyotp
-from typing import Optional, Tuple
+import hmac
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 from urllib.parse import urlencode, parse_qs, urlparse
-import httpx
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    # Windows: the in-process lock still serializes token writes
+    HAS_FCNTL = False
 
 from fyers_apiv3 import fyersModel
 
-from app.core.config import get_settings, reload_settings
+from app.core.config import Settings, get_settings, reload_settings
+from app.core.http import fyers_headers, get_sync_http_client
+
+
+# Fyers API v3 REST endpoints called directly on the pooled client
+# (same requests SessionModel.generate_token / FyersModel.get_profile make)
+FYERS_API = "https://api-t1.fyers.in/api/v3"
+
+# Auth status is polled by the frontend; serve repeats from cache this long
+AUTH_STATUS_TTL = 15.0  # seconds
+
+# A rejected token is re-checked after 1 s, doubling up to this cap
+INVALID_BACKOFF_MAX = 60.0  # seconds
+
+# TOTP codes are precomputed this many 30 s intervals ahead (~32 minutes)
+TOTP_INTERVAL = 30  # seconds
+TOTP_RING_SIZE = 64
+
+# Token persistence: backend/.env, rewritten atomically under a lock
+ENV_PATH = Path(__file__).parent.parent.parent / ".env"
+_TOKEN_LINE = re.compile(r"^FYERS_ACCESS_TOKEN=.*$", re.MULTILINE)
+_env_lock = threading.Lock()
+
+
+def _token_expiry(token: str) -> Optional[float]:
+    """Read the `exp` claim (epoch seconds) from a JWT without verifying it."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp is not None else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _totp_key(secret: str) -> bytes:
+    """Decode a base32 TOTP secret (spaces, lower case and missing padding allowed)."""
+    secret = secret.replace(" ", "").upper()
+    return base64.b32decode(secret + "=" * (-len(secret) % 8))
+
+
+def _totp_code(key: bytes, counter: int) -> str:
+    """RFC 6238 TOTP code (HMAC-SHA1, 6 digits) for one time-step counter."""
+    mac = hmac.new(key, counter.to_bytes(8, "big"), hashlib.sha1).digest()
+    offset = mac[-1] & 0x0F
+    code = (int.from_bytes(mac[offset:offset + 4], "big") & 0x7FFFFFFF) % 1_000_000
+    return f"{code:06d}"
+
+
+class TokenCache:
+    """
+    Short-lived in-process cache of auth status, keyed by access-token hash.
+    
+    Entries live for min(token exp - now, max_ttl) so a status is never
+    served past the token's own expiry.
+    """
+    
+    def __init__(self, max_ttl: float = 60.0):
+        self.max_ttl = max_ttl
+        self._entries: Dict[str, Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(self._key(token))
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        return None
+    
+    def set(self, token: str, value: dict):
+        ttl = self.max_ttl
+        exp = _token_expiry(token)
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[self._key(token)] = (time.monotonic() + ttl, value)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
 
 class FyersAuthService:
     """Service for handling Fyers API authentication."""
     
     def __init__(self):
-        self.settings = get_settings()
-        self._session: Optional[fyersModel.SessionModel] = None
+        # OAuth login URL; deterministic for the configured app id/redirect/state
+        self._login_url: Optional[str] = None
+        # Rebuilt only when the token or settings change (see _bind_fyers_model)
         self._fyers: Optional[fyersModel.FyersModel] = None
+        self._fyers_lock = threading.Lock()
+        self._status_cache = TokenCache(max_ttl=AUTH_STATUS_TTL)
+        # Last rejected profile response, replayed until the backoff elapses
+        self._invalid_profile: Optional[dict] = None
+        self._last_invalid_at: Optional[float] = None
+        self._invalid_backoff = 1.0
+        # (secret, first counter, codes) - swapped as a whole, so readers never see a partial ring
+        self._totp_ring: Optional[Tuple[str, int, Tuple[str, ...]]] = None
+        self._bind_fyers_model()
+    
+    @property
+    def settings(self) -> Settings:
+        """Current settings snapshot (follows reload_settings)."""
+        return get_settings()
     
     def _create_session(self) -> fyersModel.SessionModel:
         """Create a new Fyers session model."""
@@ -37,13 +152,15 @@ class FyersAuthService:
     
     def get_login_url(self) -> str:
         """
-        Generate Fyers OAuth login URL.
+        Generate Fyers OAuth login URL (built once per settings snapshot).
         
         Returns:
             str: The URL to redirect user for authentication
         """
-        self._session = self._create_session()
-        return self._session.generate_authcode()
+        login_url = self._login_url
+        if login_url is None:
+            login_url = self._login_url = self._create_session().generate_authcode()
+        return login_url
     
     def handle_callback(self, auth_code: str) -> Tuple[bool, str, Optional[str]]:
         """
@@ -56,11 +173,7 @@ class FyersAuthService:
             Tuple of (success, message, access_token)
         """
         try:
-            if self._session is None:
-                self._session = self._create_session()
-            
-            self._session.set_token(auth_code)
-            response = self._session.generate_token()
+            response = self._token_exchange(auth_code)
             
             if "access_token" in response:
                 access_token = response["access_token"]
@@ -74,44 +187,112 @@ class FyersAuthService:
         except Exception as e:
             return False, f"Authentication error: {str(e)}", None
     
+    def _token_exchange(self, auth_code: str) -> dict:
+        """Exchange an auth code for an access token (validate-authcode)."""
+        settings = self.settings
+        app_id_hash = hashlib.sha256(
+            f"{settings.fyers_app_id}:{settings.fyers_secret_key}".encode()
+        ).hexdigest()
+        response = get_sync_http_client().post(
+            f"{FYERS_API}/validate-authcode",
+            json={"grant_type": "authorization_code", "appIdHash": app_id_hash, "code": auth_code},
+            headers=fyers_headers()
+        )
+        return response.json()
+    
+    def _profile(self) -> Optional[dict]:
+        """
+        Fetch the user profile with the current token (None without a token).
+        
+        A rejected token is not re-sent upstream until its backoff window
+        (1 s doubling to INVALID_BACKOFF_MAX) has elapsed; the last error
+        response is returned in the meantime.
+        """
+        auth_header = self.settings.get_access_token_formatted()
+        if not auth_header:
+            return None
+        last_invalid = self._last_invalid_at
+        if last_invalid is not None and time.monotonic() - last_invalid < self._invalid_backoff:
+            return self._invalid_profile
+        
+        response = get_sync_http_client().get(f"{FYERS_API}/profile", headers=fyers_headers(auth_header))
+        profile = response.json()
+        if profile.get("s") == "ok":
+            self._reset_invalid_backoff()
+        else:
+            if last_invalid is not None:
+                self._invalid_backoff = min(self._invalid_backoff * 2, INVALID_BACKOFF_MAX)
+            self._invalid_profile = profile
+            self._last_invalid_at = time.monotonic()
+        return profile
+    
+    def _reset_invalid_backoff(self):
+        """Forget a cached token rejection (new token, reload or success)."""
+        self._last_invalid_at = None
+        self._invalid_profile = None
+        self._invalid_backoff = 1.0
+    
     def _store_access_token(self, token: str):
-        """Store access token to .env file for persistence."""
-        import os
-        from pathlib import Path
+        """
+        Store access token to .env file for persistence.
         
+        The rewrite holds a process lock plus an flock on .env.lock (where
+        supported) and lands via os.replace, so concurrent callbacks can't
+        drop a token and a crash can't leave a half-written .env.
+        """
         # Update in-memory settings
         self.settings.fyers_access_token = token
+        self._bind_fyers_model()
+        self._status_cache.clear()
+        self._reset_invalid_backoff()
         
         # Write to .env file for persistence
-        env_path = Path(__file__).parent.parent.parent / ".env"
-        if env_path.exists():
-            lines = env_path.read_text().splitlines()
-            updated = False
-            new_lines = []
-            for line in lines:
-                if line.startswith("FYERS_ACCESS_TOKEN="):
-                    new_lines.append(f"FYERS_ACCESS_TOKEN={token}")
-                    updated = True
-                else:
-                    new_lines.append(line)
+        if not ENV_PATH.exists():
+            return
+        
+        token_line = f"FYERS_ACCESS_TOKEN={token}"
+        with _env_lock, open(ENV_PATH.with_name(".env.lock"), "a") as lock_file:
+            if HAS_FCNTL:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)  # Released when lock_file closes
             
-            if not updated:
-                new_lines.append(f"FYERS_ACCESS_TOKEN={token}")
+            text, replaced = _TOKEN_LINE.subn(lambda _: token_line, ENV_PATH.read_text())
+            if not replaced:
+                text += ("" if not text or text.endswith("\n") else "\n") + token_line
             
-            env_path.write_text("\n".join(new_lines))
+            tmp_path = ENV_PATH.with_name(f".env.tmp.{os.getpid()}")
+            tmp_path.write_text(text)
+            os.replace(tmp_path, ENV_PATH)
     
-    def generate_totp(self) -> Optional[str]:
+    def generate_totp(self, offset: int = 0) -> Optional[str]:
         """
         Generate TOTP code for automated login.
         
+        Codes come from a ring of TOTP_RING_SIZE precomputed intervals,
+        starting one interval back and refilled when the clock runs past
+        it or the secret changes, so a retry in a neighbouring interval
+        (clock skew, window boundary) is a lookup rather than a new HMAC.
+        
+        Args:
+            offset: Interval relative to now, -1..1 (previous/current/next code)
+            
         Returns:
             TOTP code if secret is configured, None otherwise
         """
-        if not self.settings.fyers_totp_secret:
+        if not -1 <= offset <= 1:
+            raise ValueError("TOTP offset must be -1, 0 or 1")
+        
+        secret = self.settings.fyers_totp_secret
+        if not secret:
             return None
         
-        totp = pyotp.TOTP(self.settings.fyers_totp_secret)
-        return totp.now()
+        counter = int(time.time()) // TOTP_INTERVAL
+        ring = self._totp_ring
+        if ring is None or ring[0] != secret or not 1 <= counter - ring[1] <= TOTP_RING_SIZE - 2:
+            first = counter - 1
+            key = _totp_key(secret)
+            codes = tuple(_totp_code(key, c) for c in range(first, first + TOTP_RING_SIZE))
+            ring = self._totp_ring = (secret, first, codes)
+        return ring[2][counter + offset - ring[1]]
     
     def automated_login(self) -> Tuple[bool, str, Optional[str]]:
         """
@@ -166,23 +347,27 @@ class FyersAuthService:
         """
         Get initialized FyersModel for API calls.
         
+        The model is built when the token is stored or settings are
+        reloaded, so this is a plain attribute read.
+        
         Returns:
             FyersModel if authenticated, None otherwise
         """
-        if not self.settings.fyers_access_token:
-            return None
-        
-        # Re-initialize if token changed or model doesn't exist
-        if self._fyers is None or getattr(self, "_last_token", None) != self.settings.fyers_access_token:
+        return self._fyers
+    
+    def _bind_fyers_model(self):
+        """(Re)build the FyersModel for the current token (None without one)."""
+        settings = self.settings
+        with self._fyers_lock:
+            if not settings.fyers_access_token:
+                self._fyers = None
+                return
             self._fyers = fyersModel.FyersModel(
-                token=self.settings.fyers_access_token,
+                token=settings.fyers_access_token,
                 is_async=False,
-                client_id=self.settings.fyers_app_id,
+                client_id=settings.fyers_app_id,
                 log_path=""
             )
-            self._last_token = self.settings.fyers_access_token
-        
-        return self._fyers
     
     def validate_token(self) -> Tuple[bool, str]:
         """
@@ -191,12 +376,10 @@ class FyersAuthService:
         Returns:
             Tuple of (is_valid, message)
         """
-        fyers = self.get_fyers_model()
-        if not fyers:
-            return False, "No access token configured"
-        
         try:
-            response = fyers.get_profile()
+            response = self._profile()
+            if response is None:
+                return False, "No access token configured"
             if response.get("s") == "ok":
                 return True, "Token is valid"
             else:
@@ -204,45 +387,61 @@ class FyersAuthService:
         except Exception as e:
             return False, f"Token validation error: {str(e)}"
     
+    def invalidate_auth_cache(self):
+        """Drop cached auth status (e.g. after settings are reloaded)."""
+        self._status_cache.clear()
+        self._reset_invalid_backoff()
+        # Login URL and FyersModel were built from the previous settings
+        self._login_url = None
+        self._bind_fyers_model()
+    
     def get_auth_status(self) -> dict:
         """
         Get current authentication status.
         
+        One profile call yields both validity and user info; results are
+        cached per token for AUTH_STATUS_TTL seconds (see TokenCache), but
+        only when Fyers actually answered - a network error is not cached
+        as "logged out".
+        
         Returns:
             Dict with authentication status details
         """
-        has_token = bool(self.settings.fyers_access_token)
+        token = self.settings.fyers_access_token
+        if token:
+            cached = self._status_cache.get(token)
+            if cached is not None:
+                return cached
+        
+        has_token = bool(token)
         is_valid = False
         user_info = None
+        answered = False
         
         if has_token:
-            is_valid, _ = self.validate_token()
-            if is_valid:
-                fyers = self.get_fyers_model()
-                if fyers:
-                    try:
-                        profile = fyers.get_profile()
-                        if profile.get("s") == "ok":
-                            user_info = profile.get("data", {})
-                    except:
-                        pass
-        
-        return {
+            try:
+                profile = self._profile()
+                answered = profile is not None
+                if profile and profile.get("s") == "ok":
+                    is_valid = True
+                    user_info = profile.get("data", {})
+            except Exception:
+                pass
+        
+        status = {
             "authenticated": has_token and is_valid,
             "has_token": has_token,
             "is_valid": is_valid,
             "user_info": user_info,
             "app_id": self.settings.fyers_app_id[:10] + "..." if self.settings.fyers_app_id else None
         }
+        
+        if answered:
+            self._status_cache.set(token, status)
+        return status
 
 
-# Singleton instance
-_auth_service: Optional[FyersAuthService] = None
-
-
+@lru_cache(maxsize=1)
 def get_auth_service() -> FyersAuthService:
-    """Get the authentication service instance."""
-    global _auth_service
-    if _auth_service is None:
-        _auth_service = FyersAuthService()
-    return _auth_service
+    """Get the authentication service instance (created on first use)."""
+    return FyersAuthService()
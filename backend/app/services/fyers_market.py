@@ -5,29 +5,189 @@ Provides methods for fetching market data including quotes,
 historical data, market depth, and option chain from Fyers API v3.
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
-import pandas as pd
+from functools import lru_cache
+from importlib.util import find_spec
+import asyncio
+import threading
+import time
+import numpy as np
 
 from fyers_apiv3 import fyersModel
 import math
 
+# scipy (vectorized Greeks) is imported on first use to keep worker
+# start-up light; only its presence is checked here
+HAS_SCIPY = find_spec("scipy") is not None
+_norm = None
+
+
+def _get_norm():
+    """scipy.stats.norm, imported on first use."""
+    global _norm
+    if _norm is None:
+        from scipy.stats import norm
+        _norm = norm
+    return _norm
+
 try:
-    from scipy.stats import norm
-    HAS_SCIPY = True
+    from numba import njit
+    HAS_NUMBA = True
 except ImportError:
-    HAS_SCIPY = False
+    HAS_NUMBA = False
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.core.http import fyers_headers, get_http_client
 from app.services.fyers_auth import get_auth_service
 
 
+# Fyers data REST API (same endpoints the SDK calls)
+FYERS_DATA_API = "https://api-t1.fyers.in/data"
+
+# Short-lived option chain cache (dedupes a dashboard refresh burst)
+OPTION_CHAIN_TTL = 3.0  # seconds
+OPTION_CHAIN_CACHE_SIZE = 256
+
+# Single-flight locks are striped by hash(key): a fixed pool, however many
+# distinct (caller-supplied) keys are seen; colliding keys merely queue
+LOCK_STRIPES = 64
+
+# Quotes cache (TTL comes from settings.quote_cache_ttl)
+QUOTE_CACHE_SIZE = 256
+
+# Indices returned by get_indices
+MAJOR_INDICES = [
+    "NSE:NIFTY50-INDEX",
+    "NSE:NIFTYBANK-INDEX",
+    "NSE:NIFTYIT-INDEX",
+    "NSE:NIFTYFIN-INDEX",
+    "BSE:SENSEX-INDEX"
+]
+
+# Per-strike row keys filled by a CE/PE contract: (leg, oi, iv, greeks)
+_LEG_KEYS = {
+    "CE": ("call", "call_oi", "call_iv", "call_greeks"),
+    "PE": ("put", "put_oi", "put_iv", "put_greeks"),
+}
+
+# Response timestamps at 1 s resolution: (epoch second, formatted)
+_ts_cache: Tuple[int, str] = (0, "")
+
+
+def _now_iso() -> str:
+    """Local ISO timestamp in whole seconds, formatted once per second."""
+    global _ts_cache
+    second = int(time.time())
+    cached = _ts_cache
+    if cached[0] != second:
+        cached = _ts_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return cached[1]
+
+
+# Standard normal constants: 1/sqrt(2) and 1/sqrt(2*pi)
+_INV_SQRT2 = 0.7071067811865475
+_INV_SQRT_2PI = 0.3989422804014327
+
+
+def _greeks_kernel(
+    spot: float,
+    strike: float,
+    iv: float,
+    is_call: bool,
+    time_to_expiry: float,
+    risk_free_rate: float,
+    sqrt_t: float,
+    rate_discount: float
+):
+    """
+    Black-Scholes (delta, gamma, theta, vega) for one contract.
+    
+    sqrt_t and rate_discount (r * exp(-r * T)) are the same for every
+    contract of an expiry, so callers compute them once (_expiry_constants).
+    The normal pdf/cdf are written out with math.exp/math.erf, so the
+    scalar path needs no scipy call (and compiles with numba when installed).
+    """
+    d1 = (math.log(spot / strike) + (risk_free_rate + 0.5 * iv * iv) * time_to_expiry) / (iv * sqrt_t)
+    d2 = d1 - iv * sqrt_t
+    
+    pdf_d1 = _INV_SQRT_2PI * math.exp(-0.5 * d1 * d1)
+    cdf_d1 = 0.5 * (1.0 + math.erf(d1 * _INV_SQRT2))
+    
+    gamma = pdf_d1 / (spot * iv * sqrt_t)
+    vega = spot * pdf_d1 * sqrt_t / 100  # Per 1% change in IV
+    decay = -spot * pdf_d1 * iv / (2 * sqrt_t)
+    discount = strike * rate_discount
+    
+    if is_call:
+        delta = cdf_d1
+        theta = (decay - discount * 0.5 * (1.0 + math.erf(d2 * _INV_SQRT2))) / 365  # Per day
+    else:
+        delta = cdf_d1 - 1.0
+        theta = (decay + discount * 0.5 * (1.0 + math.erf(-d2 * _INV_SQRT2))) / 365
+    return delta, gamma, theta, vega
+
+
+if HAS_NUMBA:
+    _greeks_kernel = njit(cache=True, fastmath=True)(_greeks_kernel)
+    # Pay the JIT (or on-disk cache load) cost at import, not on the first chain
+    _greeks_kernel(100.0, 100.0, 0.2, True, 0.1, 0.07, 0.316, 0.069)
+
+
+def _expiry_constants(time_to_expiry: float, risk_free_rate: float) -> Tuple[float, float]:
+    """(sqrt(T), r * exp(-r * T)): the per-expiry terms shared by every contract."""
+    return math.sqrt(time_to_expiry), risk_free_rate * math.exp(-risk_free_rate * time_to_expiry)
+
+
+def _greeks_row(
+    spot: float,
+    strike: float,
+    iv: float,
+    is_call: bool,
+    time_to_expiry: float,
+    risk_free_rate: float,
+    sqrt_t: float,
+    rate_discount: float
+) -> Dict[str, float]:
+    """Rounded Greeks dict for one contract of an expiry with T > 0 (zeros on bad input)."""
+    if iv <= 0 or spot <= 0 or strike <= 0:
+        return {"delta": 0, "gamma": 0, "theta": 0, "vega": 0}
+    
+    try:
+        delta, gamma, theta, vega = _greeks_kernel(
+            float(spot), float(strike), float(iv), is_call,
+            float(time_to_expiry), float(risk_free_rate), sqrt_t, rate_discount
+        )
+        
+        return {
+            "delta": round(delta, 4),
+            "gamma": round(gamma, 6),
+            "theta": round(theta, 2),
+            "vega": round(vega, 2)
+        }
+    except Exception:
+        return {"delta": 0, "gamma": 0, "theta": 0, "vega": 0}
+
+
 class FyersMarketService:
     """Service for fetching market data from Fyers API."""
     
     def __init__(self):
-        self.settings = get_settings()
         self.auth_service = get_auth_service()
+        # (symbol, strike_count) -> (fetched_at, result)
+        self._oc_cache: Dict[tuple, tuple] = {}
+        self._oc_locks = tuple(asyncio.Lock() for _ in range(LOCK_STRIPES))
+        # symbols tuple -> (fetched_at, result); one upstream fetch per key
+        # at a time for sync callers and, separately, for async callers
+        self._quote_cache: Dict[tuple, tuple] = {}
+        self._quote_cache_lock = threading.Lock()
+        self._quote_locks = tuple(threading.Lock() for _ in range(LOCK_STRIPES))
+        self._aquote_locks = tuple(asyncio.Lock() for _ in range(LOCK_STRIPES))
+    
+    @property
+    def settings(self) -> Settings:
+        """Current settings snapshot (follows reload_settings)."""
+        return get_settings()
     
     def _get_fyers(self) -> Optional[fyersModel.FyersModel]:
         """Get authenticated Fyers model."""
@@ -48,101 +208,154 @@ class FyersMarketService:
         Returns:
             Dict with delta, gamma, theta, vega
         """
-        if time_to_expiry <= 0 or iv <= 0 or spot <= 0 or strike <= 0:
+        if time_to_expiry <= 0:
             return {"delta": 0, "gamma": 0, "theta": 0, "vega": 0}
         
-        # Fallback if scipy is missing
+        return _greeks_row(
+            spot, strike, iv, option_type == "CE", time_to_expiry, risk_free_rate,
+            *_expiry_constants(time_to_expiry, risk_free_rate)
+        )
+    
+    def _calculate_greeks_batch(
+        self,
+        spots: np.ndarray,
+        strikes: np.ndarray,
+        time_to_expiry: float,  # In years
+        ivs: np.ndarray,  # Implied volatilities as decimals
+        is_call: np.ndarray,  # True for CE rows
+        risk_free_rate: float = 0.07
+    ) -> List[Dict[str, float]]:
+        """
+        Black-Scholes Greeks for a whole chain in one vectorized pass.
+        
+        Same model, rounding and zero-for-invalid-input rule as
+        _calculate_greeks; without scipy each row goes through the scalar
+        kernel instead, still sharing the per-expiry constants.
+        
+        Returns:
+            One dict with delta, gamma, theta, vega per row
+        """
+        if time_to_expiry <= 0:
+            return [{"delta": 0, "gamma": 0, "theta": 0, "vega": 0} for _ in range(len(spots))]
+        
+        sqrt_t, rate_discount = _expiry_constants(time_to_expiry, risk_free_rate)
         if not HAS_SCIPY:
-            # Very basic linear approximation for Delta as a placeholder
-            # ATM Delta ~0.5. More OTM -> smaller. More ITM -> larger.
-            moneyness = (spot - strike) / (spot * iv * math.sqrt(time_to_expiry))
-            if option_type == "CE":
-                delta = 0.5 + 0.1 * moneyness
-            else:
-                delta = -0.5 + 0.1 * moneyness
-            delta = max(-1.0, min(1.0, delta))
-            
-            return {
-                "delta": round(delta, 4),
-                "gamma": 0,
-                "theta": 0,
-                "vega": 0,
-                "note": "Calculated using fallback (scipy missing)"
-            }
-
-        try:
-            sqrt_t = math.sqrt(time_to_expiry)
-            d1 = (math.log(spot / strike) + (risk_free_rate + 0.5 * iv ** 2) * time_to_expiry) / (iv * sqrt_t)
-            d2 = d1 - iv * sqrt_t
-            
-            # Standard normal pdf and cdf
-            pdf_d1 = norm.pdf(d1)
-            cdf_d1 = norm.cdf(d1)
-            cdf_d2 = norm.cdf(d2)
-            cdf_neg_d1 = norm.cdf(-d1)
-            cdf_neg_d2 = norm.cdf(-d2)
-            
-            # Greeks
-            gamma = pdf_d1 / (spot * iv * sqrt_t)
-            vega = spot * pdf_d1 * sqrt_t / 100  # Per 1% change in IV
-            
-            if option_type == "CE":
-                delta = cdf_d1
-                theta = (
-                    -spot * pdf_d1 * iv / (2 * sqrt_t)
-                    - risk_free_rate * strike * math.exp(-risk_free_rate * time_to_expiry) * cdf_d2
-                ) / 365  # Per day
-            else:  # PE
-                delta = cdf_d1 - 1
-                theta = (
-                    -spot * pdf_d1 * iv / (2 * sqrt_t)
-                    + risk_free_rate * strike * math.exp(-risk_free_rate * time_to_expiry) * cdf_neg_d2
-                ) / 365
-            
-            return {
-                "delta": round(delta, 4),
-                "gamma": round(gamma, 6),
-                "theta": round(theta, 2),
-                "vega": round(vega, 2)
-            }
-        except Exception:
-            return {"delta": 0, "gamma": 0, "theta": 0, "vega": 0}
+            return [
+                _greeks_row(spot, strike, iv, call, time_to_expiry, risk_free_rate, sqrt_t, rate_discount)
+                for spot, strike, iv, call in zip(spots.tolist(), strikes.tolist(), ivs.tolist(), is_call.tolist())
+            ]
+        
+        # Rows with non-positive (or missing) inputs are computed on placeholders, then zeroed
+        valid = (spots > 0) & (strikes > 0) & (ivs > 0)
+        spot = np.where(valid, spots, 1.0)
+        strike = np.where(valid, strikes, 1.0)
+        iv = np.where(valid, ivs, 1.0)
+        
+        d1 = (np.log(spot / strike) + (risk_free_rate + 0.5 * iv ** 2) * time_to_expiry) / (iv * sqrt_t)
+        d2 = d1 - iv * sqrt_t
+        
+        norm = _get_norm()
+        pdf_d1 = norm.pdf(d1)
+        cdf_d1 = norm.cdf(d1)
+        # N(d2) for calls, N(-d2) for puts
+        cdf_d2 = norm.cdf(np.where(is_call, d2, -d2))
+        
+        gamma = pdf_d1 / (spot * iv * sqrt_t)
+        vega = spot * pdf_d1 * sqrt_t / 100  # Per 1% change in IV
+        delta = np.where(is_call, cdf_d1, cdf_d1 - 1)
+        carry = rate_discount * strike * cdf_d2
+        theta = (-spot * pdf_d1 * iv / (2 * sqrt_t) + np.where(is_call, -carry, carry)) / 365  # Per day
+        
+        return [
+            {"delta": d, "gamma": g, "theta": t, "vega": v}
+            for d, g, t, v in zip(
+                np.round(np.where(valid, delta, 0.0), 4).tolist(),
+                np.round(np.where(valid, gamma, 0.0), 6).tolist(),
+                np.round(np.where(valid, theta, 0.0), 2).tolist(),
+                np.round(np.where(valid, vega, 0.0), 2).tolist()
+            )
+        ]
     
     def get_quotes(self, symbols: List[str]) -> Dict[str, Any]:
         """
         Get real-time quotes for multiple symbols.
         
+        Successful results are reused for settings.quote_cache_ttl seconds;
+        concurrent callers for the same symbols share one upstream request.
+        
         Args:
             symbols: List of symbols (max 50), e.g., ["NSE:NIFTY50-INDEX", "NSE:SBIN-EQ"]
             
         Returns:
             Dict with quote data for each symbol
         """
+        ttl = self.settings.quote_cache_ttl
+        if ttl <= 0:
+            return self._fetch_quotes(symbols)
+        
+        key = tuple(symbols[:50])
+        hit = self._fresh_quote(key, ttl)
+        if hit is not None:
+            return hit
+        
+        with self._quote_locks[hash(key) % LOCK_STRIPES]:
+            # Another caller may have filled the cache while we waited
+            hit = self._fresh_quote(key, ttl)
+            if hit is not None:
+                return hit
+            
+            result = self._fetch_quotes(symbols)
+            if result.get("success"):
+                self._store_quote(key, result)
+            return result
+    
+    def _fetch_quotes(self, symbols: List[str]) -> Dict[str, Any]:
+        """Uncached get_quotes through the SDK."""
         fyers = self._get_fyers()
         if not fyers:
             return {"error": "Not authenticated", "data": []}
         
         try:
-            # Fyers accepts comma-separated symbols
-            symbols_str = ",".join(symbols[:50])  # Max 50 symbols
-            data = {"symbols": symbols_str}
-            response = fyers.quotes(data)
-            
-            if response.get("s") == "ok":
-                return {
-                    "success": True,
-                    "data": response.get("d", []),
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message", "Failed to fetch quotes"),
-                    "data": []
-                }
+            response = fyers.quotes(self._quotes_params(symbols))
+            return self._format_quotes(response)
         except Exception as e:
             return {"success": False, "error": str(e), "data": []}
     
+    def _fresh_quote(self, key: tuple, ttl: float) -> Optional[Dict[str, Any]]:
+        """Cached quotes result for key if younger than ttl seconds."""
+        hit = self._quote_cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        return None
+    
+    def _store_quote(self, key: tuple, result: Dict[str, Any]) -> None:
+        """Store a quotes result, evicting the oldest entry when full."""
+        with self._quote_cache_lock:
+            self._quote_cache.pop(key, None)
+            if len(self._quote_cache) >= QUOTE_CACHE_SIZE:
+                del self._quote_cache[next(iter(self._quote_cache))]
+            self._quote_cache[key] = (time.monotonic(), result)
+    
+    def _quotes_params(self, symbols: List[str]) -> Dict[str, Any]:
+        """Request params for /data/quotes."""
+        # Fyers accepts comma-separated symbols
+        return {"symbols": ",".join(symbols[:50])}  # Max 50 symbols
+    
+    def _format_quotes(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw /data/quotes response into the get_quotes result."""
+        if response.get("s") == "ok":
+            return {
+                "success": True,
+                "data": response.get("d", []),
+                "timestamp": _now_iso()
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message", "Failed to fetch quotes"),
+                "data": []
+            }
+    
     def get_market_depth(self, symbol: str) -> Dict[str, Any]:
         """
         Get market depth (Level 2 data) for a symbol.
@@ -158,23 +371,25 @@ class FyersMarketService:
             return {"error": "Not authenticated"}
         
         try:
-            data = {"symbol": symbol, "ohlcv_flag": "1"}
-            response = fyers.depth(data)
-            
-            if response.get("s") == "ok":
-                return {
-                    "success": True,
-                    "data": response.get("d", {}),
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message", "Failed to fetch depth")
-                }
+            response = fyers.depth({"symbol": symbol, "ohlcv_flag": "1"})
+            return self._format_depth(response)
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def _format_depth(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw /data/depth response into the get_market_depth result."""
+        if response.get("s") == "ok":
+            return {
+                "success": True,
+                "data": response.get("d", {}),
+                "timestamp": _now_iso()
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message", "Failed to fetch depth")
+            }
+    
     def get_historical_data(
         self,
         symbol: str,
@@ -201,62 +416,79 @@ class FyersMarketService:
             return {"error": "Not authenticated", "candles": []}
         
         try:
-            # Calculate date range
-            if to_date is None:
-                to_dt = datetime.now()
-            else:
-                to_dt = datetime.strptime(to_date, "%Y-%m-%d")
-            
-            if from_date is None:
-                from_dt = to_dt - timedelta(days=days)
-            else:
-                from_dt = datetime.strptime(from_date, "%Y-%m-%d")
-            
-            # Convert to epoch timestamps
-            range_from = str(int(from_dt.timestamp()))
-            range_to = str(int(to_dt.timestamp()))
+            data = self._history_params(symbol, resolution, from_date, to_date, days)
+            response = fyers.history(data)
+            return self._format_history(symbol, resolution, response)
+        except Exception as e:
+            return {"success": False, "error": str(e), "candles": []}
+    
+    def _history_params(
+        self,
+        symbol: str,
+        resolution: str,
+        from_date: Optional[str],
+        to_date: Optional[str],
+        days: int
+    ) -> Dict[str, Any]:
+        """Request params for /data/history (raises ValueError on a bad date)."""
+        # Calculate date range
+        if to_date is None:
+            to_dt = datetime.now()
+        else:
+            to_dt = datetime.strptime(to_date, "%Y-%m-%d")
+        
+        if from_date is None:
+            from_dt = to_dt - timedelta(days=days)
+        else:
+            from_dt = datetime.strptime(from_date, "%Y-%m-%d")
+        
+        # Convert to epoch timestamps
+        range_from = str(int(from_dt.timestamp()))
+        range_to = str(int(to_dt.timestamp()))
+        
+        return {
+            "symbol": symbol,
+            "resolution": resolution,
+            "date_format": "0",  # 0 for epoch
+            "range_from": range_from,
+            "range_to": range_to,
+            "cont_flag": "1"  # Continuous data
+        }
+    
+    def _format_history(self, symbol: str, resolution: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a raw /data/history response into the get_historical_data result."""
+        if response.get("s") == "ok":
+            candles = response.get("candles", [])
+            # Format: [timestamp, open, high, low, close, volume]; values keep their
+            # upstream types. Each distinct timestamp is formatted once as local
+            # wall-clock time with its own UTC offset (correct across DST changes)
+            local_iso = {ts: datetime.fromtimestamp(ts).isoformat() for ts in {c[0] for c in candles}}
+            formatted = [
+                {
+                    "timestamp": c[0],
+                    "datetime": local_iso[c[0]],
+                    "open": c[1],
+                    "high": c[2],
+                    "low": c[3],
+                    "close": c[4],
+                    "volume": c[5]
+                }
+                for c in candles
+            ]
             
-            data = {
+            return {
+                "success": True,
                 "symbol": symbol,
                 "resolution": resolution,
-                "date_format": "0",  # 0 for epoch
-                "range_from": range_from,
-                "range_to": range_to,
-                "cont_flag": "1"  # Continuous data
+                "candles": formatted,
+                "count": len(formatted)
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message", "Failed to fetch history"),
+                "candles": []
             }
-            
-            response = fyers.history(data)
-            
-            if response.get("s") == "ok":
-                candles = response.get("candles", [])
-                # Format: [timestamp, open, high, low, close, volume]
-                formatted = []
-                for c in candles:
-                    formatted.append({
-                        "timestamp": c[0],
-                        "datetime": datetime.fromtimestamp(c[0]).isoformat(),
-                        "open": c[1],
-                        "high": c[2],
-                        "low": c[3],
-                        "close": c[4],
-                        "volume": c[5]
-                    })
-                
-                return {
-                    "success": True,
-                    "symbol": symbol,
-                    "resolution": resolution,
-                    "candles": formatted,
-                    "count": len(formatted)
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message", "Failed to fetch history"),
-                    "candles": []
-                }
-        except Exception as e:
-            return {"success": False, "error": str(e), "candles": []}
     
     def get_option_chain(
         self,
@@ -283,118 +515,298 @@ class FyersMarketService:
                 "strikecount": strike_count
             }
             response = fyers.optionchain(data)
+            return self._format_option_chain(symbol, response)
+        except Exception as e:
+            return {"success": False, "error": str(e), "chain": []}
+    
+    def _format_option_chain(self, symbol: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a raw Fyers options-chain response into the app's chain format.
+        
+        Args:
+            symbol: Underlying symbol the chain was requested for
+            response: Raw JSON response from /data/options-chain-v3
             
-            if response.get("code") == 200 or response.get("s") == "ok":
-                chain_data = response.get("data", {})
-                
-                # Extract raw options chain (flat list of CE/PE contracts)
-                options_list = chain_data.get("optionsChain", [])
-                expiry_data = chain_data.get("expiryData", [])
-                
-                # First item is usually the underlying spot data
-                spot_price = None
-                atm_strike = None
+        Returns:
+            Dict with option chain data including OI, IV, Greeks
+        """
+        if response.get("code") == 200 or response.get("s") == "ok":
+            chain_data = response.get("data", {})
+            
+            # Extract raw options chain (flat list of CE/PE contracts)
+            options_list = chain_data.get("optionsChain", [])
+            expiry_data = chain_data.get("expiryData", [])
+            
+            # First item is usually the underlying spot data
+            spot_price = None
+            atm_strike = None
+            
+            # Group by strike price and pair CE/PE
+            strikes_dict = {}
+            
+            # Single pass: each contract is placed in its strike row and its
+            # Black-Scholes inputs collected; Greeks are then attached in bulk
+            placed = []  # (option_data, strike row, _LEG_KEYS entry or None)
+            spots = []
+            strikes = []
+            ivs = []
+            is_call = []
+            
+            for opt in options_list:
+                strike = opt.get("strike_price")
+                opt_type = opt.get("option_type")
                 
-                # Group by strike price and pair CE/PE
-                strikes_dict = {}
+                # Skip non-option entries (like underlying index)
+                if strike == -1 or not opt_type:
+                    # This is the underlying index data
+                    if strike == -1:
+                        spot_price = opt.get("ltp")
+                    continue
                 
-                for opt in options_list:
-                    strike = opt.get("strike_price")
-                    opt_type = opt.get("option_type")
-                    
-                    # Skip non-option entries (like underlying index)
-                    if strike == -1 or not opt_type:
-                        # This is the underlying index data
-                        if strike == -1:
-                            spot_price = opt.get("ltp")
-                        continue
-                    
-                    if strike not in strikes_dict:
-                        strikes_dict[strike] = {
-                            "strike_price": strike, 
-                            "call": None, 
-                            "put": None,
-                            "call_greeks": None,
-                            "put_greeks": None,
-                            "call_oi": 0,
-                            "put_oi": 0,
-                            "call_iv": 0,
-                            "put_iv": 0
-                        }
-                    
-                    # Calculate time to expiry (estimate ~7 days for nearest expiry)
-                    time_to_expiry = 7 / 365.0  # Default weekly expiry
-                    iv_decimal = (opt.get("iv", 0) or 15) / 100  # Convert to decimal, default 15%
-                    
-                    # Calculate Greeks
-                    greeks = self._calculate_greeks(
-                        spot=spot_price or opt.get("ltp", 0),
-                        strike=strike,
-                        time_to_expiry=time_to_expiry,
-                        iv=iv_decimal,
-                        option_type=opt_type
-                    )
-                    
-                    option_data = {
-                        "symbol": opt.get("symbol"),
-                        "ltp": opt.get("ltp"),
-                        "oi": opt.get("oi", 0),
-                        "oi_change": opt.get("oich", 0),
-                        "oi_change_pct": opt.get("oichp", 0),
-                        "volume": opt.get("volume", 0),
-                        "iv": opt.get("iv"),
-                        "bid": opt.get("bid"),
-                        "ask": opt.get("ask"),
-                        "chg": opt.get("ltpch", 0),
-                        "chg_pct": opt.get("ltpchp", 0),
-                        "prev_oi": opt.get("prev_oi", 0),
-                        # Greeks
-                        "delta": greeks["delta"],
-                        "gamma": greeks["gamma"],
-                        "theta": greeks["theta"],
-                        "vega": greeks["vega"]
+                row = strikes_dict.get(strike)
+                if row is None:
+                    row = strikes_dict[strike] = {
+                        "strike_price": strike, 
+                        "call": None, 
+                        "put": None,
+                        "call_greeks": None,
+                        "put_greeks": None,
+                        "call_oi": 0,
+                        "put_oi": 0,
+                        "call_iv": 0,
+                        "put_iv": 0
                     }
-                    
-                    if opt_type == "CE":
-                        strikes_dict[strike]["call"] = option_data
-                        strikes_dict[strike]["call_greeks"] = greeks
-                        strikes_dict[strike]["call_oi"] = option_data["oi"]
-                        strikes_dict[strike]["call_iv"] = option_data["iv"]
-                    elif opt_type == "PE":
-                        strikes_dict[strike]["put"] = option_data
-                        strikes_dict[strike]["put_greeks"] = greeks
-                        strikes_dict[strike]["put_oi"] = option_data["oi"]
-                        strikes_dict[strike]["put_iv"] = option_data["iv"]
                 
-                # Sort by strike price and convert to list
-                sorted_strikes = sorted(strikes_dict.keys())
-                formatted_chain = [strikes_dict[s] for s in sorted_strikes]
+                spots.append(spot_price or opt.get("ltp", 0))
+                strikes.append(strike)
+                ivs.append((opt.get("iv", 0) or 15) / 100)  # Convert to decimal, default 15%
+                is_call.append(opt_type == "CE")
                 
-                # Find ATM strike
-                if spot_price and formatted_chain:
-                    atm_strike = min(sorted_strikes, key=lambda x: abs(x - spot_price))
-                
-                return {
-                    "success": True,
-                    "symbol": symbol,
-                    "spot_price": spot_price,
-                    "atm_strike": atm_strike,
-                    "total_call_oi": chain_data.get("callOi"),
-                    "total_put_oi": chain_data.get("putOi"),
-                    "pcr": round(chain_data.get("putOi", 0) / max(chain_data.get("callOi", 1), 1), 2),
-                    "india_vix": chain_data.get("indiavixData", {}).get("ltp"),
-                    "expiries": expiry_data,
-                    "chain": formatted_chain,
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message", "Failed to fetch option chain"),
-                    "chain": []
+                option_data = {
+                    "symbol": opt.get("symbol"),
+                    "ltp": opt.get("ltp"),
+                    "oi": opt.get("oi", 0),
+                    "oi_change": opt.get("oich", 0),
+                    "oi_change_pct": opt.get("oichp", 0),
+                    "volume": opt.get("volume", 0),
+                    "iv": opt.get("iv"),
+                    "bid": opt.get("bid"),
+                    "ask": opt.get("ask"),
+                    "chg": opt.get("ltpch", 0),
+                    "chg_pct": opt.get("ltpchp", 0),
+                    "prev_oi": opt.get("prev_oi", 0),
+                    # Greeks (filled in after the batch calculation)
+                    "delta": 0,
+                    "gamma": 0,
+                    "theta": 0,
+                    "vega": 0
                 }
+                
+                keys = _LEG_KEYS.get(opt_type)
+                if keys:
+                    leg_key, oi_key, iv_key, _ = keys
+                    row[leg_key] = option_data
+                    row[oi_key] = option_data["oi"]
+                    row[iv_key] = option_data["iv"]
+                placed.append((option_data, row, keys))
+            
+            # Calculate Greeks (time to expiry estimated at ~7 days for the nearest weekly expiry)
+            all_greeks = self._calculate_greeks_batch(
+                spots=np.array(spots, dtype=np.float64),
+                strikes=np.array(strikes, dtype=np.float64),
+                time_to_expiry=7 / 365.0,
+                ivs=np.array(ivs, dtype=np.float64),
+                is_call=np.array(is_call, dtype=bool)
+            )
+            
+            for (option_data, row, keys), greeks in zip(placed, all_greeks):
+                option_data.update(greeks)
+                if keys:
+                    row[keys[3]] = greeks
+            
+            # Sort by strike price and convert to list
+            sorted_strikes = sorted(strikes_dict)
+            formatted_chain = [strikes_dict[s] for s in sorted_strikes]
+            
+            # Find ATM strike (nearest to spot; the lower strike on a tie)
+            if spot_price and formatted_chain:
+                distance = np.abs(np.array(sorted_strikes, dtype=np.float64) - spot_price)
+                atm_strike = sorted_strikes[int(distance.argmin())]
+            
+            return {
+                "success": True,
+                "symbol": symbol,
+                "spot_price": spot_price,
+                "atm_strike": atm_strike,
+                "total_call_oi": chain_data.get("callOi"),
+                "total_put_oi": chain_data.get("putOi"),
+                "pcr": round(chain_data.get("putOi", 0) / max(chain_data.get("callOi", 1), 1), 2),
+                "india_vix": chain_data.get("indiavixData", {}).get("ltp"),
+                "expiries": expiry_data,
+                "chain": formatted_chain,
+                "timestamp": _now_iso()
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message", "Failed to fetch option chain"),
+                "chain": []
+            }
+    
+    async def aget_option_chain(
+        self,
+        symbol: str,
+        strike_count: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Async get_option_chain on the shared pooled HTTP client.
+        
+        Falls back to the SDK in a worker thread when no client is open
+        (e.g. outside the app lifespan) or no token is configured.
+        
+        Args:
+            symbol: Underlying symbol
+            strike_count: Number of strikes above/below ATM
+            
+        Returns:
+            Same dict as get_option_chain
+        """
+        try:
+            response = await self._aget_data("options-chain-v3", {"symbol": symbol, "strikecount": strike_count})
+            if response is not None:
+                return self._format_option_chain(symbol, response)
         except Exception as e:
             return {"success": False, "error": str(e), "chain": []}
+        return await asyncio.to_thread(self.get_option_chain, symbol, strike_count)
+    
+    async def _aget_data(self, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        GET a Fyers data endpoint on the shared pooled HTTP client.
+        
+        Returns:
+            Parsed JSON response, or None when no client is open (e.g.
+            outside the app lifespan) or no token is configured; callers
+            then fall back to the SDK in a worker thread
+        """
+        client = get_http_client()
+        auth_header = self.settings.get_access_token_formatted()
+        if client is None or not auth_header:
+            return None
+        
+        response = await client.get(
+            f"{FYERS_DATA_API}/{path}",
+            params=params,
+            headers=fyers_headers(auth_header)
+        )
+        return response.json()
+    
+    async def aget_quotes(self, symbols: List[str]) -> Dict[str, Any]:
+        """Async get_quotes on the shared pooled HTTP client (same result dict and cache)."""
+        ttl = self.settings.quote_cache_ttl
+        if ttl <= 0:
+            return await self._afetch_quotes(symbols)
+        
+        key = tuple(symbols[:50])
+        hit = self._fresh_quote(key, ttl)
+        if hit is not None:
+            return hit
+        
+        async with self._aquote_locks[hash(key) % LOCK_STRIPES]:
+            hit = self._fresh_quote(key, ttl)
+            if hit is not None:
+                return hit
+            
+            result = await self._afetch_quotes(symbols)
+            if result.get("success"):
+                self._store_quote(key, result)
+            return result
+    
+    async def _afetch_quotes(self, symbols: List[str]) -> Dict[str, Any]:
+        """Uncached aget_quotes (SDK in a worker thread when the client is unavailable)."""
+        try:
+            response = await self._aget_data("quotes", self._quotes_params(symbols))
+            if response is not None:
+                return self._format_quotes(response)
+        except Exception as e:
+            return {"success": False, "error": str(e), "data": []}
+        return await asyncio.to_thread(self._fetch_quotes, symbols)
+    
+    async def aget_market_depth(self, symbol: str) -> Dict[str, Any]:
+        """Async get_market_depth on the shared pooled HTTP client (same result dict)."""
+        try:
+            response = await self._aget_data("depth", {"symbol": symbol, "ohlcv_flag": "1"})
+            if response is not None:
+                return self._format_depth(response)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return await asyncio.to_thread(self.get_market_depth, symbol)
+    
+    async def aget_historical_data(
+        self,
+        symbol: str,
+        resolution: str = "D",
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        days: int = 30
+    ) -> Dict[str, Any]:
+        """Async get_historical_data on the shared pooled HTTP client (same result dict)."""
+        try:
+            data = self._history_params(symbol, resolution, from_date, to_date, days)
+            response = await self._aget_data("history", data)
+            if response is not None:
+                return self._format_history(symbol, resolution, response)
+        except Exception as e:
+            return {"success": False, "error": str(e), "candles": []}
+        return await asyncio.to_thread(self.get_historical_data, symbol, resolution, from_date, to_date, days)
+    
+    async def get_option_chain_cached(
+        self,
+        symbol: str,
+        strike_count: int = 10,
+        ttl: float = OPTION_CHAIN_TTL
+    ) -> Dict[str, Any]:
+        """
+        Get option chain through a short TTL cache.
+        
+        Concurrent callers for the same (symbol, strike_count) share one
+        upstream fetch (aget_option_chain); only successful results are
+        cached. Freshness is checked against each caller's own ttl.
+        
+        Args:
+            symbol: Underlying symbol
+            strike_count: Number of strikes above/below ATM
+            ttl: Maximum age (seconds) of a cached result this caller accepts
+            
+        Returns:
+            Same dict as get_option_chain
+        """
+        key = (symbol, strike_count)
+        hit = self._oc_cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        
+        async with self._oc_locks[hash(key) % LOCK_STRIPES]:
+            # Another waiter may have filled the cache while we queued
+            hit = self._oc_cache.get(key)
+            if hit and time.monotonic() - hit[0] < ttl:
+                return hit[1]
+            
+            result = await self.aget_option_chain(symbol, strike_count)
+            if result.get("success"):
+                self._store_option_chain(key, result)
+            return result
+    
+    def _store_option_chain(self, key: tuple, result: Dict[str, Any]) -> None:
+        """Store a chain result, evicting stale/oldest entries when full."""
+        now = time.monotonic()
+        self._oc_cache.pop(key, None)
+        if len(self._oc_cache) >= OPTION_CHAIN_CACHE_SIZE:
+            stale = now - OPTION_CHAIN_TTL
+            for k in [k for k, (fetched_at, _) in self._oc_cache.items() if fetched_at <= stale]:
+                del self._oc_cache[k]
+            while len(self._oc_cache) >= OPTION_CHAIN_CACHE_SIZE:
+                del self._oc_cache[next(iter(self._oc_cache))]
+        self._oc_cache[key] = (now, result)
     
     def get_indices(self) -> Dict[str, Any]:
         """
@@ -403,15 +815,11 @@ class FyersMarketService:
         Returns:
             Dict with major indices (NIFTY, BANKNIFTY, etc.)
         """
-        indices = [
-            "NSE:NIFTY50-INDEX",
-            "NSE:NIFTYBANK-INDEX",
-            "NSE:NIFTYIT-INDEX",
-            "NSE:NIFTYFIN-INDEX",
-            "BSE:SENSEX-INDEX"
-        ]
-        
-        return self.get_quotes(indices)
+        return self.get_quotes(MAJOR_INDICES)
+    
+    async def aget_indices(self) -> Dict[str, Any]:
+        """Async get_indices (see aget_quotes)."""
+        return await self.aget_quotes(MAJOR_INDICES)
     
     def get_spot_price(self, symbol: str) -> Dict[str, Any]:
         """
@@ -423,8 +831,14 @@ class FyersMarketService:
         Returns:
             Dict with spot price details
         """
-        result = self.get_quotes([symbol])
-        
+        return self._spot_from_quotes(symbol, self.get_quotes([symbol]))
+    
+    async def aget_spot_price(self, symbol: str) -> Dict[str, Any]:
+        """Async get_spot_price (see aget_quotes)."""
+        return self._spot_from_quotes(symbol, await self.aget_quotes([symbol]))
+    
+    def _spot_from_quotes(self, symbol: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Spot price details from a single-symbol get_quotes result."""
         if result.get("success") and result.get("data"):
             quote = result["data"][0] if result["data"] else {}
             return {
@@ -438,19 +852,13 @@ class FyersMarketService:
                 "change": quote.get("v", {}).get("ch"),
                 "change_percent": quote.get("v", {}).get("chp"),
                 "volume": quote.get("v", {}).get("volume"),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         else:
             return result
 
 
-# Singleton instance
-_market_service: Optional[FyersMarketService] = None
-
-
+@lru_cache(maxsize=1)
 def get_market_service() -> FyersMarketService:
-    """Get the market service instance."""
-    global _market_service
-    if _market_service is None:
-        _market_service = FyersMarketService()
-    return _market_service
+    """Get the market service instance (created on first use)."""
+    return FyersMarketService()
@@ -3,19 +3,54 @@ Fyers Orders Service
 
 Provides methods for order management including placing, modifying,
 and cancelling orders, as well as fetching orderbook, tradebook, and positions.
+The a-prefixed coroutines call the same REST endpoints on the shared pooled
+HTTP client (keep-alive across calls) and fall back to the SDK in a thread.
 """
 
-from typing import Optional, List, Dict, Any
-from enum import Enum
+import asyncio
+import itertools
+import math
+import threading
+import time
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Sequence, Tuple
+from enum import Enum, IntEnum
+from functools import lru_cache
 from datetime import datetime
 
+import orjson
 from fyers_apiv3 import fyersModel
 
-from app.core.config import get_settings
-from app.services.fyers_auth import get_auth_service
+from app.core.config import Settings, get_settings
+from app.core.http import fyers_headers, get_http_client
+from app.services.fyers_auth import FYERS_API, get_auth_service
 
 
-class OrderType(int, Enum):
+# Fyers v3 trading endpoints (same paths the SDK calls)
+ORDERS_URL = f"{FYERS_API}/orders/sync"
+MULTI_ORDER_URL = f"{FYERS_API}/multi-order/sync"
+ORDERBOOK_URL = f"{FYERS_API}/orders"
+TRADEBOOK_URL = f"{FYERS_API}/tradebook"
+POSITIONS_URL = f"{FYERS_API}/positions"
+HOLDINGS_URL = f"{FYERS_API}/holdings"
+
+# Fyers multi-order endpoints accept at most this many orders per request
+BASKET_MAX = 10
+
+# Last formatted response timestamp as (epoch milliseconds, ISO string)
+_ts_cache: Tuple[int, str] = (0, "")
+
+
+def _now_iso() -> str:
+    """Local ISO timestamp in milliseconds, formatted once per millisecond."""
+    global _ts_cache
+    ms = time.time_ns() // 1_000_000
+    cached = _ts_cache
+    if cached[0] != ms:
+        cached = _ts_cache = (ms, datetime.fromtimestamp(ms / 1000).isoformat(timespec="milliseconds"))
+    return cached[1]
+
+
+class OrderType(IntEnum):
     """Order types for Fyers API."""
     LIMIT = 1
     MARKET = 2
@@ -23,7 +58,7 @@ class OrderType(int, Enum):
     STOP_MARKET = 4
 
 
-class OrderSide(int, Enum):
+class OrderSide(IntEnum):
     """Order sides."""
     BUY = 1
     SELL = -1
@@ -44,17 +79,134 @@ class OrderValidity(str, Enum):
     IOC = "IOC"  # Immediate or Cancel
 
 
+# Wire values per enum member, so request bodies skip the .value descriptor
+# (OrderType/OrderSide are IntEnums and go into bodies as they are)
+_PRODUCT_V = {e: e.value for e in ProductType}
+_VALIDITY_V = {e: e.value for e in OrderValidity}
+
+
 class FyersOrderService:
     """Service for order management via Fyers API."""
     
     def __init__(self):
-        self.settings = get_settings()
         self.auth_service = get_auth_service()
+        # Read cache: key -> (monotonic time, result); _read_gen bumps on every
+        # mutation so a read that raced an order change is never stored
+        self._read_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._read_gen = 0
+        self._read_lock = threading.Lock()
+        self._batcher: Optional["PlacementBatcher"] = None
+        # (auth header, request headers) for the token they were built from
+        self._headers: Tuple[Optional[str], Optional[Dict[str, str]]] = (None, None)
+    
+    @property
+    def settings(self) -> Settings:
+        """Current settings snapshot (follows reload_settings)."""
+        return get_settings()
     
     def _get_fyers(self) -> Optional[fyersModel.FyersModel]:
         """Get authenticated Fyers model."""
         return self.auth_service.get_fyers_model()
     
+    def _fresh_read(self, key: str, ttl: float) -> Optional[Dict[str, Any]]:
+        """Cached read result for key if younger than ttl seconds."""
+        hit = self._read_cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        return None
+    
+    def _store_read(self, key: str, gen: int, result: Dict[str, Any]) -> None:
+        """Cache a successful read unless an order changed since it started."""
+        if not result.get("success"):
+            return
+        with self._read_lock:
+            if gen == self._read_gen:
+                self._read_cache[key] = (time.monotonic(), result)
+    
+    def _invalidate_reads(self) -> None:
+        """Drop cached reads after an order/position change."""
+        with self._read_lock:
+            self._read_gen += 1
+            self._read_cache.clear()
+    
+    def _cached_read(self, key: str, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Serve key from the read cache, else fetch() and cache the result."""
+        ttl = self.settings.order_cache_ttl
+        if ttl <= 0:
+            return fetch()
+        
+        hit = self._fresh_read(key, ttl)
+        if hit is not None:
+            return hit
+        gen = self._read_gen
+        result = fetch()
+        self._store_read(key, gen, result)
+        return result
+    
+    async def _acached_read(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Async _cached_read (same cache)."""
+        ttl = self.settings.order_cache_ttl
+        if ttl <= 0:
+            return await fetch()
+        
+        hit = self._fresh_read(key, ttl)
+        if hit is not None:
+            return hit
+        gen = self._read_gen
+        result = await fetch()
+        self._store_read(key, gen, result)
+        return result
+    
+    def _request_headers(self) -> Optional[Dict[str, str]]:
+        """Request headers for the current token (rebuilt only when it changes)."""
+        auth_header = self.settings.get_access_token_formatted()
+        if not auth_header:
+            return None
+        cached = self._headers
+        if cached[0] != auth_header:
+            cached = self._headers = (auth_header, fyers_headers(auth_header))
+        return cached[1]
+    
+    async def _arequest(
+        self,
+        method: str,
+        url: str,
+        payload: Optional[Any] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Call a Fyers trading endpoint (one of the *_URL constants) on the
+        shared pooled HTTP client.
+        
+        Bodies are encoded and responses parsed with orjson. Anything but a
+        GET may change orders or positions, so it drops the read cache once
+        the request has been sent.
+        
+        Returns:
+            Parsed JSON response, or None when no client is open (e.g.
+            outside the app lifespan) or no token is configured; callers
+            then fall back to the SDK in a worker thread
+        """
+        client = get_http_client()
+        headers = self._request_headers()
+        if client is None or headers is None:
+            return None
+        
+        try:
+            response = await client.request(
+                method,
+                url,
+                content=orjson.dumps(payload) if payload is not None else None,
+                headers=headers
+            )
+        finally:
+            if method != "GET":
+                self._invalidate_reads()
+        return orjson.loads(response.content)
+    
     # ============ Order Placement ============
     
     def place_order(
@@ -95,65 +247,158 @@ class FyersOrderService:
             return {"success": False, "error": "Not authenticated"}
         
         try:
-            data = {
-                "symbol": symbol,
-                "qty": qty,
-                "type": order_type.value,
-                "side": side.value,
-                "productType": product_type.value,
-                "limitPrice": limit_price,
-                "stopPrice": stop_price,
-                "validity": validity.value,
-                "disclosedQty": disclosed_qty,
-                "offlineOrder": False,
-                "stopLoss": stop_loss,
-                "takeProfit": take_profit
-            }
-            
+            data = self._order_payload(
+                symbol, qty, side, order_type, product_type, limit_price,
+                stop_price, validity, stop_loss, take_profit, disclosed_qty
+            )
             response = fyers.place_order(data)
-            
-            if response.get("s") == "ok":
-                return {
-                    "success": True,
-                    "order_id": response.get("id"),
-                    "message": response.get("message", "Order placed successfully"),
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message", "Order placement failed"),
-                    "code": response.get("code")
-                }
+            self._invalidate_reads()
+            return self._format_placed(response)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    async def aplace_order(
+        self,
+        symbol: str,
+        qty: int,
+        side: OrderSide,
+        order_type: OrderType = OrderType.MARKET,
+        product_type: ProductType = ProductType.INTRADAY,
+        limit_price: float = 0,
+        stop_price: float = 0,
+        validity: OrderValidity = OrderValidity.DAY,
+        stop_loss: float = 0,
+        take_profit: float = 0,
+        disclosed_qty: int = 0
+    ) -> Dict[str, Any]:
+        """Async place_order on the shared pooled HTTP client (same result dict)."""
+        args = (
+            symbol, qty, side, order_type, product_type, limit_price,
+            stop_price, validity, stop_loss, take_profit, disclosed_qty
+        )
+        try:
+            response = await self._arequest("POST", ORDERS_URL, self._order_payload(*args))
+            if response is not None:
+                return self._format_placed(response)
         except Exception as e:
             return {"success": False, "error": str(e)}
+        return await asyncio.to_thread(self.place_order, *args)
+    
+    @staticmethod
+    def _order_payload(
+        symbol: str,
+        qty: int,
+        side: OrderSide,
+        order_type: OrderType = OrderType.MARKET,
+        product_type: ProductType = ProductType.INTRADAY,
+        limit_price: float = 0,
+        stop_price: float = 0,
+        validity: OrderValidity = OrderValidity.DAY,
+        stop_loss: float = 0,
+        take_profit: float = 0,
+        disclosed_qty: int = 0
+    ) -> Dict[str, Any]:
+        """Build the Fyers place-order request body."""
+        return {
+            "symbol": symbol,
+            "qty": qty,
+            "type": order_type,
+            "side": side,
+            "productType": _PRODUCT_V[product_type],
+            "limitPrice": limit_price,
+            "stopPrice": stop_price,
+            "validity": _VALIDITY_V[validity],
+            "disclosedQty": disclosed_qty,
+            "offlineOrder": False,
+            "stopLoss": stop_loss,
+            "takeProfit": take_profit
+        }
+    
+    @staticmethod
+    def _format_placed(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a place-order response."""
+        if response.get("s") == "ok":
+            return {
+                "success": True,
+                "order_id": response.get("id"),
+                "message": response.get("message", "Order placed successfully"),
+                "timestamp": _now_iso()
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message", "Order placement failed"),
+                "code": response.get("code")
+            }
     
-    def place_basket_orders(self, orders: List[Dict]) -> Dict[str, Any]:
+    def place_basket_orders(self, orders: Sequence[Dict]) -> Dict[str, Any]:
         """
-        Place multiple orders at once (max 10).
+        Place multiple orders at once (max BASKET_MAX).
+        
+        Oversized baskets are rejected rather than truncated, so no order
+        is silently dropped.
         
         Args:
-            orders: List of order dictionaries
+            orders: List (or tuple) of order dictionaries
             
         Returns:
             Dict with basket order response
         """
+        if len(orders) > BASKET_MAX:
+            return self._basket_too_large(orders)
+        
         fyers = self._get_fyers()
         if not fyers:
             return {"success": False, "error": "Not authenticated"}
         
         try:
-            # Limit to 10 orders
-            orders = orders[:10]
             response = fyers.place_basket_orders(orders)
-            
-            return {
-                "success": True,
-                "data": response,
-                "timestamp": datetime.now().isoformat()
-            }
+            self._invalidate_reads()
+            return self._format_basket_placed(response)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    async def aplace_basket_orders(self, orders: Sequence[Dict]) -> Dict[str, Any]:
+        """Async place_basket_orders on the shared pooled HTTP client (same result dict)."""
+        if len(orders) > BASKET_MAX:
+            return self._basket_too_large(orders)
+        
+        try:
+            response = await self._arequest("POST", MULTI_ORDER_URL, orders)
+            if response is not None:
+                return self._format_basket_placed(response)
         except Exception as e:
             return {"success": False, "error": str(e)}
+        return await asyncio.to_thread(self.place_basket_orders, orders)
+    
+    @staticmethod
+    def _basket_too_large(orders: Sequence[Dict]) -> Dict[str, Any]:
+        """Error result for a basket over the Fyers limit."""
+        return {
+            "success": False,
+            "error": f"Basket size {len(orders)} exceeds the limit of {BASKET_MAX} orders"
+        }
+    
+    @staticmethod
+    def _format_basket_placed(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a basket-order response (per-order results stay in data["data"])."""
+        return {
+            "success": True,
+            "data": response,
+            "timestamp": _now_iso()
+        }
+    
+    async def aplace_order_batched(self, *args, **kwargs) -> Dict[str, Any]:
+        """
+        Place a single order through the placement batcher.
+        
+        Takes the same arguments and returns the same dict as place_order,
+        but orders placed within a few milliseconds of each other share
+        one multi-order request (see PlacementBatcher).
+        """
+        if self._batcher is None:
+            self._batcher = PlacementBatcher(self)
+        return await self._batcher.place_order(self._order_payload(*args, **kwargs))
     
     # ============ Order Modification ============
     
@@ -181,31 +426,63 @@ class FyersOrderService:
             return {"success": False, "error": "Not authenticated"}
         
         try:
-            data = {"id": order_id}
-            
-            if order_type is not None:
-                data["type"] = order_type.value
-            if limit_price is not None:
-                data["limitPrice"] = limit_price
-            if qty is not None:
-                data["qty"] = qty
-            
+            data = self._modify_payload(order_id, order_type, limit_price, qty)
             response = fyers.modify_order(data)
-            
-            if response.get("s") == "ok":
-                return {
-                    "success": True,
-                    "order_id": order_id,
-                    "message": "Order modified successfully"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message", "Modification failed")
-                }
+            self._invalidate_reads()
+            return self._format_modified(order_id, response)
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    async def amodify_order(
+        self,
+        order_id: str,
+        order_type: Optional[OrderType] = None,
+        limit_price: Optional[float] = None,
+        qty: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Async modify_order on the shared pooled HTTP client (same result dict)."""
+        try:
+            data = self._modify_payload(order_id, order_type, limit_price, qty)
+            response = await self._arequest("PATCH", ORDERS_URL, data)
+            if response is not None:
+                return self._format_modified(order_id, response)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return await asyncio.to_thread(self.modify_order, order_id, order_type, limit_price, qty)
+    
+    @staticmethod
+    def _modify_payload(
+        order_id: str,
+        order_type: Optional[OrderType],
+        limit_price: Optional[float],
+        qty: Optional[int]
+    ) -> Dict[str, Any]:
+        """Build the Fyers modify-order request body (only the fields being changed)."""
+        data = {"id": order_id}
+        
+        if order_type is not None:
+            data["type"] = order_type
+        if limit_price is not None:
+            data["limitPrice"] = limit_price
+        if qty is not None:
+            data["qty"] = qty
+        return data
+    
+    @staticmethod
+    def _format_modified(order_id: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a modify-order response."""
+        if response.get("s") == "ok":
+            return {
+                "success": True,
+                "order_id": order_id,
+                "message": "Order modified successfully"
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message", "Modification failed")
+            }
+    
     # ============ Order Cancellation ============
     
     def cancel_order(self, order_id: str) -> Dict[str, Any]:
@@ -223,48 +500,124 @@ class FyersOrderService:
             return {"success": False, "error": "Not authenticated"}
         
         try:
-            data = {"id": order_id}
-            response = fyers.cancel_order(data)
-            
-            if response.get("s") == "ok":
-                return {
-                    "success": True,
-                    "order_id": order_id,
-                    "message": "Order cancelled successfully"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message", "Cancellation failed")
-                }
+            response = fyers.cancel_order({"id": order_id})
+            self._invalidate_reads()
+            return self._format_cancelled(order_id, response)
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    async def acancel_order(self, order_id: str) -> Dict[str, Any]:
+        """Async cancel_order on the shared pooled HTTP client (same result dict)."""
+        try:
+            response = await self._arequest("DELETE", ORDERS_URL, {"id": order_id})
+            if response is not None:
+                return self._format_cancelled(order_id, response)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return await asyncio.to_thread(self.cancel_order, order_id)
+    
+    @staticmethod
+    def _format_cancelled(order_id: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a cancel-order response."""
+        if response.get("s") == "ok":
+            return {
+                "success": True,
+                "order_id": order_id,
+                "message": "Order cancelled successfully"
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message", "Cancellation failed")
+            }
+    
     def cancel_basket_orders(self, order_ids: List[str]) -> Dict[str, Any]:
         """
-        Cancel multiple orders.
+        Cancel multiple orders, BASKET_MAX per basket request.
         
         Args:
             order_ids: List of order IDs to cancel
             
         Returns:
-            Dict with cancellation response
+            Dict with per-basket status ("baskets") and the confirmed cancelled_count
         """
         fyers = self._get_fyers()
         if not fyers:
             return {"success": False, "error": "Not authenticated"}
         
+        baskets = self._cancel_baskets(order_ids)
+        responses: List[Any] = []
         try:
-            data = [{"id": oid} for oid in order_ids]
-            response = fyers.cancel_basket_orders(data)
+            for data in baskets:
+                try:
+                    responses.append(fyers.cancel_basket_orders(data))
+                except Exception as e:
+                    responses.append(e)
+        finally:
+            # Earlier baskets may have gone through even if a later one failed
+            self._invalidate_reads()
+        return self._format_basket_cancel(baskets, responses)
+    
+    async def acancel_basket_orders(self, order_ids: List[str]) -> Dict[str, Any]:
+        """Async cancel_basket_orders; the baskets are sent concurrently on the pooled client."""
+        if get_http_client() is None or self._request_headers() is None:
+            return await asyncio.to_thread(self.cancel_basket_orders, order_ids)
+        
+        baskets = self._cancel_baskets(order_ids)
+        responses = await asyncio.gather(
+            *(self._arequest("DELETE", MULTI_ORDER_URL, data) for data in baskets),
+            return_exceptions=True
+        )
+        return self._format_basket_cancel(baskets, responses)
+    
+    @staticmethod
+    def _cancel_baskets(order_ids: List[str]) -> List[List[Dict[str, str]]]:
+        """Split order ids into basket-cancel request bodies of at most BASKET_MAX."""
+        return [
+            [{"id": oid} for oid in order_ids[i:i + BASKET_MAX]]
+            for i in range(0, len(order_ids), BASKET_MAX)
+        ]
+    
+    @staticmethod
+    def _format_basket_cancel(baskets: List[List[Dict[str, str]]], responses: List[Any]) -> Dict[str, Any]:
+        """
+        Format the per-basket cancel responses.
+        
+        A basket counts only the orders Fyers confirmed (per-order "body"
+        results when present, else the whole basket on an "ok" reply), so a
+        partial failure reports exactly what was cancelled.
+        """
+        results = []
+        cancelled = 0
+        for basket, response in zip(baskets, responses):
+            ids = [order["id"] for order in basket]
+            if isinstance(response, Exception):
+                results.append({"order_ids": ids, "success": False, "error": str(response)})
+                continue
             
-            return {
-                "success": True,
-                "data": response,
-                "cancelled_count": len(order_ids)
-            }
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+            if response.get("s") != "ok":
+                results.append({
+                    "order_ids": ids,
+                    "success": False,
+                    "error": response.get("message", "Cancellation failed"),
+                    "data": response
+                })
+                continue
+            
+            items = response.get("data")
+            if isinstance(items, list):
+                count = sum(1 for item in items if (item.get("body") or {}).get("s") == "ok")
+            else:
+                count = len(ids)
+            cancelled += count
+            results.append({"order_ids": ids, "success": count == len(ids), "data": response})
+        
+        return {
+            "success": all(r["success"] for r in results),
+            "baskets": results,
+            "cancelled_count": cancelled,
+            "requested_count": sum(len(basket) for basket in baskets)
+        }
     
     # ============ Order/Trade/Position Queries ============
     
@@ -272,128 +625,252 @@ class FyersOrderService:
         """
         Get all orders for the day (orderbook).
         
+        Successful results are reused for settings.order_cache_ttl seconds
+        and dropped whenever an order or position changes.
+        
         Returns:
             Dict with order list
         """
+        return self._cached_read("orders", self._fetch_orders)
+    
+    def _fetch_orders(self) -> Dict[str, Any]:
+        """Uncached get_orders through the SDK."""
         fyers = self._get_fyers()
         if not fyers:
             return {"success": False, "error": "Not authenticated", "orders": []}
         
         try:
-            response = fyers.orderbook()
-            
-            if response.get("s") == "ok":
-                orders = response.get("orderBook", [])
-                return {
-                    "success": True,
-                    "orders": orders,
-                    "count": len(orders),
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message"),
-                    "orders": []
-                }
+            return self._format_orders(fyers.orderbook())
         except Exception as e:
             return {"success": False, "error": str(e), "orders": []}
     
+    async def aget_orders(self) -> Dict[str, Any]:
+        """Async get_orders on the shared pooled HTTP client (same result dict and cache)."""
+        return await self._acached_read("orders", self._afetch_orders)
+    
+    async def _afetch_orders(self) -> Dict[str, Any]:
+        """Uncached aget_orders."""
+        try:
+            response = await self._arequest("GET", ORDERBOOK_URL)
+            if response is not None:
+                return self._format_orders(response)
+        except Exception as e:
+            return {"success": False, "error": str(e), "orders": []}
+        return await asyncio.to_thread(self._fetch_orders)
+    
+    @staticmethod
+    def _format_orders(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a orderbook response."""
+        if response.get("s") == "ok":
+            orders = response.get("orderBook", [])
+            return {
+                "success": True,
+                "orders": orders,
+                "count": len(orders),
+                "timestamp": _now_iso()
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message"),
+                "orders": []
+            }
+    
     def get_trades(self) -> Dict[str, Any]:
         """
         Get all trades for the day (tradebook).
         
+        Successful results are reused for settings.order_cache_ttl seconds
+        and dropped whenever an order or position changes.
+        
         Returns:
             Dict with trade list
         """
+        return self._cached_read("trades", self._fetch_trades)
+    
+    def _fetch_trades(self) -> Dict[str, Any]:
+        """Uncached get_trades through the SDK."""
         fyers = self._get_fyers()
         if not fyers:
             return {"success": False, "error": "Not authenticated", "trades": []}
         
         try:
-            response = fyers.tradebook()
-            
-            if response.get("s") == "ok":
-                trades = response.get("tradeBook", [])
-                return {
-                    "success": True,
-                    "trades": trades,
-                    "count": len(trades),
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message"),
-                    "trades": []
-                }
+            return self._format_trades(fyers.tradebook())
         except Exception as e:
             return {"success": False, "error": str(e), "trades": []}
     
+    async def aget_trades(self) -> Dict[str, Any]:
+        """Async get_trades on the shared pooled HTTP client (same result dict and cache)."""
+        return await self._acached_read("trades", self._afetch_trades)
+    
+    async def _afetch_trades(self) -> Dict[str, Any]:
+        """Uncached aget_trades."""
+        try:
+            response = await self._arequest("GET", TRADEBOOK_URL)
+            if response is not None:
+                return self._format_trades(response)
+        except Exception as e:
+            return {"success": False, "error": str(e), "trades": []}
+        return await asyncio.to_thread(self._fetch_trades)
+    
+    @staticmethod
+    def _format_trades(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a tradebook response."""
+        if response.get("s") == "ok":
+            trades = response.get("tradeBook", [])
+            return {
+                "success": True,
+                "trades": trades,
+                "count": len(trades),
+                "timestamp": _now_iso()
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message"),
+                "trades": []
+            }
+    
     def get_positions(self) -> Dict[str, Any]:
         """
         Get current positions.
         
+        Successful results are reused for settings.order_cache_ttl seconds
+        and dropped whenever an order or position changes.
+        
         Returns:
             Dict with positions list
         """
+        return self._cached_read("positions", self._fetch_positions)
+    
+    def _fetch_positions(self) -> Dict[str, Any]:
+        """Uncached get_positions through the SDK."""
         fyers = self._get_fyers()
         if not fyers:
             return {"success": False, "error": "Not authenticated", "positions": []}
         
         try:
-            response = fyers.positions()
-            
-            if response.get("s") == "ok":
-                positions = response.get("netPositions", [])
-                return {
-                    "success": True,
-                    "positions": positions,
-                    "count": len(positions),
-                    "total_pnl": sum(p.get("pl", 0) for p in positions),
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message"),
-                    "positions": []
-                }
+            return self._format_positions(fyers.positions())
+        except Exception as e:
+            return {"success": False, "error": str(e), "positions": []}
+    
+    async def aget_positions(self) -> Dict[str, Any]:
+        """Async get_positions on the shared pooled HTTP client (same result dict and cache)."""
+        return await self._acached_read("positions", self._afetch_positions)
+    
+    async def _afetch_positions(self) -> Dict[str, Any]:
+        """Uncached aget_positions."""
+        try:
+            response = await self._arequest("GET", POSITIONS_URL)
+            if response is not None:
+                return self._format_positions(response)
         except Exception as e:
             return {"success": False, "error": str(e), "positions": []}
+        return await asyncio.to_thread(self._fetch_positions)
+    
+    @staticmethod
+    def _format_positions(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a positions response."""
+        if response.get("s") == "ok":
+            positions = response.get("netPositions", [])
+            return {
+                "success": True,
+                "positions": positions,
+                "count": len(positions),
+                "total_pnl": math.fsum([p.get("pl", 0) for p in positions]),
+                "timestamp": _now_iso()
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message"),
+                "positions": []
+            }
     
     def get_holdings(self) -> Dict[str, Any]:
         """
         Get holdings (delivery positions).
         
+        Successful results are reused for settings.order_cache_ttl seconds
+        and dropped whenever an order or position changes.
+        
         Returns:
             Dict with holdings list
         """
+        return self._cached_read("holdings", self._fetch_holdings)
+    
+    def _fetch_holdings(self) -> Dict[str, Any]:
+        """Uncached get_holdings through the SDK."""
         fyers = self._get_fyers()
         if not fyers:
             return {"success": False, "error": "Not authenticated", "holdings": []}
         
         try:
-            response = fyers.holdings()
-            
-            if response.get("s") == "ok":
-                holdings = response.get("holdings", [])
-                return {
-                    "success": True,
-                    "holdings": holdings,
-                    "count": len(holdings),
-                    "total_value": sum(h.get("holdingType", 0) for h in holdings),
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": response.get("message"),
-                    "holdings": []
-                }
+            return self._format_holdings(fyers.holdings())
         except Exception as e:
             return {"success": False, "error": str(e), "holdings": []}
     
+    async def aget_holdings(self) -> Dict[str, Any]:
+        """Async get_holdings on the shared pooled HTTP client (same result dict and cache)."""
+        return await self._acached_read("holdings", self._afetch_holdings)
+    
+    async def _afetch_holdings(self) -> Dict[str, Any]:
+        """Uncached aget_holdings."""
+        try:
+            response = await self._arequest("GET", HOLDINGS_URL)
+            if response is not None:
+                return self._format_holdings(response)
+        except Exception as e:
+            return {"success": False, "error": str(e), "holdings": []}
+        return await asyncio.to_thread(self._fetch_holdings)
+    
+    @staticmethod
+    def _format_holdings(response: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a holdings response."""
+        if response.get("s") == "ok":
+            holdings = response.get("holdings", [])
+            return {
+                "success": True,
+                "holdings": holdings,
+                "count": len(holdings),
+                "total_value": math.fsum([h.get("marketVal", 0) for h in holdings]),
+                "timestamp": _now_iso()
+            }
+        else:
+            return {
+                "success": False,
+                "error": response.get("message"),
+                "holdings": []
+            }
+    
+    async def get_dashboard_snapshot(self) -> Dict[str, Any]:
+        """
+        Fetch orders, trades, positions and holdings concurrently.
+        
+        The four reads overlap, so a dashboard refresh costs about one
+        round trip instead of four. Each section keeps its own result dict
+        (with "success"/"error"), so one failed read doesn't hide the rest.
+        
+        Returns:
+            Dict with orders, trades, positions and holdings results
+        """
+        keys = ("orders", "trades", "positions", "holdings")
+        results = await asyncio.gather(
+            self.aget_orders(),
+            self.aget_trades(),
+            self.aget_positions(),
+            self.aget_holdings(),
+            return_exceptions=True
+        )
+        
+        snapshot: Dict[str, Any] = {"success": True}
+        for key, result in zip(keys, results):
+            if isinstance(result, Exception):
+                result = {"success": False, "error": str(result), key: []}
+            snapshot[key] = result
+        snapshot["timestamp"] = _now_iso()
+        return snapshot
+    
     # ============ Position Management ============
     
     def exit_position(self, position_id: str) -> Dict[str, Any]:
@@ -413,6 +890,7 @@ class FyersOrderService:
         try:
             data = {"id": position_id}
             response = fyers.exit_positions(data)
+            self._invalidate_reads()
             
             if response.get("s") == "ok":
                 return {
@@ -441,6 +919,7 @@ class FyersOrderService:
         try:
             # Exit all positions
             response = fyers.exit_positions(data={})
+            self._invalidate_reads()
             
             return {
                 "success": True,
@@ -480,11 +959,12 @@ class FyersOrderService:
                 "symbol": symbol,
                 "positionSide": position_side,
                 "convertQty": qty,
-                "convertFrom": from_product.value,
-                "convertTo": to_product.value
+                "convertFrom": _PRODUCT_V[from_product],
+                "convertTo": _PRODUCT_V[to_product]
             }
             
             response = fyers.convert_position(data)
+            self._invalidate_reads()
             
             if response.get("s") == "ok":
                 return {
@@ -500,13 +980,106 @@ class FyersOrderService:
             return {"success": False, "error": str(e)}
 
 
-# Singleton instance
-_order_service: Optional[FyersOrderService] = None
+class PlacementBatcher:
+    """
+    Coalesces single order placements into multi-order requests.
+    
+    Orders queued within `interval` seconds of the first one are sent
+    together through aplace_basket_orders (at most `max_size` per basket,
+    a full basket is sent immediately). Each queued order gets an
+    orderTag unless the caller set one, and basket results are matched
+    back to callers by the tag echoed in them. Only when a response
+    echoes no tags at all, and has exactly one result per order, are
+    results matched by position; otherwise an unmatched caller gets an
+    error rather than someone else's order id.
+    """
+    
+    def __init__(self, service: FyersOrderService, interval: float = 0.008, max_size: int = BASKET_MAX):
+        self._service = service
+        self._interval = interval
+        self._max_size = min(max_size, BASKET_MAX)
+        self._queue: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tags = itertools.count(1)
+        # Strong references to in-flight flushes (the loop only keeps weak ones)
+        self._flushes: set = set()
+    
+    async def place_order(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue one place-order body and wait for its result."""
+        if not data.get("orderTag"):
+            data = {**data, "orderTag": f"pb{next(self._tags)}"}
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((data, future))
+        
+        if len(self._queue) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._interval, self._flush)
+        return await future
+    
+    def _flush(self) -> None:
+        """Send everything queued so far, one basket per max_size orders."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        queue, self._queue = self._queue, []
+        for i in range(0, len(queue), self._max_size):
+            task = asyncio.ensure_future(self._send(queue[i:i + self._max_size]))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+    
+    async def _send(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """Place one basket and resolve each queued caller with its own result."""
+        try:
+            result = await self._service.aplace_basket_orders([data for data, _ in batch])
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        
+        response = (result.get("data") or {}) if result.get("success") else {}
+        if response.get("s") == "ok":
+            results = self._match_results(batch, response.get("data") or [])
+        else:
+            error = result.get("error") or response.get("message") or "Basket placement failed"
+            results = [{"success": False, "error": error}] * len(batch)
+        
+        for (_, future), placed in zip(batch, results):
+            if not future.done():
+                future.set_result(placed)
+    
+    @staticmethod
+    def _match_results(
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]],
+        items: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Pair each queued order with its basket result (by orderTag, else by position)."""
+        by_tag = {}
+        for item in items:
+            body = item.get("body") or {}
+            tag = body.get("orderTag") or item.get("orderTag")
+            if tag:
+                by_tag[tag] = body
+        
+        if by_tag:
+            bodies = [by_tag.get(data["orderTag"]) for data, _ in batch]
+        elif len(items) == len(batch):
+            bodies = [item.get("body") or {} for item in items]
+        else:
+            return [{
+                "success": False,
+                "error": "Basket response did not match the submitted orders; check the orderbook"
+            }] * len(batch)
+        
+        return [
+            FyersOrderService._format_placed(body) if body is not None
+            else {"success": False, "error": "No result for order in basket response"}
+            for body in bodies
+        ]
 
 
+@lru_cache(maxsize=1)
 def get_order_service() -> FyersOrderService:
-    """Get the order service instance."""
-    global _order_service
-    if _order_service is None:
-        _order_service = FyersOrderService()
-    return _order_service
+    """Get the order service instance (created on first use)."""
+    return FyersOrderService()
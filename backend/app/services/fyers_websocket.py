@@ -14,7 +14,7 @@ import logging
 
 from fyers_apiv3.FyersWebsocket import data_ws, order_ws
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
 
 
 logger = logging.getLogger(__name__)
@@ -54,7 +54,6 @@ class FyersDataSocket:
         lite_mode: bool = False
     ):
         self.access_token = access_token
-        self.settings = get_settings()
         self._socket = None
         self._connected = False
         self._subscribed_symbols: List[str] = []
@@ -67,6 +66,11 @@ class FyersDataSocket:
         self._on_open = on_open
         self._lite_mode = lite_mode
     
+    @property
+    def settings(self) -> Settings:
+        """Current settings snapshot (follows reload_settings)."""
+        return get_settings()
+    
     def _handle_message(self, message: Dict):
         """Internal message handler."""
         self._message_queue.put(message)
@@ -288,7 +292,6 @@ class FyersWebSocketManager:
     """
     
     def __init__(self):
-        self.settings = get_settings()
         self._data_socket: Optional[FyersDataSocket] = None
         self._order_socket: Optional[FyersOrderSocket] = None
         self._subscribers: Dict[str, List[Callable]] = {
@@ -298,6 +301,11 @@ class FyersWebSocketManager:
             "positions": []
         }
     
+    @property
+    def settings(self) -> Settings:
+        """Current settings snapshot (follows reload_settings)."""
+        return get_settings()
+    
     def _get_access_token(self) -> Optional[str]:
         """Get formatted access token."""
         return self.settings.get_access_token_formatted()
@@ -408,16 +416,23 @@ class FyersWebSocketManager:
         if channel in self._subscribers and callback in self._subscribers[channel]:
             self._subscribers[channel].remove(callback)
     
-    def stop_all(self):
-        """Stop all WebSocket connections."""
+    def stop_data_stream(self):
+        """Stop the market data stream."""
         if self._data_socket:
             self._data_socket.disconnect()
             self._data_socket = None
-        
+    
+    def stop_order_stream(self):
+        """Stop the order/trade/position stream."""
         if self._order_socket:
             self._order_socket.disconnect()
             self._order_socket = None
     
+    def stop_all(self):
+        """Stop all WebSocket connections."""
+        self.stop_data_stream()
+        self.stop_order_stream()
+    
     @property
     def data_connected(self) -> bool:
         return self._data_socket is not None and self._data_socket.is_connected
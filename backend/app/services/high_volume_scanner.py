@@ -13,13 +13,14 @@ Key Features:
 - Greeks-enhanced scoring
 """
 
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
+from functools import lru_cache
 import asyncio
 
 from app.services.fyers_market import get_market_service
-from app.services.fno_stocks import FNO_STOCKS, TOP_FNO_STOCKS
+from app.services.fno_stocks import FNO_STOCKS, TOP_FNO_STOCKS, get_sector
 from app.services.fno_intelligence import get_intelligence_engine
 
 
@@ -64,13 +65,14 @@ class HighVolumeScannerService:
         return StockCap.LARGE_CAP if symbol in LARGE_CAP_STOCKS else StockCap.MID_CAP
     
     def get_all_fno_stocks(self) -> List[Dict[str, Any]]:
-        """Get all FNO stocks with their cap classification"""
+        """Get all FNO stocks with their cap classification and sector"""
         stocks = []
         for symbol in FNO_STOCKS:
             stocks.append({
                 "symbol": symbol,
                 "name": symbol.replace("NSE:", "").replace("-EQ", ""),
-                "cap": self.classify_stock_cap(symbol).value
+                "cap": self.classify_stock_cap(symbol).value,
+                "sector": get_sector(symbol)
             })
         return stocks
     
@@ -522,6 +524,88 @@ class HighVolumeScannerService:
             "reason": f"{delta_bias} bias with strong OI {'support' if option_type == 'CE' else 'resistance'}"
         }
     
+    async def analyze_symbol_option_chain(self, symbol: str) -> Dict[str, Any]:
+        """
+        Perform deep option chain analysis for a single stock.
+        
+        Args:
+            symbol: Stock symbol to analyze
+            
+        Returns:
+            Unranked result row, or {"symbol", "error"} on failure
+        """
+        try:
+            # Fetch option chain with 20 strikes for comprehensive analysis
+            chain_data = await self.market_service.get_option_chain_cached(symbol, strike_count=20)
+            
+            if not chain_data.get("success"):
+                return {"symbol": symbol, "error": chain_data.get("error", "Failed to fetch")}
+            
+            spot_price = chain_data.get("spot_price") or 0
+            
+            # Skip if no valid spot price
+            if not spot_price or spot_price <= 0:
+                return {"symbol": symbol, "error": "No valid spot price available"}
+            
+            # Get day high from spot data
+            spot_data = await asyncio.to_thread(self.market_service.get_spot_price, symbol)
+            day_high = spot_data.get("day_high") if spot_data.get("success") else None
+            
+            # Perform analyses
+            oi_analysis = self._analyze_oi_concentrations(chain_data, spot_price)
+            breakout_analysis = self._detect_breakout_signals(chain_data, spot_price, day_high)
+            greeks_analysis = self._calculate_greeks_score(chain_data)
+            
+            # Run intelligence engine analysis
+            intel_analysis = self.intelligence_engine.get_analysis_summary(chain_data, bypass_time_check=True)
+            
+            # Calculate composite score
+            oi_score = 25 if oi_analysis["support"] and oi_analysis["resistance"] else 10
+            breakout_score = breakout_analysis["breakout_score"] * 0.3
+            greeks_score = greeks_analysis["score"] * 0.2
+            intel_score = (intel_analysis.get("confidence", 50)) * 0.25
+            
+            composite_score = oi_score + breakout_score + greeks_score + intel_score
+            
+            # Generate reasons
+            reasons = []
+            if oi_analysis["support"]:
+                reasons.append(f"Strong Put OI support at {oi_analysis['support']}")
+            if oi_analysis["resistance"]:
+                reasons.append(f"Call OI resistance at {oi_analysis['resistance']}")
+            for signal in breakout_analysis["signals"]:
+                reasons.append(signal["message"])
+            if greeks_analysis["analysis"]["delta_bias"] != "NEUTRAL":
+                reasons.append(f"Delta bias: {greeks_analysis['analysis']['delta_bias']}")
+            if intel_analysis.get("tradable"):
+                reasons.append(f"Market state: {intel_analysis.get('state')} - TRADABLE")
+            
+            return {
+                "symbol": symbol,
+                "name": symbol.replace("NSE:", "").replace("-EQ", ""),
+                "spot_price": spot_price,
+                "day_high": day_high,
+                "atm_strike": chain_data.get("atm_strike"),
+                "composite_score": round(composite_score, 1),
+                "oi_analysis": oi_analysis,
+                "breakout_analysis": breakout_analysis,
+                "greeks_analysis": greeks_analysis,
+                "intel_analysis": {
+                    "state": intel_analysis.get("state"),
+                    "tradable": intel_analysis.get("tradable"),
+                    "confidence": intel_analysis.get("confidence"),
+                    "message": intel_analysis.get("message")
+                },
+                "reasons": reasons,
+                "rank": 0,  # Will be set after sorting
+                "trade_recommendation": self._generate_trade_recommendation(
+                    symbol, spot_price, chain_data.get("atm_strike", 0),
+                    oi_analysis, greeks_analysis, intel_analysis
+                )
+            }
+        except Exception as e:
+            return {"symbol": symbol, "error": str(e)}
+    
     async def bulk_option_chain_analysis(
         self,
         symbols: List[str],
@@ -543,85 +627,17 @@ class HighVolumeScannerService:
         errors = []
         
         for symbol in symbols:
-            try:
-                analyzed += 1
-                
-                # Fetch option chain with 20 strikes for comprehensive analysis
-                chain_data = self.market_service.get_option_chain(symbol, strike_count=20)
-                
-                if not chain_data.get("success"):
-                    errors.append({"symbol": symbol, "error": chain_data.get("error", "Failed to fetch")})
-                    continue
-                
-                spot_price = chain_data.get("spot_price") or 0
-                
-                # Skip if no valid spot price
-                if not spot_price or spot_price <= 0:
-                    errors.append({"symbol": symbol, "error": "No valid spot price available"})
-                    continue
-                
-                # Get day high from spot data
-                spot_data = self.market_service.get_spot_price(symbol)
-                day_high = spot_data.get("day_high") if spot_data.get("success") else None
-                
-                # Perform analyses
-                oi_analysis = self._analyze_oi_concentrations(chain_data, spot_price)
-                breakout_analysis = self._detect_breakout_signals(chain_data, spot_price, day_high)
-                greeks_analysis = self._calculate_greeks_score(chain_data)
-                
-                # Run intelligence engine analysis
-                intel_analysis = self.intelligence_engine.get_analysis_summary(chain_data, bypass_time_check=True)
-                
-                # Calculate composite score
-                oi_score = 25 if oi_analysis["support"] and oi_analysis["resistance"] else 10
-                breakout_score = breakout_analysis["breakout_score"] * 0.3
-                greeks_score = greeks_analysis["score"] * 0.2
-                intel_score = (intel_analysis.get("confidence", 50)) * 0.25
-                
-                composite_score = oi_score + breakout_score + greeks_score + intel_score
-                
-                # Generate reasons
-                reasons = []
-                if oi_analysis["support"]:
-                    reasons.append(f"Strong Put OI support at {oi_analysis['support']}")
-                if oi_analysis["resistance"]:
-                    reasons.append(f"Call OI resistance at {oi_analysis['resistance']}")
-                for signal in breakout_analysis["signals"]:
-                    reasons.append(signal["message"])
-                if greeks_analysis["analysis"]["delta_bias"] != "NEUTRAL":
-                    reasons.append(f"Delta bias: {greeks_analysis['analysis']['delta_bias']}")
-                if intel_analysis.get("tradable"):
-                    reasons.append(f"Market state: {intel_analysis.get('state')} - TRADABLE")
-                
-                results.append({
-                    "symbol": symbol,
-                    "name": symbol.replace("NSE:", "").replace("-EQ", ""),
-                    "spot_price": spot_price,
-                    "day_high": day_high,
-                    "atm_strike": chain_data.get("atm_strike"),
-                    "composite_score": round(composite_score, 1),
-                    "oi_analysis": oi_analysis,
-                    "breakout_analysis": breakout_analysis,
-                    "greeks_analysis": greeks_analysis,
-                    "intel_analysis": {
-                        "state": intel_analysis.get("state"),
-                        "tradable": intel_analysis.get("tradable"),
-                        "confidence": intel_analysis.get("confidence"),
-                        "message": intel_analysis.get("message")
-                    },
-                    "reasons": reasons,
-                    "rank": 0,  # Will be set after sorting
-                    "trade_recommendation": self._generate_trade_recommendation(
-                        symbol, spot_price, chain_data.get("atm_strike", 0),
-                        oi_analysis, greeks_analysis, intel_analysis
-                    )
-                })
-                
-                if progress_callback:
-                    progress_callback(analyzed, total)
-                    
-            except Exception as e:
-                errors.append({"symbol": symbol, "error": str(e)})
+            analyzed += 1
+            row = await self.analyze_symbol_option_chain(symbol)
+            
+            if "error" in row:
+                errors.append(row)
+                continue
+            
+            results.append(row)
+            
+            if progress_callback:
+                progress_callback(analyzed, total)
         
         # Sort by composite score and assign ranks
         results.sort(key=lambda x: x["composite_score"], reverse=True)
@@ -637,13 +653,7 @@ class HighVolumeScannerService:
         }
 
 
-# Singleton instance
-_scanner_service: Optional[HighVolumeScannerService] = None
-
-
+@lru_cache(maxsize=1)
 def get_scanner_service() -> HighVolumeScannerService:
-    """Get the scanner service instance."""
-    global _scanner_service
-    if _scanner_service is None:
-        _scanner_service = HighVolumeScannerService()
-    return _scanner_service
+    """Get the scanner service instance (created on first use)."""
+    return HighVolumeScannerService()
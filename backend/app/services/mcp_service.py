@@ -18,15 +18,67 @@ Tools available:
 - get_option_chain_analysis: Analyze option chain with Greeks
 """
 
-import json
-from typing import Any, Dict, List, Optional
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
+from functools import lru_cache
 
 from app.services.fyers_market import get_market_service
 from app.services.fyers_orders import get_order_service, OrderType, OrderSide, ProductType
 from app.services.fyers_auth import get_auth_service
 
 
+# JSON Schema primitive type -> accepted Python types
+_SCHEMA_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+ArgumentValidator = Callable[[Dict[str, Any]], Optional[str]]
+
+# Tools that place/modify/cancel orders; never reordered against other calls
+MUTATING_TOOLS = frozenset({"place_order", "modify_order", "cancel_order"})
+
+
+def _compile_validator(schema: Dict[str, Any]) -> ArgumentValidator:
+    """
+    Build an arguments checker for a tool's inputSchema.
+    
+    Covers what the manifest uses: required keys, primitive property types
+    and string enums (matched case-insensitively, as handlers upper() them).
+    
+    Returns:
+        Callable returning an error message, or None when arguments are valid
+    """
+    required = tuple(schema.get("required", ()))
+    checks = []
+    for name, prop in schema.get("properties", {}).items():
+        expected = _SCHEMA_TYPES.get(prop.get("type"))
+        enum = frozenset(str(v).upper() for v in prop["enum"]) if "enum" in prop else None
+        checks.append((name, prop.get("type"), expected, enum))
+    
+    def validate(arguments: Dict[str, Any]) -> Optional[str]:
+        missing = [name for name in required if arguments.get(name) is None]
+        if missing:
+            return f"Missing required argument(s): {', '.join(missing)}"
+        for name, type_name, expected, enum in checks:
+            value = arguments.get(name)
+            if value is None:
+                continue
+            # bool is an int subclass; only accept it where the schema says boolean
+            if expected and (not isinstance(value, expected) or (isinstance(value, bool) and type_name != "boolean")):
+                return f"Argument '{name}' must be of type {type_name}"
+            if enum is not None and str(value).upper() not in enum:
+                return f"Argument '{name}' must be one of: {', '.join(sorted(enum))}"
+        return None
+    
+    return validate
+
+
 class MCPService:
     """
     Model Context Protocol (MCP) Service for OptionGreek.
@@ -37,6 +89,34 @@ class MCPService:
         self.market_service = get_market_service()
         self.order_service = get_order_service()
         self.auth_service = get_auth_service()
+        
+        # Tool name -> handler(arguments); built once, O(1) dispatch per call
+        self._dispatch: Dict[str, Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]] = {
+            # Profile & Account
+            "get_profile": lambda args: self._get_profile(),
+            "get_funds": lambda args: self._get_funds(),
+            # Portfolio & Positions
+            "get_holdings": lambda args: self._get_holdings(),
+            "get_positions": lambda args: self._get_positions(),
+            # Orders & Trades
+            "get_orders": lambda args: self._get_orders(),
+            "get_trades": lambda args: self._get_trades(),
+            # Order Management
+            "place_order": self._place_order,
+            "modify_order": self._modify_order,
+            "cancel_order": self._cancel_order,
+            # Market Data
+            "get_quotes": self._get_quotes,
+            "get_option_chain_analysis": self._get_option_chain_analysis,
+            # Combined Summary
+            "get_portfolio_summary": lambda args: self._get_portfolio_summary(),
+        }
+        
+        # Argument validators compiled once from the manifest's inputSchemas
+        self._validators: Dict[str, ArgumentValidator] = {
+            tool["name"]: _compile_validator(tool["inputSchema"])
+            for tool in self.get_tools_manifest()
+        }
 
     def get_tools_manifest(self) -> List[Dict[str, Any]]:
         """
@@ -228,55 +308,28 @@ class MCPService:
         Executes a specific tool called by the AI agent.
         Returns MCP-formatted response with content array.
         """
+        handler = self._dispatch.get(tool_name)
+        if handler is None:
+            return self._error_response(f"Tool '{tool_name}' not found")
+        
+        validator = self._validators.get(tool_name)
+        error = validator(arguments) if validator else None
+        if error:
+            return self._error_response(error)
+        
         try:
-            # Profile & Account
-            if tool_name == "get_profile":
-                return await self._get_profile()
-            
-            elif tool_name == "get_funds":
-                return await self._get_funds()
-            
-            # Portfolio & Positions
-            elif tool_name == "get_holdings":
-                return await self._get_holdings()
-            
-            elif tool_name == "get_positions":
-                return await self._get_positions()
-            
-            # Orders & Trades
-            elif tool_name == "get_orders":
-                return await self._get_orders()
-            
-            elif tool_name == "get_trades":
-                return await self._get_trades()
-            
-            # Order Management
-            elif tool_name == "place_order":
-                return await self._place_order(arguments)
-            
-            elif tool_name == "modify_order":
-                return await self._modify_order(arguments)
-            
-            elif tool_name == "cancel_order":
-                return await self._cancel_order(arguments)
-            
-            # Market Data
-            elif tool_name == "get_quotes":
-                return await self._get_quotes(arguments)
-            
-            elif tool_name == "get_option_chain_analysis":
-                return await self._get_option_chain_analysis(arguments)
-            
-            # Combined Summary
-            elif tool_name == "get_portfolio_summary":
-                return await self._get_portfolio_summary()
-            
-            else:
-                return self._error_response(f"Tool '{tool_name}' not found")
-
+            return await handler(arguments)
         except Exception as e:
             return self._error_response(str(e))
 
+    def is_mutating(self, tool_name: str) -> bool:
+        """Whether a tool changes orders (batches keep these in request order)."""
+        return tool_name in MUTATING_TOOLS
+
+    def has_tool(self, tool_name: str) -> bool:
+        """Check whether a tool name is registered."""
+        return tool_name in self._dispatch
+
     # ========== Tool Implementations ==========
 
     async def _get_profile(self) -> Dict[str, Any]:
@@ -286,7 +339,7 @@ class MCPService:
             return self._error_response("Not authenticated. Please login first.")
         
         try:
-            response = fyers.get_profile()
+            response = await asyncio.to_thread(fyers.get_profile)
             if response.get("s") == "ok":
                 data = response.get("data", {})
                 return self._success_response(
@@ -307,7 +360,7 @@ class MCPService:
             return self._error_response("Not authenticated. Please login first.")
         
         try:
-            response = fyers.funds()
+            response = await asyncio.to_thread(fyers.funds)
             if response.get("s") == "ok":
                 fund_limit = response.get("fund_limit", [])
                 
@@ -327,7 +380,7 @@ class MCPService:
 
     async def _get_holdings(self) -> Dict[str, Any]:
         """Get stock holdings."""
-        result = self.order_service.get_holdings()
+        result = await self.order_service.aget_holdings()
         
         if result.get("success"):
             holdings = result.get("holdings", [])
@@ -367,7 +420,7 @@ class MCPService:
 
     async def _get_positions(self) -> Dict[str, Any]:
         """Get open positions."""
-        result = self.order_service.get_positions()
+        result = await self.order_service.aget_positions()
         
         if result.get("success"):
             positions = result.get("positions", [])
@@ -402,7 +455,7 @@ class MCPService:
 
     async def _get_orders(self) -> Dict[str, Any]:
         """Get today's orders."""
-        result = self.order_service.get_orders()
+        result = await self.order_service.aget_orders()
         
         if result.get("success"):
             orders = result.get("orders", [])
@@ -433,7 +486,7 @@ class MCPService:
 
     async def _get_trades(self) -> Dict[str, Any]:
         """Get executed trades."""
-        result = self.order_service.get_trades()
+        result = await self.order_service.aget_trades()
         
         if result.get("success"):
             trades = result.get("trades", [])
@@ -480,7 +533,9 @@ class MCPService:
         if order_type not in type_map:
             return self._error_response(f"Invalid order type: {order_type}.")
         
-        result = self.order_service.place_order(
+        # Concurrent place_order calls (e.g. from several agents) share one
+        # multi-order request through the placement batcher
+        result = await self.order_service.aplace_order_batched(
             symbol=symbol,
             qty=qty,
             side=side_map[side],
@@ -510,7 +565,7 @@ class MCPService:
         if not order_id:
             return self._error_response("Order ID is required.")
         
-        result = self.order_service.modify_order(
+        result = await self.order_service.amodify_order(
             order_id=order_id,
             qty=qty,
             limit_price=limit_price
@@ -528,7 +583,7 @@ class MCPService:
         if not order_id:
             return self._error_response("Order ID is required.")
         
-        result = self.order_service.cancel_order(order_id)
+        result = await self.order_service.acancel_order(order_id)
         
         if result.get("success"):
             return self._success_response(f"✅ Order {order_id} cancelled successfully.")
@@ -542,7 +597,7 @@ class MCPService:
         if not symbols:
             return self._error_response("At least one symbol is required.")
         
-        result = self.market_service.get_quotes(symbols)
+        result = await self.market_service.aget_quotes(symbols)
         
         if result.get("success"):
             quotes = result.get("quotes", [])
@@ -569,7 +624,7 @@ class MCPService:
         if not symbol:
             return self._error_response("Symbol is required.")
         
-        result = self.market_service.get_option_chain(symbol, strike_count)
+        result = await self.market_service.get_option_chain_cached(symbol, strike_count)
         
         if result.get("success"):
             spot = result.get("spot_price", 0)
@@ -599,8 +654,10 @@ class MCPService:
     async def _get_portfolio_summary(self) -> Dict[str, Any]:
         """Get complete portfolio summary."""
         # Get all data
-        positions_result = self.order_service.get_positions()
-        holdings_result = self.order_service.get_holdings()
+        positions_result, holdings_result = await asyncio.gather(
+            self.order_service.aget_positions(),
+            self.order_service.aget_holdings()
+        )
         
         positions = positions_result.get("positions", []) if positions_result.get("success") else []
         holdings = holdings_result.get("holdings", []) if holdings_result.get("success") else []
@@ -635,12 +692,7 @@ class MCPService:
         }
 
 
-# Singleton instance
-_mcp_service = None
-
-
-def get_mcp_service():
-    global _mcp_service
-    if _mcp_service is None:
-        _mcp_service = MCPService()
-    return _mcp_service
+@lru_cache(maxsize=1)
+def get_mcp_service() -> MCPService:
+    """Get the MCP service instance (created on first use)."""
+    return MCPService()
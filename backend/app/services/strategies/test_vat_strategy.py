@@ -9,6 +9,7 @@ Tests the Value Adjustment Theory implementation including:
 """
 
 import pytest
+import numpy as np
 from datetime import datetime
 from unittest.mock import MagicMock, patch, AsyncMock
 import asyncio
@@ -247,6 +248,59 @@ class TestGreeksScoring:
         assert score_good_iv > score_extreme_iv
 
 
+class TestVectorizedScoringParity:
+    """The batch scorers used by analyze() must match the scalar scorers."""
+    
+    @pytest.fixture
+    def strategy(self):
+        return EnhancedVATStrategy()
+    
+    def test_gap_scores_match_scalar(self, strategy):
+        min_gap = 7.0
+        gaps = [0.0, 5.0, 6.99, 7.0, 10.0, 21.0, 50.0, 120.0]
+        avg_premiums = [0.0, 3.0, 20.0, 45.0, 100.0, 250.0]
+        
+        pairs = [(g, a) for g in gaps for a in avg_premiums]
+        gap_arr = np.array([g for g, _ in pairs])
+        avg_arr = np.array([a for _, a in pairs])
+        
+        vector = strategy.calculate_gap_scores(gap_arr, min_gap, avg_arr)
+        scalar = [strategy.calculate_gap_score(gap=g, min_gap=min_gap, avg_premium=a) for g, a in pairs]
+        np.testing.assert_allclose(vector, scalar)
+    
+    def test_greeks_scores_match_scalar(self, strategy):
+        # Band edges on both sides, for calls and puts
+        deltas = [0.1, 0.15, 0.2, 0.25, 0.4, 0.55, 0.6, 0.65, 0.8, -0.1, -0.25, -0.4, -0.6, -0.7]
+        gammas = [0.005, 0.01, 0.015, 0.02, 0.03]
+        ivs = [10.0, 15.0, 20.0, 30.0, 45.0]
+        
+        combos = [(d, g, v) for d in deltas for g in gammas for v in ivs]
+        d_arr, g_arr, v_arr = (np.array(col) for col in zip(*combos))
+        
+        vector = strategy.calculate_greeks_scores(d_arr, g_arr, v_arr)
+        scalar = [strategy.calculate_greeks_score(delta=d, gamma=g, iv=v) for d, g, v in combos]
+        np.testing.assert_allclose(vector, scalar)
+    
+    def test_confidence_scores_match_scalar(self, strategy):
+        # Includes sums landing on .5 to pin the rounding mode
+        gap = [0.0, 25.0, 50.0, 72.5, 100.0]
+        momentum = [0.0, 35.0, 50.0, 90.0]
+        greeks = [50.0, 65.0, 75.0, 100.0]
+        time_score = 85.0
+        
+        combos = [(g, m, k) for g in gap for m in momentum for k in greeks]
+        g_arr, m_arr, k_arr = (np.array(col) for col in zip(*combos))
+        
+        vector = strategy.calculate_confidence_scores(g_arr, m_arr, time_score, k_arr, 50.0)
+        scalar = [
+            strategy.calculate_confidence_score(
+                gap_score=g, momentum_score=m, time_score=time_score, greeks_score=k, max_pain_score=50.0
+            )[0]
+            for g, m, k in combos
+        ]
+        assert vector.tolist() == scalar
+
+
 class TestSymbolConfig:
     """Test symbol-specific configuration."""
     
@@ -16,9 +16,11 @@ Key Enhancements:
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 from enum import Enum
+import asyncio
+import numpy as np
 from app.services.fyers_market import get_market_service
 
 
@@ -137,6 +139,7 @@ class MarketContext:
     # Momentum
     spot_change_percent: float = 0.0
     spot_momentum_direction: str = "neutral"  # bullish, bearish, neutral
+    momentum_score: float = 50.0               # 0 (bearish) to 100 (bullish)
     
     # Volatility
     vix: float = 0.0
@@ -286,6 +289,33 @@ class EnhancedVATStrategy:
         
         return min(100, ratio_score + pct_score)
     
+    def calculate_gap_scores(self, gaps: np.ndarray, min_gap: float, avg_premiums: np.ndarray) -> np.ndarray:
+        """
+        Vectorized calculate_gap_score over every strike pair at once.
+        
+        Args:
+            gaps: Absolute CE/PE premium gaps
+            min_gap: Minimum gap threshold for the symbol
+            avg_premiums: Average of the CE and PE premiums per pair
+            
+        Returns:
+            Array of gap scores (0-100)
+        """
+        gap_pcts = self._gap_percentages(gaps, avg_premiums)
+        ratio_score = np.minimum(50, gaps / min_gap * 15)
+        pct_score = np.minimum(50, gap_pcts * 2)
+        return np.where(gaps < min_gap, 0.0, np.minimum(100, ratio_score + pct_score))
+    
+    @staticmethod
+    def _gap_percentages(gaps: np.ndarray, avg_premiums: np.ndarray) -> np.ndarray:
+        """Gaps as a percentage of the average premium (0 where the average isn't positive)."""
+        gaps = np.asarray(gaps, dtype=np.float64)
+        avg_premiums = np.asarray(avg_premiums, dtype=np.float64)
+        return np.divide(
+            gaps * 100, avg_premiums,
+            out=np.zeros_like(gaps), where=avg_premiums > 0
+        )
+    
     def calculate_time_score(self, expiry_phase: ExpiryPhase, is_optimal_window: bool) -> float:
         """
         Calculate time score based on expiry proximity and time of day.
@@ -343,6 +373,28 @@ class EnhancedVATStrategy:
         
         return min(100, score)
     
+    def calculate_greeks_scores(self, deltas: np.ndarray, gammas: np.ndarray, ivs: np.ndarray) -> np.ndarray:
+        """
+        Vectorized calculate_greeks_score over every strike pair at once.
+        
+        Args:
+            deltas: Delta of the undervalued leg per pair
+            gammas: Gamma of the undervalued leg per pair
+            ivs: Implied volatility of the undervalued leg per pair
+            
+        Returns:
+            Array of Greeks quality scores (0-100)
+        """
+        abs_delta = np.abs(deltas)
+        delta_bonus = np.select(
+            [(abs_delta >= 0.25) & (abs_delta <= 0.55), (abs_delta >= 0.15) & (abs_delta <= 0.65)],
+            [25.0, 15.0],
+            0.0
+        )
+        gamma_bonus = np.select([gammas > 0.02, gammas > 0.01], [15.0, 10.0], 0.0)
+        iv_bonus = np.where((ivs >= 15) & (ivs <= 30), 10.0, 0.0)
+        return np.minimum(100, 50.0 + delta_bonus + gamma_bonus + iv_bonus)
+    
     def calculate_trade_parameters(
         self, 
         entry_price: float,
@@ -392,33 +444,68 @@ class EnhancedVATStrategy:
         Returns:
             Tuple of (confidence_score, signal_strength)
         """
+        confidence = int(self.calculate_confidence_scores(
+            gap_score, momentum_score, time_score, greeks_score, max_pain_score
+        ))
+        
+        return (confidence, self.signal_strength(confidence))
+    
+    def calculate_confidence_scores(
+        self,
+        gap_scores: np.ndarray,
+        momentum_scores: np.ndarray,
+        time_scores: Union[float, np.ndarray],
+        greeks_scores: np.ndarray,
+        max_pain_scores: Union[float, np.ndarray] = 50.0
+    ) -> np.ndarray:
+        """
+        Vectorized confidence score (the one place the weights are applied).
+        
+        Each argument may be an array (one value per pair) or a scalar
+        shared by every pair.
+        
+        Returns:
+            Integer confidence scores, rounded half-to-even like round()
+        """
         # Weighted sum
         confidence = (
-            gap_score * self.config.weight_gap +
-            momentum_score * self.config.weight_momentum +
-            time_score * self.config.weight_time +
-            greeks_score * self.config.weight_greeks +
-            max_pain_score * self.config.weight_max_pain
+            np.asarray(gap_scores, dtype=np.float64) * self.config.weight_gap +
+            np.asarray(momentum_scores, dtype=np.float64) * self.config.weight_momentum +
+            np.asarray(time_scores, dtype=np.float64) * self.config.weight_time +
+            np.asarray(greeks_scores, dtype=np.float64) * self.config.weight_greeks +
+            np.asarray(max_pain_scores, dtype=np.float64) * self.config.weight_max_pain
         )
-        
-        confidence = int(round(confidence))
-        
-        # Determine strength
+        return np.rint(confidence).astype(np.int64)
+    
+    def signal_strength(self, confidence: int) -> str:
+        """Map a confidence score to its signal strength bucket."""
         if confidence >= self.config.high_confidence_threshold:
-            strength = SignalStrength.HIGH.value
+            return SignalStrength.HIGH.value
         elif confidence >= self.config.medium_confidence_threshold:
-            strength = SignalStrength.MEDIUM.value
+            return SignalStrength.MEDIUM.value
         elif confidence >= self.config.low_confidence_threshold:
-            strength = SignalStrength.LOW.value
-        else:
-            strength = SignalStrength.SKIP.value
-        
-        return (confidence, strength)
+            return SignalStrength.LOW.value
+        return SignalStrength.SKIP.value
+    
+    def _leg_greeks(self, data: Dict[str, Any], default_delta: float) -> Tuple[float, float, float, float]:
+        """Extract (delta, gamma, theta, iv) for one option leg, with defaults for gaps."""
+        greeks = data.get("greeks") or {}
+        delta = greeks.get("delta") if greeks.get("delta") is not None else default_delta
+        gamma = greeks.get("gamma") if greeks.get("gamma") is not None else 0.01
+        theta = greeks.get("theta") if greeks.get("theta") is not None else 0
+        iv = data.get("iv") if data.get("iv") is not None else 20
+        return (delta, gamma, theta, iv)
     
     async def get_market_context(self, symbol: str) -> MarketContext:
         """Get current market context for VAT trading decision."""
-        # Get spot price
-        spot_data = self.market_service.get_spot_price(symbol)
+        # Spot and VIX quotes are independent; fetch both off the event loop
+        spot_data, vix_data = await asyncio.gather(
+            asyncio.to_thread(self.market_service.get_spot_price, symbol),
+            asyncio.to_thread(self.market_service.get_quotes, ["NSE:INDIAVIX-INDEX"]),
+            return_exceptions=True
+        )
+        if isinstance(spot_data, Exception):
+            raise spot_data
         spot_price = spot_data.get("ltp", 0) if spot_data.get("success") else 0
         
         # Get symbol config
@@ -431,13 +518,16 @@ class EnhancedVATStrategy:
         # Check optimal window
         is_optimal = self.is_optimal_time_window()
         
-        # Calculate momentum
-        momentum_score, momentum_dir = self.calculate_momentum_score(spot_price, symbol)
+        # Calculate momentum (fetches history)
+        momentum_score, momentum_dir = await asyncio.to_thread(
+            self.calculate_momentum_score, spot_price, symbol
+        )
         
         # Get VIX if available
         vix = 0.0
         try:
-            vix_data = self.market_service.get_quotes(["NSE:INDIAVIX-INDEX"])
+            if isinstance(vix_data, Exception):
+                raise vix_data
             if vix_data.get("success") and vix_data.get("data"):
                 vix = vix_data["data"][0].get("ltp", 0)
         except Exception:
@@ -452,6 +542,7 @@ class EnhancedVATStrategy:
             is_optimal_window=is_optimal,
             spot_change_percent=0,
             spot_momentum_direction=momentum_dir,
+            momentum_score=momentum_score,
             vix=vix,
             iv_percentile=0,
             max_pain_strike=0,
@@ -481,8 +572,9 @@ class EnhancedVATStrategy:
         scan_range, strike_step, min_gap = self._get_symbol_config(symbol)
         strike_count = (scan_range // strike_step) * 2 + 10
         
-        chain_result = self.market_service.get_option_chain(
-            symbol=symbol, 
+        chain_result = await asyncio.to_thread(
+            self.market_service.get_option_chain,
+            symbol=symbol,
             strike_count=strike_count
         )
         
@@ -504,9 +596,9 @@ class EnhancedVATStrategy:
         # Get market context
         context = await self.get_market_context(symbol)
         
-        # Calculate momentum
-        momentum_score, momentum_dir = self.calculate_momentum_score(spot_price, symbol)
-        context.spot_momentum_direction = momentum_dir
+        # Momentum was already computed (off the event loop) for the context
+        momentum_score = context.momentum_score
+        momentum_dir = context.spot_momentum_direction
         
         # Detect expiry phase
         expiry_phase, days_to_expiry = self.detect_expiry_phase(symbol)
@@ -517,8 +609,8 @@ class EnhancedVATStrategy:
         # Anchor strike
         anchor_strike = round(spot_price / strike_step) * strike_step
         
-        # Analyze equidistant pairs
-        all_signals: List[VATSignal] = []
+        # Collect equidistant pairs with a live premium on both legs
+        pairs: List[Tuple[int, int, int, Dict[str, Any], Dict[str, Any]]] = []
         
         for offset in range(strike_step, scan_range + strike_step, strike_step):
             call_strike = anchor_strike + offset
@@ -530,114 +622,117 @@ class EnhancedVATStrategy:
             if not call_data or not put_data:
                 continue
             
-            ce_ltp = call_data.get("ltp", 0)
-            pe_ltp = put_data.get("ltp", 0)
-            
-            if ce_ltp <= 0 or pe_ltp <= 0:
+            if call_data.get("ltp", 0) <= 0 or put_data.get("ltp", 0) <= 0:
                 continue
             
-            # Calculate gap
-            gap = abs(ce_ltp - pe_ltp)
-            avg_premium = (ce_ltp + pe_ltp) / 2
-            gap_pct = (gap / avg_premium * 100) if avg_premium > 0 else 0
-            
-            # Calculate gap score
-            gap_score = self.calculate_gap_score(gap, min_gap, avg_premium)
+            pairs.append((offset, call_strike, put_strike, call_data, put_data))
+        
+        all_signals: List[VATSignal] = []
+        
+        if pairs:
+            # Score every pair in one pass over stacked premium arrays
+            ce = np.array([p[3]["ltp"] for p in pairs], dtype=np.float64)
+            pe = np.array([p[4]["ltp"] for p in pairs], dtype=np.float64)
             
-            # Determine undervalued leg
-            if ce_ltp < pe_ltp:
-                signal_type = "BUY_CE"
-                undervalued_strike = call_strike
-                entry_price = ce_ltp
-                target_premium = pe_ltp
-                option_type = "CE"
-                greeks = call_data.get("greeks") or {}
-                delta = greeks.get("delta") if greeks.get("delta") is not None else 0.4
-                gamma = greeks.get("gamma") if greeks.get("gamma") is not None else 0.01
-                theta = greeks.get("theta") if greeks.get("theta") is not None else 0
-                iv = call_data.get("iv") if call_data.get("iv") is not None else 20
-            else:
-                signal_type = "BUY_PE"
-                undervalued_strike = put_strike
-                entry_price = pe_ltp
-                target_premium = ce_ltp
-                option_type = "PE"
-                greeks = put_data.get("greeks") or {}
-                delta = greeks.get("delta") if greeks.get("delta") is not None else -0.4
-                gamma = greeks.get("gamma") if greeks.get("gamma") is not None else 0.01
-                theta = greeks.get("theta") if greeks.get("theta") is not None else 0
-                iv = put_data.get("iv") if put_data.get("iv") is not None else 20
+            gaps = np.abs(ce - pe)
+            avg_premiums = (ce + pe) / 2
+            gap_pcts = self._gap_percentages(gaps, avg_premiums)
+            gap_scores = self.calculate_gap_scores(gaps, min_gap, avg_premiums)
             
-            # Skip if gap too small
-            if gap < min_gap:
-                signal_type = "NONE"
+            buy_ce = ce < pe
+            has_gap = gaps >= min_gap
             
-            # Calculate Greeks score
-            greeks_score = self.calculate_greeks_score(delta, gamma, iv)
+            # Greeks of the undervalued leg, stacked as (delta, gamma, theta, iv) columns
+            leg_greeks = np.array([
+                self._leg_greeks(call_data, 0.4) if cheaper_ce else self._leg_greeks(put_data, -0.4)
+                for (_, _, _, call_data, put_data), cheaper_ce in zip(pairs, buy_ce)
+            ], dtype=np.float64)
+            deltas, gammas, thetas, ivs = leg_greeks.T
+            greeks_scores = self.calculate_greeks_scores(deltas, gammas, ivs)
             
             # Momentum alignment bonus
             # For CE: bullish momentum is good. For PE: bearish is good.
-            if signal_type == "BUY_CE" and momentum_dir == "bullish":
-                aligned_momentum = momentum_score
-            elif signal_type == "BUY_PE" and momentum_dir == "bearish":
-                aligned_momentum = 100 - momentum_score  # Invert for PE
-            else:
-                aligned_momentum = 50  # Neutral
-            
-            # Calculate confidence
-            confidence, strength = self.calculate_confidence_score(
-                gap_score=gap_score,
-                momentum_score=aligned_momentum,
-                time_score=time_score,
-                greeks_score=greeks_score,
-                max_pain_score=50  # Default for now
-            )
-            
-            # Calculate trade parameters
-            sl, target_1, target_2, rr_ratio, profit_pct = self.calculate_trade_parameters(
-                entry_price, target_premium
-            )
-            
-            # Determine if tradeable
-            is_tradeable = (
-                signal_type != "NONE" and
-                confidence >= min_confidence and
-                rr_ratio >= self.config.min_risk_reward
-            )
+            aligned_momentum = np.full(len(pairs), 50.0)
+            if momentum_dir == "bullish":
+                aligned_momentum[has_gap & buy_ce] = momentum_score
+            elif momentum_dir == "bearish":
+                aligned_momentum[has_gap & ~buy_ce] = 100 - momentum_score  # Invert for PE
             
-            signal = VATSignal(
-                signal_type=signal_type,
-                undervalued_strike=undervalued_strike,
-                option_type=option_type,
-                entry_price=entry_price,
-                stop_loss=sl,
-                target_1=target_1,
-                target_2=target_2,
-                call_strike=call_strike,
-                put_strike=put_strike,
-                ce_premium=ce_ltp,
-                pe_premium=pe_ltp,
-                gap_amount=round(gap, 2),
-                gap_percentage=round(gap_pct, 1),
-                gap_score=round(gap_score, 1),
-                momentum_score=round(aligned_momentum, 1),
-                time_score=round(time_score, 1),
-                greeks_score=round(greeks_score, 1),
-                max_pain_score=50,
-                confidence_score=confidence,
-                signal_strength=strength,
-                risk_reward_ratio=rr_ratio,
-                potential_profit=profit_pct,
-                max_loss=round(self.config.stop_loss_percent, 1),
-                delta=round(delta, 3) if include_greeks else 0,
-                gamma=round(gamma, 4) if include_greeks else 0,
-                theta=round(theta, 2) if include_greeks else 0,
-                iv=round(iv, 1) if include_greeks else 0,
-                offset=offset,
-                is_tradeable=is_tradeable
+            # Weighted confidence (max pain defaults to 50 for now)
+            confidences = self.calculate_confidence_scores(
+                gap_scores, aligned_momentum, time_score, greeks_scores, 50.0
             )
             
-            all_signals.append(signal)
+            for i, (offset, call_strike, put_strike, call_data, put_data) in enumerate(pairs):
+                ce_ltp = call_data["ltp"]
+                pe_ltp = put_data["ltp"]
+                delta, gamma, theta, iv = leg_greeks[i].tolist()
+                
+                # Determine undervalued leg
+                if buy_ce[i]:
+                    signal_type = "BUY_CE"
+                    undervalued_strike = call_strike
+                    entry_price = ce_ltp
+                    target_premium = pe_ltp
+                    option_type = "CE"
+                else:
+                    signal_type = "BUY_PE"
+                    undervalued_strike = put_strike
+                    entry_price = pe_ltp
+                    target_premium = ce_ltp
+                    option_type = "PE"
+                
+                # Skip if gap too small
+                if not has_gap[i]:
+                    signal_type = "NONE"
+                
+                confidence = int(confidences[i])
+                
+                # Calculate trade parameters
+                sl, target_1, target_2, rr_ratio, profit_pct = self.calculate_trade_parameters(
+                    entry_price, target_premium
+                )
+                
+                # Determine if tradeable
+                is_tradeable = (
+                    signal_type != "NONE" and
+                    confidence >= min_confidence and
+                    rr_ratio >= self.config.min_risk_reward
+                )
+                
+                signal = VATSignal(
+                    signal_type=signal_type,
+                    undervalued_strike=undervalued_strike,
+                    option_type=option_type,
+                    entry_price=entry_price,
+                    stop_loss=sl,
+                    target_1=target_1,
+                    target_2=target_2,
+                    call_strike=call_strike,
+                    put_strike=put_strike,
+                    ce_premium=ce_ltp,
+                    pe_premium=pe_ltp,
+                    gap_amount=round(float(gaps[i]), 2),
+                    gap_percentage=round(float(gap_pcts[i]), 1),
+                    gap_score=round(float(gap_scores[i]), 1),
+                    momentum_score=round(float(aligned_momentum[i]), 1),
+                    time_score=round(time_score, 1),
+                    greeks_score=round(float(greeks_scores[i]), 1),
+                    max_pain_score=50,
+                    confidence_score=confidence,
+                    signal_strength=self.signal_strength(confidence),
+                    risk_reward_ratio=rr_ratio,
+                    potential_profit=profit_pct,
+                    max_loss=round(self.config.stop_loss_percent, 1),
+                    delta=round(delta, 3) if include_greeks else 0,
+                    gamma=round(gamma, 4) if include_greeks else 0,
+                    theta=round(theta, 2) if include_greeks else 0,
+                    iv=round(iv, 1) if include_greeks else 0,
+                    offset=offset,
+                    is_tradeable=is_tradeable
+                )
+                
+                all_signals.append(signal)
         
         # Filter and categorize signals
         tradeable_signals = [s for s in all_signals if s.is_tradeable]
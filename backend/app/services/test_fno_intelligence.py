@@ -0,0 +1,73 @@
+"""
+Unit Tests for the F&O Intelligence Engine Batch Path
+-----------------------------------------------------
+Tests analyze_batch (the /market/stocks/scan path):
+- Results come back in input order
+- A symbol whose analysis raises is reported for that symbol only
+"""
+
+import pytest
+from unittest.mock import patch
+
+from app.services.fno_intelligence import FNOIntelligenceEngine
+
+
+def _leg(ltp, oi, volume, delta):
+    return {"ltp": ltp, "oi": oi, "volume": volume, "delta": delta, "gamma": 0.002, "iv": 15.0, "chg": 0.0}
+
+
+def _chain(symbol, spot=1000.0, step=10):
+    """A small, valid option chain around `spot`."""
+    strikes = [spot + step * k for k in range(-5, 6)]
+    return {
+        "success": True,
+        "symbol": symbol,
+        "spot_price": spot,
+        "atm_strike": spot,
+        "timestamp": "2026-01-05T10:30:00",
+        "chain": [
+            {
+                "strike_price": strike,
+                "call": _leg(max(spot - strike, 0) + 5, 1000 + 100 * k, 500, 0.5),
+                "put": _leg(max(strike - spot, 0) + 5, 1500 - 100 * k, 400, -0.5),
+            }
+            for k, strike in enumerate(strikes)
+        ],
+    }
+
+
+class TestAnalyzeBatch:
+    """Test per-symbol isolation in analyze_batch."""
+    
+    @pytest.fixture
+    def engine(self):
+        return FNOIntelligenceEngine()
+    
+    def test_results_in_input_order(self, engine):
+        chains = [_chain("NSE:AAA-EQ"), {"success": False}, _chain("NSE:BBB-EQ", spot=2000.0)]
+        results = engine.analyze_batch(chains)
+        
+        assert len(results) == 3
+        assert "error" not in results[0]
+        assert results[1] == {"error": "No chain data available"}
+        assert "error" not in results[2]
+    
+    def test_failing_symbol_does_not_fail_batch(self, engine):
+        original = engine._build_analysis
+        
+        def build(chain_data, *args, **kwargs):
+            if chain_data["symbol"] == "NSE:BAD-EQ":
+                raise ValueError("boom")
+            return original(chain_data, *args, **kwargs)
+        
+        chains = [_chain("NSE:AAA-EQ"), _chain("NSE:BAD-EQ"), _chain("NSE:BBB-EQ")]
+        with patch.object(engine, "_build_analysis", side_effect=build):
+            results = engine.analyze_batch(chains)
+        
+        assert "error" not in results[0]
+        assert results[1] == {"symbol": "NSE:BAD-EQ", "error": "boom"}
+        assert "error" not in results[2]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
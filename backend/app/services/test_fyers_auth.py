@@ -0,0 +1,46 @@
+"""
+Unit Tests for Fyers Auth TOTP
+------------------------------
+Tests the built-in TOTP generator used by automated login against the
+RFC 6238 reference vectors (HMAC-SHA1), so a refactor can't silently
+produce codes Fyers rejects.
+"""
+
+import pytest
+
+from app.services.fyers_auth import TOTP_INTERVAL, _totp_code, _totp_key
+
+
+# RFC 6238 Appendix B seed "12345678901234567890" (ASCII), base32-encoded
+RFC_SECRET = "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ"
+
+
+class TestTotpKey:
+    """Test base32 secret decoding."""
+    
+    def test_decodes_rfc_secret(self):
+        assert _totp_key(RFC_SECRET) == b"12345678901234567890"
+    
+    def test_accepts_lower_case_spaces_and_missing_padding(self):
+        # "JBSWY3DP" + "EE" needs padding; grouped and lower-cased as apps display it
+        assert _totp_key("jbsw y3dp ee") == _totp_key("JBSWY3DPEE======")
+
+
+class TestTotpCode:
+    """Test codes against the RFC 6238 SHA1 vectors (last 6 of the 8 digits)."""
+    
+    @pytest.mark.parametrize("unix_time, expected", [
+        (59, "287082"),
+        (1111111109, "081804"),
+        (1111111111, "050471"),
+        (1234567890, "005924"),
+        (2000000000, "279037"),
+        (20000000000, "353130"),
+    ])
+    def test_rfc6238_vectors(self, unix_time, expected):
+        key = _totp_key(RFC_SECRET)
+        assert _totp_code(key, unix_time // TOTP_INTERVAL) == expected
+    
+    def test_codes_are_zero_padded_six_digits(self):
+        code = _totp_code(_totp_key(RFC_SECRET), 1234567890 // TOTP_INTERVAL)
+        assert len(code) == 6 and code.isdigit()
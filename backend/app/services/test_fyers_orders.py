@@ -0,0 +1,195 @@
+"""
+Unit Tests for Fyers Basket Orders
+----------------------------------
+Tests the multi-order paths of FyersOrderService:
+- PlacementBatcher splits queued orders into baskets of at most BASKET_MAX
+- Each caller gets its own result, matched by orderTag (position only as fallback)
+- A failed basket or a partial response never hands out another caller's order id
+- aplace_basket_orders / acancel_basket_orders on the pooled client
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.fyers_orders import (
+    BASKET_MAX, FyersOrderService, OrderSide, PlacementBatcher
+)
+
+
+def _order(symbol, **extra):
+    return {**FyersOrderService._order_payload(symbol, 1, OrderSide.BUY), **extra}
+
+
+def _placed(order_id, tag=None):
+    body = {"s": "ok", "code": 1101, "message": "Order submitted", "id": order_id}
+    if tag is not None:
+        body["orderTag"] = tag
+    return {"statusCode": 200, "body": body}
+
+
+class FakeBasketService:
+    """Stands in for FyersOrderService.aplace_basket_orders; records every basket."""
+    
+    def __init__(self, respond):
+        self.baskets = []
+        self._respond = respond
+    
+    async def aplace_basket_orders(self, orders):
+        self.baskets.append(list(orders))
+        return self._respond(orders)
+
+
+def _echo_tags(orders):
+    """A basket reply that echoes orderTag, in reverse order."""
+    items = [_placed(f"ID-{o['symbol']}", o["orderTag"]) for o in orders]
+    return {"success": True, "data": {"s": "ok", "data": items[::-1]}}
+
+
+async def _place_all(batcher, orders):
+    return await asyncio.gather(*(batcher.place_order(o) for o in orders))
+
+
+class TestPlacementBatcher:
+    """Test coalescing and result matching in PlacementBatcher."""
+    
+    @pytest.mark.asyncio
+    async def test_splits_into_baskets_and_matches_by_tag(self):
+        service = FakeBasketService(_echo_tags)
+        batcher = PlacementBatcher(service, interval=0.001)
+        orders = [_order(f"NSE:S{i}-EQ") for i in range(23)]
+        
+        results = await _place_all(batcher, orders)
+        
+        assert [len(b) for b in service.baskets] == [BASKET_MAX, BASKET_MAX, 3]
+        assert [r["order_id"] for r in results] == [f"ID-NSE:S{i}-EQ" for i in range(23)]
+        tags = [o["orderTag"] for b in service.baskets for o in b]
+        assert len(set(tags)) == 23
+    
+    @pytest.mark.asyncio
+    async def test_keeps_caller_tag(self):
+        service = FakeBasketService(_echo_tags)
+        batcher = PlacementBatcher(service, interval=0.001)
+        
+        result = await batcher.place_order(_order("NSE:SBIN-EQ", orderTag="mine1"))
+        
+        assert service.baskets[0][0]["orderTag"] == "mine1"
+        assert result["order_id"] == "ID-NSE:SBIN-EQ"
+    
+    @pytest.mark.asyncio
+    async def test_positional_fallback_without_tags(self):
+        def respond(orders):
+            items = [_placed(f"ID-{o['symbol']}") for o in orders]
+            return {"success": True, "data": {"s": "ok", "data": items}}
+        
+        batcher = PlacementBatcher(FakeBasketService(respond), interval=0.001)
+        results = await _place_all(batcher, [_order(f"NSE:S{i}-EQ") for i in range(12)])
+        
+        assert [r["order_id"] for r in results] == [f"ID-NSE:S{i}-EQ" for i in range(12)]
+    
+    @pytest.mark.asyncio
+    async def test_failed_basket_fails_only_its_callers(self):
+        def respond(orders):
+            if orders[0]["symbol"] == "NSE:S10-EQ":
+                return {"success": False, "error": "Rate limited"}
+            return _echo_tags(orders)
+        
+        batcher = PlacementBatcher(FakeBasketService(respond), interval=0.001)
+        results = await _place_all(batcher, [_order(f"NSE:S{i}-EQ") for i in range(15)])
+        
+        assert all(r["success"] for r in results[:BASKET_MAX])
+        assert results[BASKET_MAX:] == [{"success": False, "error": "Rate limited"}] * 5
+    
+    @pytest.mark.asyncio
+    async def test_service_exception_resolves_callers(self):
+        service = FakeBasketService(_echo_tags)
+        service.aplace_basket_orders = AsyncMock(side_effect=RuntimeError("connection reset"))
+        batcher = PlacementBatcher(service, interval=0.001)
+        
+        results = await _place_all(batcher, [_order("NSE:A-EQ"), _order("NSE:B-EQ")])
+        
+        assert results == [{"success": False, "error": "connection reset"}] * 2
+    
+    @pytest.mark.asyncio
+    async def test_partial_response_with_tags(self):
+        def respond(orders):
+            reply = _echo_tags(orders)
+            reply["data"]["data"] = [
+                item for item in reply["data"]["data"]
+                if item["body"]["id"] != "ID-NSE:S1-EQ"
+            ]
+            return reply
+        
+        batcher = PlacementBatcher(FakeBasketService(respond), interval=0.001)
+        results = await _place_all(batcher, [_order(f"NSE:S{i}-EQ") for i in range(3)])
+        
+        assert results[0]["order_id"] == "ID-NSE:S0-EQ"
+        assert results[1] == {"success": False, "error": "No result for order in basket response"}
+        assert results[2]["order_id"] == "ID-NSE:S2-EQ"
+    
+    @pytest.mark.asyncio
+    async def test_partial_response_without_tags(self):
+        def respond(orders):
+            items = [_placed(f"ID-{o['symbol']}") for o in orders[1:]]
+            return {"success": True, "data": {"s": "ok", "data": items}}
+        
+        batcher = PlacementBatcher(FakeBasketService(respond), interval=0.001)
+        results = await _place_all(batcher, [_order(f"NSE:S{i}-EQ") for i in range(3)])
+        
+        # Positions can't be trusted once an entry is missing
+        assert not any(r["success"] for r in results)
+        assert all("order_id" not in r for r in results)
+
+
+class TestBasketRequests:
+    """Test aplace_basket_orders and acancel_basket_orders on the pooled client."""
+    
+    @pytest.fixture
+    def service(self):
+        service = FyersOrderService()
+        with patch("app.services.fyers_orders.get_http_client", return_value=object()), \
+                patch.object(service, "_request_headers", return_value={"version": "3"}):
+            yield service
+    
+    @pytest.mark.asyncio
+    async def test_oversized_basket_rejected(self, service):
+        service._arequest = AsyncMock()
+        orders = [_order(f"NSE:S{i}-EQ") for i in range(BASKET_MAX + 1)]
+        
+        result = await service.aplace_basket_orders(orders)
+        
+        assert result["success"] is False
+        assert str(BASKET_MAX + 1) in result["error"]
+        service._arequest.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_place_basket_keeps_per_order_results(self, service):
+        reply = {"s": "ok", "data": [_placed("ID-1"), _placed("ID-2")]}
+        service._arequest = AsyncMock(return_value=reply)
+        
+        result = await service.aplace_basket_orders([_order("NSE:A-EQ"), _order("NSE:B-EQ")])
+        
+        assert result["success"] is True
+        assert result["data"] == reply
+    
+    @pytest.mark.asyncio
+    async def test_cancel_reports_each_basket(self, service):
+        async def request(method, url, payload):
+            if payload[0]["id"] == "O10":
+                raise RuntimeError("timeout")
+            items = [{"body": {"s": "ok", "id": o["id"]}} for o in payload]
+            return {"s": "ok", "data": items}
+        
+        service._arequest = AsyncMock(side_effect=request)
+        result = await service.acancel_basket_orders([f"O{i}" for i in range(23)])
+        
+        assert [len(b["order_ids"]) for b in result["baskets"]] == [BASKET_MAX, BASKET_MAX, 3]
+        assert [b["success"] for b in result["baskets"]] == [True, False, True]
+        assert result["baskets"][1]["error"] == "timeout"
+        assert result["cancelled_count"] == 13
+        assert result["requested_count"] == 23
+        assert result["success"] is False
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
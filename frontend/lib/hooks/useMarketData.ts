@@ -13,21 +13,26 @@ export function useMarketData(symbols: string[]) {
 
         const handleMessage = (message: any) => {
             if (message.type === 'market_update' && message.data) {
-                const update = message.data;
-                // Fyers symbol updates come with symbol in lowercase/uppercase sometimes
-                // or inside a specific key if it's multidimensional
-                const symbol = update.symbol || (update.d ? update.s : null);
-
-                if (symbol) {
-                    setData(prev => ({
-                        ...prev,
-                        [symbol]: {
-                            ...prev[symbol],
-                            ...update,
-                            last_updated: new Date().getTime()
+                // Server batches ticks into an array; older servers send one object
+                const updates = Array.isArray(message.data) ? message.data : [message.data];
+                const now = new Date().getTime();
+
+                setData(prev => {
+                    const next = { ...prev };
+                    for (const update of updates) {
+                        // Fyers symbol updates come with symbol in lowercase/uppercase sometimes
+                        // or inside a specific key if it's multidimensional
+                        const symbol = update.symbol || (update.d ? update.s : null);
+                        if (symbol) {
+                            next[symbol] = {
+                                ...next[symbol],
+                                ...update,
+                                last_updated: now
+                            };
                         }
-                    }));
-                }
+                    }
+                    return next;
+                });
             } else if (message.type === 'subscription_status') {
                 setConnected(message.status === 'success');
             }